@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -31,5 +32,69 @@ def get_pgvector_connection() -> str:
         f"@{VECTOR_DB_HOST}:{VECTOR_DB_PORT}/{VECTOR_DB_NAME}"
     )
 
+# IFC → GLB 변환 — 삼각분할 워커 수 (1=직렬, 0=CPU 코어 수)
+IFC_GEOM_WORKERS = int(os.getenv("IFC_GEOM_WORKERS", "0"))
+# 동일 형상 부재 mesh 재사용 (node translation/rotation 인스턴싱)
+IFC_GLB_INSTANCING = os.getenv("IFC_GLB_INSTANCING", "true").lower() in ("1", "true", "yes")
+# KHR_mesh_quantization 출력 (int16 위치 / int8 노말 / uint8·uint16 인덱스)
+IFC_GLB_QUANTIZE = os.getenv("IFC_GLB_QUANTIZE", "false").lower() in ("1", "true", "yes")
+# 삼각분할 후 정점 용접 + 정점 캐시 재정렬 (ifc_meshopt)
+IFC_MESH_OPTIMIZE = os.getenv("IFC_MESH_OPTIMIZE", "false").lower() in ("1", "true", "yes")
+# 부재별 quadric 단순화 LOD1~3 GLB 추가 출력 (ifc_lod)
+IFC_GLB_LODS = os.getenv("IFC_GLB_LODS", "false").lower() in ("1", "true", "yes")
+# tiles 모드 — 층 안에서 타일당 부재가 이보다 많으면 옥트리로 분할 (ifc_tiles)
+IFC_TILE_MAX_ELEMENTS = int(os.getenv("IFC_TILE_MAX_ELEMENTS", "2000"))
+# 변환 산출물(GLB·메타데이터) content-addressed 저장 경로
+IFC_ARTIFACT_DIR = os.getenv("IFC_ARTIFACT_DIR", os.path.join(tempfile.gettempdir(), "twinspring-ifc", "artifacts"))
+# 산출물 보관 한도 — 용량 상한(LRU) / 마지막 사용 후 보관 기간(초) / 자동 GC 최소 간격(초), 0 이면 해당 한도 없음
+IFC_ARTIFACT_MAX_BYTES       = int(os.getenv("IFC_ARTIFACT_MAX_BYTES", str(20 * 1024 ** 3)))
+IFC_ARTIFACT_TTL_SEC         = int(os.getenv("IFC_ARTIFACT_TTL_SEC", str(30 * 24 * 3600)))
+IFC_ARTIFACT_GC_INTERVAL_SEC = int(os.getenv("IFC_ARTIFACT_GC_INTERVAL_SEC", "600"))
+# 변환 캐시 (SHA-256 + scale 키, LRU) — 상한 0이면 비활성
+IFC_CACHE_DIR       = os.getenv("IFC_CACHE_DIR", os.path.join(tempfile.gettempdir(), "twinspring-ifc", "cache"))
+IFC_CACHE_MAX_BYTES = int(os.getenv("IFC_CACHE_MAX_BYTES", str(2 * 1024 ** 3)))
+# 증분 재변환 — 프로젝트별 직전 변환 결과(형상 + GlobalId fingerprint) 보관 경로
+IFC_REVISION_DIR = os.getenv("IFC_REVISION_DIR", os.path.join(tempfile.gettempdir(), "twinspring-ifc", "revisions"))
+# revision 보관 한도 — 용량 상한(LRU) / 마지막 사용 후 보관 기간(초), 0 이면 해당 한도 없음
+IFC_REVISION_MAX_BYTES = int(os.getenv("IFC_REVISION_MAX_BYTES", str(5 * 1024 ** 3)))
+IFC_REVISION_TTL_SEC   = int(os.getenv("IFC_REVISION_TTL_SEC", str(30 * 24 * 3600)))
+# 변환 작업 API — 작업마다 별도 프로세스, 큐가 가득 차면 429
+IFC_JOB_DIR         = os.getenv("IFC_JOB_DIR", os.path.join(tempfile.gettempdir(), "twinspring-ifc", "jobs"))
+IFC_JOB_WORKERS     = int(os.getenv("IFC_JOB_WORKERS", "2"))       # 동시 변환 프로세스 수
+IFC_JOB_QUEUE_SIZE  = int(os.getenv("IFC_JOB_QUEUE_SIZE", "8"))    # 대기 가능한 작업 수
+IFC_JOB_MEMORY_MB   = int(os.getenv("IFC_JOB_MEMORY_MB", "8192"))  # 프로세스당 주소공간 상한 (0: 무제한)
+IFC_JOB_TIMEOUT_SEC = int(os.getenv("IFC_JOB_TIMEOUT_SEC", "1800"))
+# 이 크기 이상 IFC 는 2-패스 스트리밍 변환 (형상을 임시 파일로 spill, GLB 를 파일로 직접 기록)
+IFC_STREAMING_MIN_MB = int(os.getenv("IFC_STREAMING_MIN_MB", "200"))
+# 다중 IFC 연합 변환 — 모델별 삼각분할 동시 프로세스 수
+IFC_FEDERATION_PROCESSES = int(os.getenv("IFC_FEDERATION_PROCESSES", "3"))
+# 재개 가능 청크 업로드 — 디스크에 바로 이어 쓰고 완료 시 경로를 변환 작업에 전달
+IFC_UPLOAD_DIR     = os.getenv("IFC_UPLOAD_DIR", os.path.join(tempfile.gettempdir(), "twinspring-ifc", "uploads"))
+IFC_UPLOAD_MAX_MB  = int(os.getenv("IFC_UPLOAD_MAX_MB", "2048"))
+IFC_UPLOAD_TTL_SEC = int(os.getenv("IFC_UPLOAD_TTL_SEC", str(24 * 3600)))  # 미완료 업로드 보관 기간
+# 상주 모델 서버 — 변환한 IFC 를 프로젝트별 보관, 파싱 결과를 LRU 로 유지 (0: 비활성)
+IFC_MODEL_DIR       = os.getenv("IFC_MODEL_DIR", os.path.join(tempfile.gettempdir(), "twinspring-ifc", "models"))
+IFC_RESIDENT_MODELS = int(os.getenv("IFC_RESIDENT_MODELS", "4"))
+# 상주 모델 메모리 상한 — 파싱 결과를 IFC 파일 크기 × 8 로 추정, 넘으면 LRU 해제 (0: 개수 한도만)
+IFC_RESIDENT_MAX_MB = int(os.getenv("IFC_RESIDENT_MAX_MB", "4096"))
+# 보관 IFC 디스크 한도 — 용량 상한(LRU) / 마지막 사용 후 보관 기간(초), 0 이면 해당 한도 없음
+IFC_MODEL_MAX_BYTES = int(os.getenv("IFC_MODEL_MAX_BYTES", str(10 * 1024 ** 3)))
+IFC_MODEL_TTL_SEC   = int(os.getenv("IFC_MODEL_TTL_SEC", str(30 * 24 * 3600)))
+# 상주 모델에 보관된 경우 변환 응답 elements 에서 ifcProperties / ifcQuantities 생략
+IFC_ELEMENTS_LIGHTWEIGHT = os.getenv("IFC_ELEMENTS_LIGHTWEIGHT", "false").lower() in ("1", "true", "yes")
+# 산출물 API 변환 시 elements 컬럼형 사이드카(Arrow IPC) 추가 기록 (pyarrow 필요)
+IFC_ELEMENTS_ARROW = os.getenv("IFC_ELEMENTS_ARROW", "false").lower() in ("1", "true", "yes")
+# 산출물 API 변환 시 부재 삼각형 BVH 사이드카(ray / box 질의용) 추가 기록
+IFC_BVH_SIDECAR = os.getenv("IFC_BVH_SIDECAR", "false").lower() in ("1", "true", "yes")
+# 부재 연결 그래프(접촉·지지 edge list) 프로젝트별 저장 경로
+IFC_GRAPH_DIR = os.getenv("IFC_GRAPH_DIR", os.path.join(tempfile.gettempdir(), "twinspring-ifc", "graphs"))
+
+# 프로젝트 간 공유 부재 mesh 저장소 (형상 표현 hash 키, 히트 시 create_shape 생략) — 상한 0이면 비활성
+IFC_MESH_STORE_DIR       = os.getenv("IFC_MESH_STORE_DIR", os.path.join(tempfile.gettempdir(), "twinspring-ifc", "meshes"))
+IFC_MESH_STORE_MAX_BYTES = int(os.getenv("IFC_MESH_STORE_MAX_BYTES", "0"))
+# 참조 없는 mesh 유지 유예(초) / 자동 GC 최소 간격(초)
+IFC_MESH_STORE_GRACE_SEC       = int(os.getenv("IFC_MESH_STORE_GRACE_SEC", "3600"))
+IFC_MESH_STORE_GC_INTERVAL_SEC = int(os.getenv("IFC_MESH_STORE_GC_INTERVAL_SEC", "600"))
+
 # Spring Boot
 SPRING_BASE_URL = os.getenv("SPRING_BASE_URL", "http://localhost:8080")
@@ -0,0 +1,272 @@
+"""
+IFC 변환 산출물 저장소 (content-addressed, 로컬 디스크)
+
+GLB·메타데이터를 SHA-256 해시를 ID로 저장해 같은 내용은 한 번만 기록한다.
+base64-in-JSON 응답 대신 ID만 반환하고, 바이너리는 HTTP Range 지원 엔드포인트로 내려준다.
+
+디렉터리 구조:
+  {root}/ab/abcdef...   (해시 앞 2자리로 샤딩)
+
+보관 한도: 조회·재저장 시 mtime 을 갱신하고, gc() 가 ttl_sec 동안 쓰이지 않은 산출물을 지운 뒤
+남은 용량이 max_bytes 를 넘으면 오래 쓰이지 않은 순(LRU)으로 삭제한다 (0 이면 해당 한도 없음).
+put 계열이 gc_interval_sec 마다 자동 실행 (프로세스 간 표식 파일 mtime 으로 조정).
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from typing import Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+_ID_RE = re.compile(r"^[0-9a-f]{64}$")
+_CHUNK = 1024 * 1024
+_TMP_MAX_AGE_SEC = 24 * 3600   # 이보다 오래된 .tmp-* (중단된 쓰기) 는 gc 에서 삭제
+
+
+class ArtifactStore:
+    """SHA-256 content-addressed 파일 저장소."""
+
+    def __init__(self, root: str, max_bytes: int = 0, ttl_sec: int = 0, gc_interval_sec: int = 600):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.ttl_sec = ttl_sec
+        self.gc_interval_sec = gc_interval_sec
+        os.makedirs(root, exist_ok=True)
+
+    @staticmethod
+    def is_valid_id(artifact_id: str) -> bool:
+        return bool(_ID_RE.match(artifact_id or ""))
+
+    def _path_for(self, artifact_id: str) -> str:
+        return os.path.join(self.root, artifact_id[:2], artifact_id)
+
+    def path(self, artifact_id: str) -> Optional[str]:
+        """저장된 산출물 경로. 형식이 잘못됐거나 없으면 None."""
+        if not self.is_valid_id(artifact_id):
+            return None
+        p = self._path_for(artifact_id)
+        try:
+            os.utime(p)   # 마지막 사용 시각 → gc 의 TTL / LRU 기준
+        except OSError:
+            return None
+        return p if os.path.isfile(p) else None
+
+    def put(self, data: bytes) -> str:
+        """바이트를 저장하고 ID(sha256 hex) 반환. 이미 있으면 쓰지 않는다."""
+        artifact_id = hashlib.sha256(data).hexdigest()
+        dest = self._path_for(artifact_id)
+        self.maybe_gc()
+        if self._touch(dest):
+            return artifact_id
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        # 임시 파일에 쓴 뒤 rename — 동시 요청이 반쯤 쓰인 파일을 읽지 않도록
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(dest), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, dest)
+        except Exception:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+        return artifact_id
+
+    def put_file(self, src_path: str) -> str:
+        """파일을 저장소로 옮기고 ID 반환 (해시는 청크 단위로 계산 — 대용량 GLB 를 메모리에 올리지 않음).
+        src_path 는 이동되거나(신규) 삭제된다(중복)."""
+        h = hashlib.sha256()
+        with open(src_path, "rb") as f:
+            for chunk in iter(lambda: f.read(_CHUNK), b""):
+                h.update(chunk)
+        artifact_id = h.hexdigest()
+        dest = self._path_for(artifact_id)
+        self.maybe_gc()
+        if self._touch(dest):
+            os.unlink(src_path)
+            return artifact_id
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        try:
+            os.replace(src_path, dest)
+        except OSError:
+            # 다른 파일시스템 — 복사 후 rename 으로 원자성 유지
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(dest), prefix=".tmp-")
+            os.close(fd)
+            shutil.move(src_path, tmp)
+            os.replace(tmp, dest)
+        return artifact_id
+
+    def temp_path(self, suffix: str = "") -> str:
+        """put_file 로 옮길 산출물을 쓸 임시 경로 (같은 파일시스템 → rename 으로 이동)."""
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".tmp-", suffix=suffix)
+        os.close(fd)
+        return tmp
+
+    @staticmethod
+    def _touch(path: str) -> bool:
+        """이미 있는 산출물이면 mtime 갱신 후 True."""
+        try:
+            os.utime(path)
+            return True
+        except OSError:
+            return False
+
+    # ── 보관 한도 ────────────────────────────────────────────────────
+
+    def _scan(self) -> Iterator[tuple[str, int, float]]:
+        """(경로, 크기, mtime) — 샤드 디렉터리의 산출물만."""
+        for shard in os.scandir(self.root):
+            if not shard.is_dir() or len(shard.name) != 2:
+                continue
+            for entry in os.scandir(shard.path):
+                if not _ID_RE.match(entry.name):
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                yield entry.path, st.st_size, st.st_mtime
+
+    def _stale_temps(self) -> Iterator[str]:
+        cutoff = time.time() - _TMP_MAX_AGE_SEC
+        dirs = [self.root] + [e.path for e in os.scandir(self.root) if e.is_dir() and len(e.name) == 2]
+        for d in dirs:
+            for entry in os.scandir(d):
+                if not entry.name.startswith(".tmp-"):
+                    continue
+                try:
+                    if entry.stat().st_mtime < cutoff:
+                        yield entry.path
+                except OSError:
+                    continue
+
+    def gc(self) -> dict:
+        """TTL 경과 산출물 삭제 → 상한 초과분은 오래 쓰이지 않은 순 삭제 + 중단된 임시 파일 정리."""
+        cutoff = time.time() - self.ttl_sec if self.ttl_sec > 0 else None
+        kept, removed, freed = [], 0, 0
+        for path, size, mtime in self._scan():
+            if cutoff is not None and mtime < cutoff:
+                try:
+                    os.unlink(path)
+                    removed += 1
+                    freed += size
+                except OSError:
+                    pass
+            else:
+                kept.append((mtime, size, path))
+
+        total = sum(size for _, size, _ in kept)
+        if self.max_bytes > 0 and total > self.max_bytes:
+            for _, size, path in sorted(kept):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.unlink(path)
+                    removed += 1
+                    freed += size
+                    total -= size
+                except OSError:
+                    pass
+        for path in self._stale_temps():
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+        logger.info("[IFC Artifacts] GC: %d개 삭제 (%d bytes), 남은 용량 %d bytes", removed, freed, total)
+        return {"removed": removed, "freedBytes": freed, "bytes": total}
+
+    def maybe_gc(self) -> None:
+        """한도가 있고 마지막 GC 후 gc_interval_sec 가 지났으면 GC."""
+        if self.max_bytes <= 0 and self.ttl_sec <= 0:
+            return
+        marker = os.path.join(self.root, ".gc")
+        try:
+            if time.time() - os.stat(marker).st_mtime < self.gc_interval_sec:
+                return
+        except FileNotFoundError:
+            pass
+        with open(marker, "a"):
+            os.utime(marker)
+        try:
+            self.gc()
+        except OSError:
+            logger.warning("[IFC Artifacts] GC 실패", exc_info=True)
+
+    def stats(self) -> dict:
+        entries = total = 0
+        for _, size, _ in self._scan():
+            entries += 1
+            total += size
+        return {
+            "entries":  entries,
+            "bytes":    total,
+            "maxBytes": self.max_bytes,
+            "ttlSec":   self.ttl_sec,
+        }
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[tuple[int, int]]:
+    """HTTP Range 헤더 → (start, end) 포함 구간. 헤더가 없거나 다중 구간이면 None(전체 전송).
+    만족할 수 없는 구간이면 ValueError."""
+    if not header or not header.startswith("bytes="):
+        return None
+    spec = header[len("bytes="):].strip()
+    if "," in spec:
+        return None
+    start_s, _, end_s = spec.partition("-")
+    try:
+        if start_s == "":
+            # bytes=-N : 마지막 N바이트
+            length = int(end_s)
+            if length <= 0:
+                raise ValueError("empty suffix range")
+            start, end = max(size - length, 0), size - 1
+        else:
+            start = int(start_s)
+            end = int(end_s) if end_s else size - 1
+    except ValueError:
+        raise ValueError(f"invalid range: {header}")
+    end = min(end, size - 1)
+    if start >= size or start > end:
+        raise ValueError(f"unsatisfiable range: {header}")
+    return start, end
+
+
+def iter_file(path: str, start: int, end: int) -> Iterator[bytes]:
+    """파일의 [start, end] 구간을 청크 단위로 읽는다."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(_CHUNK, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+_store: Optional[ArtifactStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> ArtifactStore:
+    """설정(IFC_ARTIFACT_DIR) 기반 전역 저장소."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            from config.settings import (
+                IFC_ARTIFACT_DIR, IFC_ARTIFACT_MAX_BYTES, IFC_ARTIFACT_TTL_SEC, IFC_ARTIFACT_GC_INTERVAL_SEC,
+            )
+            _store = ArtifactStore(IFC_ARTIFACT_DIR, IFC_ARTIFACT_MAX_BYTES, IFC_ARTIFACT_TTL_SEC,
+                                   IFC_ARTIFACT_GC_INTERVAL_SEC)
+            logger.info("[IFC Artifacts] 저장소: %s (상한 %d bytes, 보관 %ds)",
+                        IFC_ARTIFACT_DIR, IFC_ARTIFACT_MAX_BYTES, IFC_ARTIFACT_TTL_SEC)
+        return _store
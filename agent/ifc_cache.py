@@ -0,0 +1,260 @@
+"""
+IFC 변환 캐시 (content-addressed, 디스크 영속)
+
+같은 IFC(재시도·다른 프로젝트로 재가져오기·스케일 재지정)를 다시 올려도
+ifcopenshell 파이프라인을 재실행하지 않도록, SHA-256(IFC 바이트) + user_scale 을 키로
+삼각분할 결과·부재 메타데이터(tessellate_ifc 반환값)를 저장한다.
+히트 시에는 project_id 에 의존하는 조립 단계(assemble_glb)만 다시 수행한다.
+
+- 저장 형식은 pickle 없는 npz: 구조는 JSON(meta), numpy 배열은 dtype 별로 이어 붙인 blob 에
+  (dtype, offset, shape) 참조로 기록 — 캐시 디렉터리에 쓸 수 있어도 코드 실행으로 이어지지 않는다
+- 변환 작업 자식 프로세스도 같은 디렉터리를 쓰므로 인덱스를 메모리에 두지 않는다.
+  조회는 파일 존재로, 용량 상한(max_bytes) LRU 삭제는 파일 잠금 아래 디렉터리 스캔(mtime 순)으로 판정
+- 히트/미스 카운터는 stats() 로 조회 (프로세스별)
+"""
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_CHUNK = 1024 * 1024
+_SUFFIX = ".npz"
+_FORMAT = 1
+_MARKERS = ("__nd__", "__tuple__", "__dict__")
+
+
+def file_sha256(path: str) -> str:
+    """파일 SHA-256 (청크 단위로 읽어 메모리 사용 일정)."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+# ── 직렬화 (JSON + dtype 별 배열 blob) ─────────────────────────────────
+
+def _encode(value, arrays: list):
+    """JSON 호환 구조로 변환. numpy 배열은 arrays 에 모으고 {"__nd__": i} 로 참조."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, np.ndarray):
+        if value.dtype.hasobject:
+            raise TypeError("object dtype 배열은 캐시할 수 없습니다")
+        arrays.append(value)
+        return {"__nd__": len(arrays) - 1}
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, tuple):
+        return {"__tuple__": [_encode(v, arrays) for v in value]}
+    if isinstance(value, list):
+        return [_encode(v, arrays) for v in value]
+    if isinstance(value, dict):
+        if all(isinstance(k, str) for k in value) and not any(m in value for m in _MARKERS):
+            return {k: _encode(v, arrays) for k, v in value.items()}
+        return {"__dict__": [[_encode(k, arrays), _encode(v, arrays)] for k, v in value.items()]}
+    raise TypeError(f"캐시할 수 없는 타입: {type(value).__name__}")
+
+
+def _decode(value, refs: list):
+    if isinstance(value, list):
+        return [_decode(v, refs) for v in value]
+    if not isinstance(value, dict):
+        return value
+    if "__nd__" in value:
+        return refs[value["__nd__"]]
+    if "__tuple__" in value:
+        return tuple(_decode(v, refs) for v in value["__tuple__"])
+    if "__dict__" in value:
+        return {_decode(k, refs): _decode(v, refs) for k, v in value["__dict__"]}
+    return {k: _decode(v, refs) for k, v in value.items()}
+
+
+def dump_npz(f, value: dict) -> None:
+    """dict(배열·tuple 포함) → pickle 없는 npz (f: 쓰기 가능한 바이너리 파일)."""
+    arrays: list[np.ndarray] = []
+    tree = _encode(value, arrays)
+    groups: dict[str, list[np.ndarray]] = {}
+    sizes: dict[str, int] = {}
+    refs = []
+    for arr in arrays:
+        dt = arr.dtype.str
+        offset = sizes.get(dt, 0)
+        groups.setdefault(dt, []).append(arr.ravel())
+        sizes[dt] = offset + arr.size
+        refs.append([dt, offset, list(arr.shape)])
+    dtypes = list(groups)
+    meta = {"format": _FORMAT, "dtypes": dtypes, "refs": refs, "tree": tree}
+    blobs = {f"b{i}": np.concatenate(groups[dt]) for i, dt in enumerate(dtypes)}
+    np.savez(f, meta=np.frombuffer(json.dumps(meta, ensure_ascii=False).encode("utf-8"), np.uint8),
+             **blobs)
+
+
+def load_npz(path: str) -> dict:
+    """dump_npz 로 기록한 파일 읽기 (allow_pickle=False)."""
+    with np.load(path, allow_pickle=False) as z:
+        meta = json.loads(z["meta"].tobytes().decode("utf-8"))
+        if meta.get("format") != _FORMAT:
+            raise ValueError(f"지원하지 않는 캐시 형식: {meta.get('format')}")
+        blobs = {dt: z[f"b{i}"] for i, dt in enumerate(meta["dtypes"])}
+    refs = []
+    for dt, offset, shape in meta["refs"]:
+        size = int(np.prod(shape, dtype=np.int64))
+        refs.append(blobs[dt][offset:offset + size].reshape(shape))
+    return _decode(meta["tree"], refs)
+
+
+class ConversionCache:
+    """삼각분할 결과 디스크 캐시 — 용량 기반 LRU (여러 프로세스가 같은 디렉터리 공유)."""
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # 다른 사용자가 미리 만들어 둔 디렉터리를 쓰지 않도록 소유자 전용(0700)으로 생성
+        os.makedirs(root, mode=0o700, exist_ok=True)
+        for name in os.listdir(root):
+            if name.endswith(".pkl"):   # 이전 pickle 형식 항목 — 읽지 않고 제거
+                try:
+                    os.unlink(os.path.join(root, name))
+                except OSError:
+                    pass
+
+    # ── 디렉터리 ─────────────────────────────────────────────────────
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}{_SUFFIX}")
+
+    @contextmanager
+    def _dir_lock(self) -> Iterator[None]:
+        """프로세스 간 배타 잠금 (저장·LRU 삭제 구간)."""
+        with self._lock, open(os.path.join(self.root, ".lock"), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _scan(self) -> list[tuple[float, str, int]]:
+        """(mtime, 경로, 크기) — 오래된 순."""
+        found = []
+        for entry in os.scandir(self.root):
+            if not entry.name.endswith(_SUFFIX):
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            found.append((st.st_mtime, entry.path, st.st_size))
+        return sorted(found)
+
+    @staticmethod
+    def key(ifc_sha256: str, user_scale: float, optimize: bool = False) -> str:
+        variant = f"{ifc_sha256}:{float(user_scale)!r}" + (":meshopt" if optimize else "")
+        return hashlib.sha256(variant.encode()).hexdigest()
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(size for _, _, size in self._scan())
+
+    # ── 조회 / 저장 ──────────────────────────────────────────────────
+
+    def get(self, key: str) -> Optional[dict]:
+        path = self._path(key)
+        try:
+            value = load_npz(path)
+            os.utime(path)  # mtime 갱신 → 모든 프로세스가 보는 LRU 순서
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        except Exception:
+            logger.warning("[IFC Cache] 항목 읽기 실패 — 삭제: %s", key, exc_info=True)
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def put(self, key: str, value: dict) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                dump_npz(f, value)
+            size = os.path.getsize(tmp)
+            if size > self.max_bytes:
+                logger.info("[IFC Cache] 항목 크기 %d > 상한 %d — 저장 생략", size, self.max_bytes)
+                os.unlink(tmp)
+                return
+            with self._dir_lock():
+                os.replace(tmp, self._path(key))
+                self._evict()
+        except Exception:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            logger.warning("[IFC Cache] 항목 저장 실패: %s", key, exc_info=True)
+
+    def _evict(self) -> None:
+        """디렉터리 스캔 기준 LRU 삭제 (_dir_lock 보유 중 호출)."""
+        entries = self._scan()
+        total = sum(size for _, _, size in entries)
+        for _, path, size in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            logger.info("[IFC Cache] LRU 삭제: %s (%d bytes)", os.path.basename(path), size)
+
+    def stats(self) -> dict:
+        entries = self._scan()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits":     self.hits,
+                "misses":   self.misses,
+                "hitRatio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "entries":  len(entries),
+                "bytes":    sum(size for _, _, size in entries),
+                "maxBytes": self.max_bytes,
+            }
+
+
+_cache: Optional[ConversionCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> Optional[ConversionCache]:
+    """설정(IFC_CACHE_DIR / IFC_CACHE_MAX_BYTES) 기반 전역 캐시. 상한이 0이면 비활성(None)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            from config.settings import IFC_CACHE_DIR, IFC_CACHE_MAX_BYTES
+            if IFC_CACHE_MAX_BYTES <= 0:
+                return None
+            _cache = ConversionCache(IFC_CACHE_DIR, IFC_CACHE_MAX_BYTES)
+            logger.info("[IFC Cache] 저장소: %s (상한 %d bytes, 항목 %d개)",
+                        IFC_CACHE_DIR, IFC_CACHE_MAX_BYTES, _cache.stats()["entries"])
+        return _cache
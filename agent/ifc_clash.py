@@ -0,0 +1,530 @@
+"""
+IFC 부재 간섭(clash) 검출 — broad phase + narrow phase
+
+Test 탭 충돌 로그는 브라우저가 우연히 감지한 것만 남는다. 이 모듈은 변환기가 이미 가진
+부재 형상(tessellate_ifc 의 geoms)으로 서버에서 모델 전체 간섭을 검사한다.
+
+  broad phase   — 부재 AABB sort-and-sweep (X축 정렬 후 Y/Z 겹침 필터, numpy 일괄)
+  narrow phase  — 후보 부재 쌍의 삼각형 중 상대 bbox 와 겹치는 것만 골라 교차곱,
+                  삼각형 AABB 필터 후 Möller(1997) 삼각형-삼각형 교차 판정을 벡터화
+  volume phase — 표면 교차가 없는 후보 쌍 중 AABB 겹침이 모든 축에서 tolerance 를 넘는 것만
+                  1) 동일 형상(정점 집합 일치) → duplicate
+                  2) 한쪽 정점·중심이 상대 메시 내부(parity ray 3방향 다수결) → containment
+                  3) 겹침 상자 중심·양쪽 중심이 두 메시 모두의 내부 → overlap (동일 평면 공유 겹침)
+                  내부 판정점은 표면에서 tolerance 넘게 떨어져 있어야 한다.
+  모드
+    hard       — 서로의 평면을 양쪽으로 tolerance 넘게 관통하는 삼각형 쌍(cause=surface) 또는
+                 체적 겹침(cause=duplicate/containment/overlap)이 있으면 간섭.
+                 면이 맞닿기만 한 부재(벽-슬래브 접합 등)는 관통 깊이·겹침 두께 0 이라 제외된다.
+    clearance  — hard 간섭 + 최소 거리 < clearance 인 근접 부재.
+                 거리는 정점-삼각형 거리의 최솟값 (모서리-모서리 최근접은 근사).
+
+삼각형 쌍은 _TRI_PAIR_CAP 단위로 나눠 처리하여 메모리가 모델 크기와 무관하게 제한된다.
+결과는 모델 hash(IFC SHA-256) + 검사 조건 키로 디스크에 캐시 (project_clashes).
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MODES = ("hard", "clearance")
+_PAIR_TRI_BUDGET = 4_000_000   # 한 번에 펼칠 (부재 쌍 × 부재 삼각형) 수
+_TRI_PAIR_CAP = 1_000_000      # 한 번에 판정할 삼각형 쌍 수
+_SWEEP_CHUNK = 4096
+_EPS = 1e-12
+_CACHE_VERSION = 2
+# point-in-mesh parity ray 방향 — 축·대각선과 어긋나게 골라 모서리·정점 통과를 피한다 (3방향 다수결)
+_RAY_DIRS = np.array([
+    [0.2137, 0.6194, 0.7554],
+    [-0.6912, 0.3371, 0.6392],
+    [0.4423, -0.8057, 0.3941],
+])
+_RAY_DIRS /= np.linalg.norm(_RAY_DIRS, axis=1)[:, None]
+
+
+def _ragged_arange(counts: np.ndarray) -> np.ndarray:
+    """[0..c0-1, 0..c1-1, ...] — 그룹별 0 부터 시작하는 연번."""
+    counts = np.asarray(counts, dtype=np.int64)
+    total = int(counts.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    return np.arange(total, dtype=np.int64) - np.repeat(np.cumsum(counts) - counts, counts)
+
+
+# ── broad phase ──────────────────────────────────────────────────────
+
+def broad_phase(lo: np.ndarray, hi: np.ndarray, margin: float = 0.0) -> np.ndarray:
+    """AABB sort-and-sweep. margin 이내로 떨어진 상자도 겹침으로 본다. 반환: (K, 2) 부재 인덱스 쌍."""
+    n = len(lo)
+    if n < 2:
+        return np.zeros((0, 2), dtype=np.int64)
+    lo = lo - margin / 2.0
+    hi = hi + margin / 2.0
+    order = np.argsort(lo[:, 0], kind="stable")
+    slo, shi = lo[order], hi[order]
+    # 정렬 순서상 i 뒤에서 min_x 가 max_x_i 이하인 상자까지가 X 겹침 후보
+    ends = np.searchsorted(slo[:, 0], shi[:, 0], side="right")
+
+    out = []
+    for s in range(0, n, _SWEEP_CHUNK):
+        i_blk = np.arange(s, min(s + _SWEEP_CHUNK, n))
+        cnt = np.maximum(ends[i_blk] - i_blk - 1, 0)
+        i = np.repeat(i_blk, cnt)
+        j = i + 1 + _ragged_arange(cnt)
+        ok = np.all((slo[j, 1:] <= shi[i, 1:]) & (slo[i, 1:] <= shi[j, 1:]), axis=1)
+        out.append(np.column_stack([order[i[ok]], order[j[ok]]]))
+    return np.concatenate(out) if out else np.zeros((0, 2), dtype=np.int64)
+
+
+# ── narrow phase 기본 연산 ───────────────────────────────────────────
+
+def _plane_distances(T: np.ndarray, P: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """삼각형 T 평면(단위 노말)에 대한 P 세 정점의 부호 거리. 반환: (노말, 거리 (n,3))."""
+    nrm = np.cross(T[:, 1] - T[:, 0], T[:, 2] - T[:, 0])
+    length = np.linalg.norm(nrm, axis=1)
+    nrm = nrm / np.maximum(length, _EPS)[:, None]
+    dist = np.einsum("nkj,nj->nk", P - T[:, None, 0], nrm)
+    dist[length <= _EPS] = 0.0   # 퇴화 삼각형은 관통 불가로 처리
+    return nrm, dist
+
+
+def _line_interval(p: np.ndarray, d: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """교차선 위로 투영한 정점 좌표 p 와 상대 평면 거리 d → 삼각형이 교차선에서 차지하는 구간."""
+    lo = np.full(len(p), np.inf)
+    hi = np.full(len(p), -np.inf)
+    for a, b in ((0, 1), (1, 2), (2, 0)):
+        da, db = d[:, a], d[:, b]
+        cross = da * db < 0
+        t = p[:, a] + (p[:, b] - p[:, a]) * da / np.where(cross, da - db, 1.0)
+        lo = np.where(cross, np.minimum(lo, t), lo)
+        hi = np.where(cross, np.maximum(hi, t), hi)
+    on_plane = np.abs(d) <= 1e-9
+    for k in range(3):
+        lo = np.where(on_plane[:, k], np.minimum(lo, p[:, k]), lo)
+        hi = np.where(on_plane[:, k], np.maximum(hi, p[:, k]), hi)
+    return lo, hi
+
+
+def tri_tri_penetration(V: np.ndarray, U: np.ndarray, tolerance: float
+                        ) -> tuple[np.ndarray, np.ndarray]:
+    """
+    삼각형 쌍 (n,3,3) 교차 판정 (Möller 구간 겹침).
+    각 삼각형이 상대 평면을 양쪽으로 tolerance 넘게 관통해야 교차로 본다.
+    반환: (교차 여부 (n,), 관통 깊이 추정 (n,))
+    """
+    n2, dv = _plane_distances(U, V)
+    n1, du = _plane_distances(V, U)
+    pen_v = np.minimum(dv.max(axis=1), -dv.min(axis=1))
+    pen_u = np.minimum(du.max(axis=1), -du.min(axis=1))
+    hit = (pen_v > tolerance) & (pen_u > tolerance)
+
+    D = np.cross(n1, n2)
+    hit &= np.einsum("ij,ij->i", D, D) > _EPS      # 동일 평면은 접촉으로 간주
+    pv = np.einsum("nkj,nj->nk", V, D)
+    pu = np.einsum("nkj,nj->nk", U, D)
+    lo1, hi1 = _line_interval(pv, dv)
+    lo2, hi2 = _line_interval(pu, du)
+    hit &= np.minimum(hi1, hi2) > np.maximum(lo1, lo2)
+    return hit, np.minimum(pen_v, pen_u)
+
+
+def _segment_distance(P: np.ndarray, A: np.ndarray, B: np.ndarray) -> np.ndarray:
+    AB = B - A
+    t = np.einsum("ij,ij->i", P - A, AB) / np.maximum(np.einsum("ij,ij->i", AB, AB), _EPS)
+    closest = A + np.clip(t, 0.0, 1.0)[:, None] * AB
+    return np.linalg.norm(P - closest, axis=1)
+
+
+def point_triangle_distance(P: np.ndarray, T: np.ndarray) -> np.ndarray:
+    """점 P (n,3) ↔ 삼각형 T (n,3,3) 최소 거리."""
+    a, b, c = T[:, 0], T[:, 1], T[:, 2]
+    nrm = np.cross(b - a, c - a)
+    len2 = np.einsum("ij,ij->i", nrm, nrm)
+    inside = len2 > _EPS
+    for u, v in ((a, b), (b, c), (c, a)):
+        inside &= np.einsum("ij,ij->i", np.cross(v - u, P - u), nrm) >= 0
+    plane = np.abs(np.einsum("ij,ij->i", P - a, nrm)) / np.sqrt(np.maximum(len2, _EPS))
+    edge = np.minimum(np.minimum(_segment_distance(P, a, b), _segment_distance(P, b, c)),
+                      _segment_distance(P, c, a))
+    return np.where(inside, plane, edge)
+
+
+def tri_tri_distance(V: np.ndarray, U: np.ndarray) -> np.ndarray:
+    """삼각형 쌍 최소 거리 근사 — 양방향 정점-삼각형 거리의 최솟값."""
+    n = len(V)
+    best = np.full(n, np.inf)
+    for k in range(3):
+        best = np.minimum(best, point_triangle_distance(V[:, k], U))
+        best = np.minimum(best, point_triangle_distance(U[:, k], V))
+    return best
+
+
+# ── 메시 테이블 + narrow phase ───────────────────────────────────────
+
+class _MeshTable:
+    """부재 형상을 전역 삼각형 배열로 연결 (부재 i 의 삼각형 = start[i] : start[i] + count[i])."""
+
+    def __init__(self, geoms: list[dict]):
+        self.count = np.array([len(g["idx"]) // 3 for g in geoms], dtype=np.int64)
+        self.start = np.cumsum(self.count) - self.count
+        if geoms:
+            self.tris = np.concatenate([
+                np.asarray(g["pos"], dtype=np.float32)[np.asarray(g["idx"]).reshape(-1, 3)]
+                for g in geoms
+            ])
+        else:
+            self.tris = np.zeros((0, 3, 3), dtype=np.float32)
+        self.tri_lo = self.tris.min(axis=1)
+        self.tri_hi = self.tris.max(axis=1)
+        self.lo = np.array([g["bbox_min"] for g in geoms], dtype=np.float64).reshape(-1, 3)
+        self.hi = np.array([g["bbox_max"] for g in geoms], dtype=np.float64).reshape(-1, 3)
+
+    def _side(self, e_self: np.ndarray, e_other: np.ndarray, margin: float
+              ) -> tuple[np.ndarray, np.ndarray]:
+        """부재 쌍마다 e_self 삼각형 중 e_other bbox(+margin) 와 겹치는 것. 반환: (삼각형, 쌍 번호) — 쌍 순."""
+        cnt = self.count[e_self]
+        pair = np.repeat(np.arange(len(e_self)), cnt)
+        tri = np.repeat(self.start[e_self], cnt) + _ragged_arange(cnt)
+        other = e_other[pair]
+        ok = np.all((self.tri_lo[tri] <= self.hi[other] + margin)
+                    & (self.tri_hi[tri] >= self.lo[other] - margin), axis=1)
+        return tri[ok], pair[ok]
+
+    def tri_pairs(self, ea: np.ndarray, eb: np.ndarray, margin: float):
+        """부재 쌍 (ea[k], eb[k]) 의 후보 삼각형 쌍을 _TRI_PAIR_CAP 단위로 yield: (A 삼각형, B 삼각형, 쌍 번호)."""
+        ta, pa = self._side(ea, eb, margin)
+        tb, pb = self._side(eb, ea, margin)
+        fb = np.bincount(pb, minlength=len(ea))
+        b_off = np.cumsum(fb) - fb
+        reps = fb[pa]
+        cum = np.cumsum(reps)
+        start = 0
+        while start < len(ta):
+            base = int(cum[start - 1]) if start else 0
+            end = max(int(np.searchsorted(cum, base + _TRI_PAIR_CAP, side="right")), start + 1)
+            r = reps[start:end]
+            A = np.repeat(ta[start:end], r)
+            P = np.repeat(pa[start:end], r)
+            B = tb[b_off[P] + _ragged_arange(r)]
+            ok = np.all((self.tri_lo[A] <= self.tri_hi[B] + margin)
+                        & (self.tri_lo[B] <= self.tri_hi[A] + margin), axis=1)
+            yield A[ok], B[ok], P[ok]
+            start = end
+
+
+def _budget_slices(cost: np.ndarray, budget: int):
+    """cost 누적합이 budget 을 넘지 않도록 나눈 (start, end) 구간 (최소 1개씩)."""
+    cum = np.cumsum(cost)
+    start = 0
+    while start < len(cost):
+        base = int(cum[start - 1]) if start else 0
+        end = max(int(np.searchsorted(cum, base + budget, side="right")), start + 1)
+        yield start, end
+        start = end
+
+
+def _pair_chunks(mesh: _MeshTable, pairs: np.ndarray):
+    """펼칠 삼각형 수가 _PAIR_TRI_BUDGET 을 넘지 않도록 부재 쌍을 나눈다."""
+    cost = mesh.count[pairs[:, 0]] + mesh.count[pairs[:, 1]]
+    for start, end in _budget_slices(cost, _PAIR_TRI_BUDGET):
+        yield pairs[start:end]
+
+
+# ── volume phase (표면 교차 없는 겹침) ────────────────────────────────
+
+def _ray_crossings(Q: np.ndarray, d: np.ndarray, T: np.ndarray) -> np.ndarray:
+    """점 Q (n,3) 에서 방향 d 반직선이 삼각형 T (n,3,3) 를 지나는지 (Möller–Trumbore)."""
+    e1 = T[:, 1] - T[:, 0]
+    e2 = T[:, 2] - T[:, 0]
+    p = np.cross(d, e2)
+    det = np.einsum("ij,ij->i", e1, p)
+    ok = np.abs(det) > _EPS
+    inv = 1.0 / np.where(ok, det, 1.0)
+    s = Q - T[:, 0]
+    u = np.einsum("ij,ij->i", s, p) * inv
+    q = np.cross(s, e1)
+    v = (q @ d) * inv
+    t = np.einsum("ij,ij->i", e2, q) * inv
+    return ok & (u >= 0.0) & (v >= 0.0) & (u + v <= 1.0) & (t > _EPS)
+
+
+def points_in_mesh(mesh: _MeshTable, elems: np.ndarray, points: np.ndarray
+                   ) -> tuple[np.ndarray, np.ndarray]:
+    """점 points[k] 가 부재 elems[k] 메시 내부인지 + 표면까지 최소 거리. 반환: (inside (n,), dist (n,))."""
+    n = len(points)
+    inside = np.zeros(n, dtype=bool)
+    dist = np.full(n, np.inf)
+    cnt = mesh.count[elems]
+    for s, e in _budget_slices(cnt, _TRI_PAIR_CAP):
+        c = cnt[s:e]
+        pid = np.repeat(np.arange(e - s), c)
+        tri = np.repeat(mesh.start[elems[s:e]], c) + _ragged_arange(c)
+        T = mesh.tris[tri].astype(np.float64)
+        Q = points[s:e][pid]
+        votes = np.zeros(e - s, dtype=np.int64)
+        for d in _RAY_DIRS:
+            votes += np.bincount(pid[_ray_crossings(Q, d, T)], minlength=e - s) % 2
+        inside[s:e] = votes >= 2
+        np.minimum.at(dist[s:e], pid, point_triangle_distance(Q, T))
+    return inside, dist
+
+
+def _same_geometry(mesh: _MeshTable, a: int, b: int, tolerance: float) -> bool:
+    """두 부재 정점 집합이 tolerance 이내로 일치하는지 (삼각분할 순서 무관)."""
+    va = mesh.tris[mesh.start[a]:mesh.start[a] + mesh.count[a]].reshape(-1, 3).astype(np.float64)
+    vb = mesh.tris[mesh.start[b]:mesh.start[b] + mesh.count[b]].reshape(-1, 3).astype(np.float64)
+    step = max(tolerance, 1e-6)
+    va = np.unique(np.round(va / step), axis=0)
+    vb = np.unique(np.round(vb / step), axis=0)
+    return va.shape == vb.shape and bool(np.all(np.abs(va - vb) <= 1.0))
+
+
+def volume_overlaps(mesh: _MeshTable, pairs: np.ndarray, candidates: np.ndarray,
+                    tolerance: float) -> dict[int, tuple[str, float, np.ndarray]]:
+    """
+    표면 교차가 없는 후보 쌍(candidates: pairs 행 번호)의 체적 겹침.
+    반환: {쌍 번호: (cause, 겹침 두께 — AABB 교집합 최소 변, 대표점)}
+    """
+    a, b = pairs[candidates, 0], pairs[candidates, 1]
+    ilo = np.maximum(mesh.lo[a], mesh.lo[b])
+    ihi = np.minimum(mesh.hi[a], mesh.hi[b])
+    thick = (ihi - ilo).min(axis=1)
+    keep = (thick > tolerance) & (mesh.count[a] > 0) & (mesh.count[b] > 0)
+    ks, a, b, ilo, ihi, thick = candidates[keep], a[keep], b[keep], ilo[keep], ihi[keep], thick[keep]
+    found: dict[int, tuple[str, float, np.ndarray]] = {}
+    if len(ks) == 0:
+        return found
+
+    # 1) 동일 형상 — 삼각형 수·bbox 가 같은 쌍만 정점 집합 비교
+    same = ((mesh.count[a] == mesh.count[b])
+            & np.all(np.abs(mesh.lo[a] - mesh.lo[b]) <= tolerance, axis=1)
+            & np.all(np.abs(mesh.hi[a] - mesh.hi[b]) <= tolerance, axis=1))
+    for i in np.flatnonzero(same):
+        if _same_geometry(mesh, int(a[i]), int(b[i]), tolerance):
+            found[int(ks[i])] = ("duplicate", float(thick[i]), (ilo[i] + ihi[i]) / 2.0)
+    rest = np.array([i for i in range(len(ks)) if int(ks[i]) not in found], dtype=np.int64)
+    if len(rest) == 0:
+        return found
+
+    # 2)·3) 판정점: A 첫 정점, B 첫 정점, A 중심, B 중심, 겹침 상자 중심
+    tri_c = mesh.tris.mean(axis=1).astype(np.float64)
+    csum = np.concatenate([np.zeros((1, 3)), np.cumsum(tri_c, axis=0)])
+
+    def centroid(e: np.ndarray) -> np.ndarray:
+        return (csum[mesh.start[e] + mesh.count[e]] - csum[mesh.start[e]]) / mesh.count[e][:, None]
+
+    ra, rb = a[rest], b[rest]
+    probes = np.stack([
+        mesh.tris[mesh.start[ra], 0].astype(np.float64),
+        mesh.tris[mesh.start[rb], 0].astype(np.float64),
+        centroid(ra), centroid(rb),
+        (ilo[rest] + ihi[rest]) / 2.0,
+    ], axis=1)                                      # (m, 5, 3)
+    n_probe = probes.shape[1]
+    pts = probes.reshape(-1, 3)
+    in_a, d_a = points_in_mesh(mesh, np.repeat(ra, n_probe), pts)
+    in_b, d_b = points_in_mesh(mesh, np.repeat(rb, n_probe), pts)
+    ok_a = (in_a & (d_a > tolerance)).reshape(-1, n_probe)
+    ok_b = (in_b & (d_b > tolerance)).reshape(-1, n_probe)
+    ok_a[:, 0] = True                               # A 정점은 A 표면 위 — B 내부 여부만 본다
+    ok_b[:, 1] = True
+    ok = ok_a & ok_b
+    for r in np.flatnonzero(ok.any(axis=1)):
+        j = int(np.argmax(ok[r]))
+        cause = "containment" if j < 2 else "overlap"
+        i = rest[r]
+        found[int(ks[i])] = (cause, float(thick[i]), probes[r, j])
+    return found
+
+
+def detect_clashes(geoms: list[dict], mode: str = "hard", tolerance: float = 0.01,
+                   clearance: float = 0.05, progress=None) -> dict:
+    """
+    부재 간섭 검출 (geoms: tessellate_ifc 결과, IFC 월드 좌표).
+
+    반환: {candidatePairs, clashes: [{a, b, kind, cause?, depth|distance, point, triangles?}]}
+      a / b 는 geoms 인덱스, point 는 IFC 월드 좌표.
+      hard 의 cause: surface(표면 관통, depth=관통 깊이) / duplicate / containment / overlap
+      (체적 겹침, depth=AABB 교집합 최소 변).
+      hard 는 관통 깊이 내림차순, clearance 는 그 뒤에 거리 오름차순.
+    """
+    if mode not in MODES:
+        raise ValueError(f"mode 는 {MODES} 중 하나여야 합니다: {mode}")
+    margin = clearance if mode == "clearance" else 0.0
+    mesh = _MeshTable(geoms)
+    pairs = broad_phase(mesh.lo, mesh.hi, margin)
+    n_pairs = len(pairs)
+
+    depth = np.zeros(n_pairs)                 # 쌍별 최대 관통 깊이
+    hits = np.zeros(n_pairs, dtype=np.int64)  # 쌍별 교차 삼각형 쌍 수
+    point = np.zeros((n_pairs, 3))            # 쌍별 교차 삼각형 중심 합 (평균용)
+    dist = np.full(n_pairs, np.inf)
+    near = np.zeros((n_pairs, 3))
+
+    offset = 0
+    for chunk in _pair_chunks(mesh, pairs):
+        if progress is not None:
+            progress("clash", offset, n_pairs)
+        for A, B, P in mesh.tri_pairs(chunk[:, 0], chunk[:, 1], margin):
+            if len(A) == 0:
+                continue
+            V = mesh.tris[A].astype(np.float64)
+            U = mesh.tris[B].astype(np.float64)
+            gp = P + offset
+            hit, pen = tri_tri_penetration(V, U, tolerance)
+            if hit.any():
+                h = gp[hit]
+                np.add.at(hits, h, 1)
+                np.maximum.at(depth, h, pen[hit])
+                np.add.at(point, h, (V[hit].mean(axis=1) + U[hit].mean(axis=1)) / 2.0)
+            if mode == "clearance":
+                d = tri_tri_distance(V, U)
+                order = np.lexsort((d, gp))
+                first = order[np.r_[True, gp[order][1:] != gp[order][:-1]]]
+                better = d[first] < dist[gp[first]]
+                upd = first[better]
+                dist[gp[upd]] = d[upd]
+                near[gp[upd]] = (V[upd].mean(axis=1) + U[upd].mean(axis=1)) / 2.0
+        offset += len(chunk)
+    volume = volume_overlaps(mesh, pairs, np.flatnonzero(hits == 0), tolerance)
+    if progress is not None:
+        progress("clash", n_pairs, n_pairs)
+
+    clashes: list[dict] = []
+    for k in np.flatnonzero(hits):
+        clashes.append({
+            "a": int(pairs[k, 0]), "b": int(pairs[k, 1]), "kind": "hard", "cause": "surface",
+            "depth": round(float(depth[k]), 4),
+            "point": [round(float(v), 4) for v in point[k] / hits[k]],
+            "triangles": int(hits[k]),
+        })
+    for k, (cause, thick, pt) in volume.items():
+        clashes.append({
+            "a": int(pairs[k, 0]), "b": int(pairs[k, 1]), "kind": "hard", "cause": cause,
+            "depth": round(thick, 4),
+            "point": [round(float(v), 4) for v in pt],
+            "triangles": 0,
+        })
+    clashes.sort(key=lambda c: -c["depth"])
+    if mode == "clearance":
+        close = [k for k in np.flatnonzero((hits == 0) & (dist < clearance)) if int(k) not in volume]
+        close.sort(key=lambda k: dist[k])
+        for k in close:
+            clashes.append({
+                "a": int(pairs[k, 0]), "b": int(pairs[k, 1]), "kind": "clearance",
+                "distance": round(float(dist[k]), 4),
+                "point": [round(float(v), 4) for v in near[k]],
+            })
+    return {"candidatePairs": n_pairs, "clashes": clashes}
+
+
+# ── 프로젝트 단위 실행 + 결과 캐시 ───────────────────────────────────
+
+def _cache_path(cache_dir: str, key: str) -> str:
+    return os.path.join(cache_dir, f"{key}.json")
+
+
+def project_clashes(project_id: str, mode: str = "hard", tolerance: float = 0.01,
+                    clearance: float = 0.05, limit: Optional[int] = None,
+                    num_workers: int = 1) -> dict:
+    """
+    상주 모델 저장소(ifc_models)에 보관된 프로젝트 IFC 의 간섭 검출.
+
+    삼각분할은 변환 캐시(ifc_cache)를 재사용하고, 결과는 (IFC SHA-256, scale, 검사 조건) 키로
+    IFC_CACHE_DIR/clash 에 저장해 같은 모델 재조회 시 즉시 반환한다.
+    좌표(point)는 변환 GLB 와 같은 장면 좌표, elementId 는 변환 결과와 같은 형식.
+    """
+    from ifc_cache import file_sha256, get_cache
+    from ifc_models import get_model_server, ModelNotFound
+    from config.settings import IFC_CACHE_DIR
+
+    if mode not in MODES:
+        raise ValueError(f"mode 는 {MODES} 중 하나여야 합니다: {mode}")
+    server = get_model_server()
+    if server is None:
+        raise ModelNotFound("상주 모델 서버 비활성 (IFC_RESIDENT_MODELS=0)")
+    ifc_path, user_scale = server.model_file(project_id)
+    sha = file_sha256(ifc_path)
+
+    cache_dir = os.path.join(IFC_CACHE_DIR, "clash")
+    os.makedirs(cache_dir, exist_ok=True)
+    variant = (f"v{_CACHE_VERSION}:{sha}:{user_scale!r}:{project_id}:{mode}:"
+               f"{float(tolerance)!r}:{float(clearance)!r}")
+    key = hashlib.sha256(variant.encode()).hexdigest()
+    path = _cache_path(cache_dir, key)
+    result = None
+    if os.path.exists(path):
+        try:
+            with open(path, encoding="utf-8") as f:
+                result = json.load(f)
+            result["cacheHit"] = True
+        except (OSError, ValueError):
+            result = None
+
+    if result is None:
+        from ifc_converter import _scene_origin, tessellate_ifc
+        t0 = time.monotonic()
+        cache = get_cache()
+        tess = None
+        if cache is not None:
+            tess = cache.get(cache.key(sha, user_scale))
+        if tess is None:
+            tess = tessellate_ifc(ifc_path, user_scale=user_scale, num_workers=num_workers)
+            if cache is not None:
+                cache.put(cache.key(sha, user_scale), tess)
+        geoms = tess["geoms"]
+        found = detect_clashes(geoms, mode=mode, tolerance=tolerance, clearance=clearance)
+
+        origin = np.zeros(3)
+        if geoms:
+            all_min = np.min([g["bbox_min"] for g in geoms], axis=0)
+            all_max = np.max([g["bbox_max"] for g in geoms], axis=0)
+            origin = np.array(_scene_origin(all_min, all_max, tess["storeys"]))
+
+        def _ref(i: int) -> dict:
+            g = geoms[i]
+            express_id = g["express_id"]
+            return {
+                "elementId":   f"IFC-{express_id}-{project_id}" if project_id else f"IFC-{express_id}",
+                "globalId":    g["global_id"],
+                "elementType": g["our_type"],
+                "ifcName":     g["ifc_name"],
+                "storey":      g["spatial"].get("storey"),
+            }
+
+        clashes = []
+        for c in found["clashes"]:
+            c["a"], c["b"] = _ref(c["a"]), _ref(c["b"])
+            c["point"] = [round(v - o, 4) for v, o in zip(c["point"], origin)]
+            clashes.append(c)
+        result = {
+            "modelSha256":    sha,
+            "mode":           mode,
+            "tolerance":      tolerance,
+            "clearance":      clearance if mode == "clearance" else None,
+            "elements":       len(geoms),
+            "candidatePairs": found["candidatePairs"],
+            "clashCount":     len(clashes),
+            "clashes":        clashes,
+            "elapsedSec":     round(time.monotonic() - t0, 3),
+        }
+        fd, tmp = tempfile.mkstemp(dir=cache_dir, prefix=".tmp-")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False)
+        os.replace(tmp, path)
+        logger.info("[IFC Clash] %s: 부재 %d개, 후보 쌍 %d, 간섭 %d건 (%.2fs)", project_id,
+                    len(geoms), found["candidatePairs"], len(clashes), result["elapsedSec"])
+        result["cacheHit"] = False
+
+    if limit is not None and limit >= 0:
+        result["clashes"] = result["clashes"][:limit]
+    return result
@@ -0,0 +1,129 @@
+"""
+부재 메타데이터 컬럼형 사이드카 (Arrow IPC stream)
+
+elements(BimElementDTO dict 목록) JSON 은 대형 모델에서 수십 MB, 직렬화·파싱에 수 초가 든다.
+같은 내용을 Arrow IPC stream 으로 기록하면 숫자 열은 그대로 메모리 매핑되고
+문자열 반복 열은 사전(dictionary) 인코딩되어 크기·파싱 비용이 거의 없다.
+
+  float64     positionX/Y/Z, sizeX/Y/Z, rotationX/Y/Z
+  dictionary  elementType, material, storey, building   (int32 인덱스 + 전체 배치 공유 사전)
+  utf8        elementId, globalId, ifcName
+  utf8 (JSON) ifcProperties, ifcQuantities  — 행별 JSON 텍스트, Arrow offset 버퍼로 임의 접근
+              (상세 패널처럼 필요한 행만 파싱. IFC_ELEMENTS_LIGHTWEIGHT 로 제거된 경우 null)
+
+레코드 배치는 BATCH_ROWS 행 단위 — 읽는 쪽(JS apache-arrow, Spring bulk insert)은 배치마다
+처리하고 버릴 수 있다. 행 순서는 elements 순서와 같다.
+
+pyarrow 는 선택 의존성: IFC_ELEMENTS_ARROW 를 켠 경우에만 import 한다.
+"""
+from __future__ import annotations
+
+import json
+import logging
+from typing import Iterator, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = "1"
+BATCH_ROWS = 16384
+MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+_FLOAT_COLUMNS = ("positionX", "positionY", "positionZ", "sizeX", "sizeY", "sizeZ",
+                  "rotationX", "rotationY", "rotationZ")
+_DICT_COLUMNS = ("elementType", "material", "storey", "building")
+_STRING_COLUMNS = ("globalId", "ifcName")
+_JSON_COLUMNS = ("ifcProperties", "ifcQuantities")
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc  # noqa: F401
+    except ImportError as e:
+        raise RuntimeError("pyarrow 미설치: pip install pyarrow") from e
+    return pa
+
+
+def _schema(pa, n_rows: int):
+    fields = [pa.field("elementId", pa.string())]
+    fields += [pa.field(c, pa.dictionary(pa.int32(), pa.string())) for c in _DICT_COLUMNS]
+    fields += [pa.field(c, pa.float64()) for c in _FLOAT_COLUMNS]
+    fields += [pa.field(c, pa.string()) for c in _STRING_COLUMNS]
+    fields += [pa.field(c, pa.string()) for c in _JSON_COLUMNS]
+    return pa.schema(fields, metadata={
+        "twinspring.format":      "ifc-elements",
+        "twinspring.version":     FORMAT_VERSION,
+        "twinspring.rows":        str(n_rows),
+        "twinspring.jsonColumns": ",".join(_JSON_COLUMNS),
+    })
+
+
+def elements_to_arrow(elements: list[dict], batch_rows: int = BATCH_ROWS) -> bytes:
+    """elements → Arrow IPC stream 바이트."""
+    pa = _pyarrow()
+    schema = _schema(pa, len(elements))
+
+    # 사전은 전체 행 기준으로 한 번 만들어 모든 배치가 공유 (stream 에 한 번만 기록됨)
+    dictionaries, codes = {}, {}
+    for col in _DICT_COLUMNS:
+        values = [el.get(col) for el in elements]
+        categories = sorted({v for v in values if v is not None})
+        index = {v: i for i, v in enumerate(categories)}
+        dictionaries[col] = pa.array(categories, pa.string())
+        codes[col] = [index.get(v) for v in values]
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for start in range(0, len(elements), batch_rows):
+            rows = elements[start:start + batch_rows]
+            arrays = {
+                "elementId": pa.array([el.get("elementId") for el in rows], pa.string()),
+            }
+            for col in _DICT_COLUMNS:
+                arrays[col] = pa.DictionaryArray.from_arrays(
+                    pa.array(codes[col][start:start + len(rows)], pa.int32()), dictionaries[col])
+            for col in _FLOAT_COLUMNS:
+                arrays[col] = pa.array([el.get(col) for el in rows], pa.float64())
+            for col in _STRING_COLUMNS:
+                arrays[col] = pa.array([el.get(col) for el in rows], pa.string())
+            for col in _JSON_COLUMNS:
+                arrays[col] = pa.array(
+                    [None if el.get(col) is None else json.dumps(el[col], ensure_ascii=False, default=str)
+                     for el in rows], pa.string())
+            writer.write_batch(pa.record_batch([arrays[f.name] for f in schema], schema=schema))
+    return sink.getvalue().to_pybytes()
+
+
+def iter_element_batches(source: Union[bytes, str], parse_json: bool = True) -> Iterator[list[dict]]:
+    """
+    Arrow IPC stream(바이트 또는 파일 경로 — 경로는 memory map) → 배치별 elements dict 목록.
+    parse_json=False 면 ifcProperties / ifcQuantities 를 JSON 텍스트 그대로 둔다.
+    """
+    pa = _pyarrow()
+    stream = pa.memory_map(source, "r") if isinstance(source, str) else pa.py_buffer(source)
+    reader = pa.ipc.open_stream(stream)
+    for batch in reader:
+        columns = batch.to_pydict()
+        if parse_json:
+            for col in _JSON_COLUMNS:
+                if col in columns:
+                    columns[col] = [None if v is None else json.loads(v) for v in columns[col]]
+        names = list(columns)
+        yield [dict(zip(names, row)) for row in zip(*columns.values())]
+
+
+def read_elements(source: Union[bytes, str]) -> list[dict]:
+    """사이드카 전체 → elements (JSON 메타데이터의 elements 와 같은 내용)."""
+    return [el for batch in iter_element_batches(source) for el in batch]
+
+
+def store_elements_sidecar(store, elements: list[dict]) -> Optional[str]:
+    """IFC_ELEMENTS_ARROW 가 켜져 있으면 사이드카를 산출물 저장소에 기록하고 ID 반환 (아니면 None)."""
+    from config.settings import IFC_ELEMENTS_ARROW
+    if not IFC_ELEMENTS_ARROW:
+        return None
+    try:
+        return store.put(elements_to_arrow(elements))
+    except RuntimeError as e:
+        logger.warning("[IFC Columnar] 사이드카 생략: %s", e)
+        return None
@@ -0,0 +1,245 @@
+"""
+IFC 부재 연결 그래프 — 접촉(contact) / 지지(supports) 관계 추출
+
+bim_wbs_tools 공정 생성은 층 이름과 부재 분류만으로 순서를 정한다. 이 모듈은 삼각분할 형상에서
+물리적으로 맞닿은 부재 쌍을 찾아 인접 그래프를 만들고, 프로젝트별 간결한 edge list 로 저장한다.
+
+  1. 공간 hash   — 부재 AABB(+tolerance)를 균일 격자 셀에 등록, 같은 셀 부재끼리만 후보 쌍.
+                   셀 크기 = 부재 크기 중앙값 → 부재당 셀 수가 상수라 전체가 거의 선형.
+                   셀을 지나치게 많이 덮는 대형 부재(기초 매트 등)는 따로 AABB 전수 비교.
+  2. 접촉 판정   — 후보 쌍의 삼각형 중 서로 tolerance 이내인 것 (ifc_clash 의 정점-삼각형 거리
+                   + 관통 판정 재사용). 면이 맞닿거나 살짝 묻힌 부재 모두 접촉.
+  3. 관계 분류   — XY 가 겹치고 Z 겹침이 얕으면(위 부재 바닥 ≈ 아래 부재 윗면) 아래 → 위 supports,
+                   그 외는 contact.
+
+저장 형식 (npz, pickle 없음): globalIds / elementTypes / edges (E,2) int32 / kinds (E,) uint8
+  kinds: 0 = contact (무방향), 1 = supports (edges[k,0] 이 edges[k,1] 을 지지)
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from collections import deque
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CONTACT, SUPPORTS = 0, 1
+_MAX_CELLS = 64               # 이보다 많은 셀을 덮는 부재는 전수 비교로 분리
+_SUPPORT_EMBED_RATIO = 0.1    # Z 겹침이 낮은 쪽 부재 높이의 이 비율 이하면 얹힘으로 본다
+_FORMAT = 1
+
+
+def _cell_hash(c: np.ndarray) -> np.ndarray:
+    """정수 셀 좌표 (n,3) → int64 hash (충돌은 이후 AABB 검사에서 걸러짐)."""
+    c = c.astype(np.int64)
+    return (c[:, 0] * 73856093) ^ (c[:, 1] * 19349663) ^ (c[:, 2] * 83492791)
+
+
+def spatial_hash_pairs(lo: np.ndarray, hi: np.ndarray, tolerance: float = 0.0,
+                       cell: Optional[float] = None) -> np.ndarray:
+    """균일 격자 공간 hash 로 AABB(+tolerance) 가 겹치는 부재 쌍. 반환: (K,2) i < j."""
+    from ifc_clash import _ragged_arange
+
+    n = len(lo)
+    if n < 2:
+        return np.zeros((0, 2), dtype=np.int64)
+    lo = lo - tolerance
+    hi = hi + tolerance
+    if cell is None:
+        cell = max(float(np.median((hi - lo).max(axis=1))), 1e-3)
+
+    c_lo = np.floor(lo / cell).astype(np.int64)
+    span = np.floor(hi / cell).astype(np.int64) - c_lo + 1
+    n_cells = span.prod(axis=1)
+    big = n_cells > _MAX_CELLS
+    small = np.flatnonzero(~big)
+
+    # 셀 등록 (부재 × 덮는 셀) → hash 정렬 → 같은 셀 안의 모든 쌍
+    cnt = n_cells[small]
+    elem = np.repeat(small, cnt)
+    k = _ragged_arange(cnt)
+    sx, sy = span[elem, 0], span[elem, 1]
+    coords = c_lo[elem] + np.column_stack([k % sx, (k // sx) % sy, k // (sx * sy)])
+    key = _cell_hash(coords)
+    order = np.argsort(key, kind="stable")
+    key, elem = key[order], elem[order]
+    group_end = np.searchsorted(key, key, side="right")
+    partners = group_end - np.arange(len(key)) - 1
+    i = np.repeat(np.arange(len(key)), partners)
+    j = i + 1 + _ragged_arange(partners)
+    cand = [np.column_stack([elem[i], elem[j]])]
+
+    # 대형 부재: 전체와 AABB 비교
+    for b in np.flatnonzero(big):
+        others = np.flatnonzero(np.all((lo <= hi[b]) & (hi >= lo[b]), axis=1))
+        others = others[others != b]
+        cand.append(np.column_stack([np.full(len(others), b), others]))
+
+    pairs = np.concatenate(cand)
+    pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+    pairs = np.sort(pairs, axis=1)
+    pairs = np.unique(pairs[:, 0] * n + pairs[:, 1])
+    pairs = np.column_stack([pairs // n, pairs % n])
+    ok = np.all((lo[pairs[:, 0]] <= hi[pairs[:, 1]]) & (lo[pairs[:, 1]] <= hi[pairs[:, 0]]), axis=1)
+    return pairs[ok]
+
+
+def build_connectivity(geoms: list[dict], tolerance: float = 0.005, progress=None) -> dict:
+    """
+    부재 연결 그래프 (geoms: tessellate_ifc 결과).
+    반환: {edges (E,2) int32, kinds (E,) uint8, candidatePairs}
+    """
+    from ifc_clash import _MeshTable, _pair_chunks, tri_tri_distance, tri_tri_penetration
+
+    mesh = _MeshTable(geoms)
+    pairs = spatial_hash_pairs(mesh.lo, mesh.hi, tolerance)
+    touching = np.zeros(len(pairs), dtype=bool)
+
+    offset = 0
+    for chunk in _pair_chunks(mesh, pairs):
+        if progress is not None:
+            progress("connectivity", offset, len(pairs))
+        for A, B, P in mesh.tri_pairs(chunk[:, 0], chunk[:, 1], tolerance):
+            if len(A) == 0:
+                continue
+            V = mesh.tris[A].astype(np.float64)
+            U = mesh.tris[B].astype(np.float64)
+            hit = tri_tri_penetration(V, U, 0.0)[0] | (tri_tri_distance(V, U) <= tolerance)
+            touching[P[hit] + offset] = True
+        offset += len(chunk)
+
+    edges = pairs[touching]
+    lo, hi = mesh.lo, mesh.hi
+    a, b = edges[:, 0], edges[:, 1]
+    xy_overlap = np.all((np.minimum(hi[a, :2], hi[b, :2]) - np.maximum(lo[a, :2], lo[b, :2])) > tolerance,
+                        axis=1)
+    z_overlap = np.minimum(hi[a, 2], hi[b, 2]) - np.maximum(lo[a, 2], lo[b, 2])
+    min_height = np.minimum(hi[a, 2] - lo[a, 2], hi[b, 2] - lo[b, 2])
+    stacked = xy_overlap & (z_overlap <= np.maximum(tolerance, _SUPPORT_EMBED_RATIO * min_height))
+
+    # supports 는 (아래, 위) 순서로 정렬
+    upper_first = (lo[a, 2] + hi[a, 2]) > (lo[b, 2] + hi[b, 2])
+    swap = stacked & upper_first
+    edges[swap] = edges[swap][:, ::-1]
+    kinds = np.where(stacked, SUPPORTS, CONTACT).astype(np.uint8)
+    return {"edges": edges.astype(np.int32), "kinds": kinds, "candidatePairs": len(pairs)}
+
+
+def support_levels(n: int, edges: np.ndarray, kinds: np.ndarray) -> np.ndarray:
+    """supports 관계의 위상 순서 층위 (0 = 아무것도 지지하지 않는 최하단). 순환 부재는 -1."""
+    sup = edges[kinds == SUPPORTS]
+    indeg = np.bincount(sup[:, 1], minlength=n) if len(sup) else np.zeros(n, dtype=np.int64)
+    children: list[list[int]] = [[] for _ in range(n)]
+    for lower, upper in sup.tolist():
+        children[lower].append(upper)
+    level = np.full(n, -1, dtype=np.int64)
+    queue = deque(np.flatnonzero(indeg == 0).tolist())
+    level[list(queue)] = 0
+    indeg = indeg.copy()
+    while queue:
+        v = queue.popleft()
+        for u in children[v]:
+            level[u] = max(level[u], level[v] + 1)
+            indeg[u] -= 1
+            if indeg[u] == 0:
+                queue.append(u)
+    return level
+
+
+# ── 프로젝트별 저장 ───────────────────────────────────────────────────
+
+def _graph_path(project_id: str) -> str:
+    from config.settings import IFC_GRAPH_DIR
+    os.makedirs(IFC_GRAPH_DIR, exist_ok=True)
+    return os.path.join(IFC_GRAPH_DIR, hashlib.sha256(project_id.encode()).hexdigest() + ".npz")
+
+
+def load_connectivity(project_id: str) -> Optional[dict]:
+    """저장된 그래프 (없으면 None). 배열은 npz 그대로 — 수만 부재도 수 ms."""
+    path = _graph_path(project_id)
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as z:
+            graph = {k: z[k] for k in z.files}
+    except Exception:
+        logger.warning("[IFC Graph] 읽기 실패: %s", project_id, exc_info=True)
+        return None
+    if int(graph.get("format", 0)) != _FORMAT:
+        return None
+    graph["modelSha256"] = str(graph["modelSha256"])
+    graph["tolerance"] = float(graph["tolerance"])
+    return graph
+
+
+def project_connectivity(project_id: str, tolerance: float = 0.005, num_workers: int = 1) -> dict:
+    """
+    상주 모델 저장소의 프로젝트 IFC 로 연결 그래프를 만들거나, 같은 모델·tolerance 로
+    이미 만든 그래프가 있으면 그대로 읽는다.
+    """
+    from ifc_cache import file_sha256, get_cache
+    from ifc_models import get_model_server, ModelNotFound
+
+    server = get_model_server()
+    if server is None:
+        raise ModelNotFound("상주 모델 서버 비활성 (IFC_RESIDENT_MODELS=0)")
+    ifc_path, user_scale = server.model_file(project_id)
+    sha = file_sha256(ifc_path)
+
+    graph = load_connectivity(project_id)
+    if graph is not None and graph["modelSha256"] == sha and graph["tolerance"] == float(tolerance):
+        return graph
+
+    from ifc_converter import tessellate_ifc
+    t0 = time.monotonic()
+    cache = get_cache()
+    tess = cache.get(cache.key(sha, user_scale)) if cache is not None else None
+    if tess is None:
+        tess = tessellate_ifc(ifc_path, user_scale=user_scale, num_workers=num_workers)
+        if cache is not None:
+            cache.put(cache.key(sha, user_scale), tess)
+    geoms = tess["geoms"]
+    built = build_connectivity(geoms, tolerance)
+
+    express = np.array([g["express_id"] for g in geoms], dtype=np.int64)
+    graph = {
+        "format":       np.int64(_FORMAT),
+        "modelSha256":  np.str_(sha),
+        "tolerance":    np.float64(tolerance),
+        "globalIds":    np.array([g["global_id"] or "" for g in geoms], dtype=str),
+        "elementIds":   np.array([f"IFC-{e}-{project_id}" if project_id else f"IFC-{e}" for e in express],
+                                 dtype=str),
+        "elementTypes": np.array([g["our_type"] for g in geoms], dtype=str),
+        "edges":        built["edges"],
+        "kinds":        built["kinds"],
+    }
+    path = _graph_path(project_id)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-", suffix=".npz")
+    with os.fdopen(fd, "wb") as f:
+        np.savez_compressed(f, **graph)
+    os.replace(tmp, path)
+    logger.info("[IFC Graph] %s: 부재 %d개, 후보 %d쌍 → 연결 %d개 (지지 %d) %.2fs", project_id,
+                len(geoms), built["candidatePairs"], len(built["edges"]),
+                int((built["kinds"] == SUPPORTS).sum()), time.monotonic() - t0)
+    graph["modelSha256"] = sha
+    graph["tolerance"] = float(tolerance)
+    return graph
+
+
+def graph_summary(graph: dict) -> dict:
+    """스케줄러·요약용 통계 (edge 수, 지지 층위 수)."""
+    n = len(graph["globalIds"])
+    levels = support_levels(n, graph["edges"], graph["kinds"])
+    return {
+        "elements":        n,
+        "edges":           int(len(graph["edges"])),
+        "supports":        int((graph["kinds"] == SUPPORTS).sum()),
+        "maxSupportLevel": int(levels.max()) if n else 0,
+        "isolated":        int(n - len(np.unique(graph["edges"]))) if n else 0,
+    }
@@ -18,11 +18,16 @@ from __future__ import annotations
 import re
 import struct
 import json
+import hashlib
 import logging
+import time
 from typing import Optional
 
 import numpy as np
 
+from ifc_meshstore import geometry_keys, get_mesh_store, retain_meshes
+from ifc_profile import NULL_PROFILE, ConversionProfile
+
 logger = logging.getLogger(__name__)
 
 # ── IFC 엔티티 타입 → 서비스 elementType 매핑 ─────────────────────
@@ -222,136 +227,163 @@ def _extract_geo_origin(ifc) -> dict:
     return {"latitude": None, "longitude": None, "elevation": None}
 
 
-def _extract_material(ifc, product) -> Optional[str]:
-    """IfcRelAssociatesMaterial 에서 첫 번째 재료명 추출.
-    IfcMaterial / LayerSet / LayerSetUsage / ConstituentSet / List 순서로 시도."""
-    try:
-        for rel in ifc.get_inverse(product):
-            if not rel.is_a("IfcRelAssociatesMaterial"):
-                continue
-            mat = getattr(rel, "RelatingMaterial", None)
-            if mat is None:
-                continue
-
-            if mat.is_a("IfcMaterial"):
-                name = getattr(mat, "Name", None)
-                return str(name) if name else None
-
-            if mat.is_a("IfcMaterialLayerSet"):
-                for layer in (getattr(mat, "MaterialLayers", []) or []):
-                    m = getattr(layer, "Material", None)
-                    if m and getattr(m, "Name", None):
-                        return str(m.Name)
-
-            if mat.is_a("IfcMaterialLayerSetUsage"):
-                mls = getattr(mat, "ForLayerSet", None)
-                if mls:
-                    for layer in (getattr(mls, "MaterialLayers", []) or []):
-                        m = getattr(layer, "Material", None)
-                        if m and getattr(m, "Name", None):
-                            return str(m.Name)
-
-            if mat.is_a("IfcMaterialConstituentSet"):
-                for c in (getattr(mat, "MaterialConstituents", []) or []):
-                    m = getattr(c, "Material", None)
-                    if m and getattr(m, "Name", None):
-                        return str(m.Name)
-
-            if mat.is_a("IfcMaterialList"):
-                for m in (getattr(mat, "Materials", []) or []):
-                    if getattr(m, "Name", None):
-                        return str(m.Name)
-
-            if mat.is_a("IfcMaterialProfileSetUsage"):
-                mps = getattr(mat, "ForProfileSet", None)
-                if mps:
-                    for mp in (getattr(mps, "MaterialProfiles", []) or []):
-                        m = getattr(mp, "Material", None)
-                        if m and getattr(m, "Name", None):
-                            return str(m.Name)
-    except Exception:
-        pass
+def _material_name(mat) -> Optional[str]:
+    """IfcRelAssociatesMaterial.RelatingMaterial 에서 첫 번째 재료명 추출.
+    IfcMaterial / LayerSet / LayerSetUsage / ConstituentSet / List / ProfileSetUsage 순서로 시도."""
+    if mat.is_a("IfcMaterial"):
+        name = getattr(mat, "Name", None)
+        return str(name) if name else None
+
+    if mat.is_a("IfcMaterialLayerSet"):
+        for layer in (getattr(mat, "MaterialLayers", []) or []):
+            m = getattr(layer, "Material", None)
+            if m and getattr(m, "Name", None):
+                return str(m.Name)
+
+    if mat.is_a("IfcMaterialLayerSetUsage"):
+        mls = getattr(mat, "ForLayerSet", None)
+        if mls:
+            for layer in (getattr(mls, "MaterialLayers", []) or []):
+                m = getattr(layer, "Material", None)
+                if m and getattr(m, "Name", None):
+                    return str(m.Name)
+
+    if mat.is_a("IfcMaterialConstituentSet"):
+        for c in (getattr(mat, "MaterialConstituents", []) or []):
+            m = getattr(c, "Material", None)
+            if m and getattr(m, "Name", None):
+                return str(m.Name)
+
+    if mat.is_a("IfcMaterialList"):
+        for m in (getattr(mat, "Materials", []) or []):
+            if getattr(m, "Name", None):
+                return str(m.Name)
+
+    if mat.is_a("IfcMaterialProfileSetUsage"):
+        mps = getattr(mat, "ForProfileSet", None)
+        if mps:
+            for mp in (getattr(mps, "MaterialProfiles", []) or []):
+                m = getattr(mp, "Material", None)
+                if m and getattr(m, "Name", None):
+                    return str(m.Name)
     return None
 
 
-def _extract_quantities(ifc, product) -> dict:
-    """IfcElementQuantity / BaseQuantities 에서 면적·체적·길이·무게 추출.
-    반환: { "NetVolume": {"value": 1.23, "unit": "m³"}, ... }
+def _collect_quantities(pdef, quantities: dict) -> None:
+    """IfcElementQuantity / BaseQuantities 에서 면적·체적·길이·무게·개수를 quantities 에 누적.
+    형식: { "NetVolume": {"value": 1.23, "unit": "m³"}, ... }
     단위는 IFC 길이 단위 기준 — 호출부에서 unit_scale 보정 필요."""
-    quantities: dict = {}
+    for q in (getattr(pdef, "Quantities", []) or []):
+        name = getattr(q, "Name", None) or ""
+        if q.is_a("IfcQuantityArea"):
+            val = getattr(q, "AreaValue", None)
+            if val is not None:
+                quantities[name] = {"value": round(float(val), 6), "unit": "m²"}
+        elif q.is_a("IfcQuantityVolume"):
+            val = getattr(q, "VolumeValue", None)
+            if val is not None:
+                quantities[name] = {"value": round(float(val), 6), "unit": "m³"}
+        elif q.is_a("IfcQuantityLength"):
+            val = getattr(q, "LengthValue", None)
+            if val is not None:
+                quantities[name] = {"value": round(float(val), 6), "unit": "m"}
+        elif q.is_a("IfcQuantityWeight"):
+            val = getattr(q, "WeightValue", None)
+            if val is not None:
+                quantities[name] = {"value": round(float(val), 6), "unit": "kg"}
+        elif q.is_a("IfcQuantityCount"):
+            val = getattr(q, "CountValue", None)
+            if val is not None:
+                quantities[name] = {"value": int(val), "unit": "ea"}
+
+
+def _collect_properties(pdef, props: dict) -> None:
+    """IfcPropertySet 단일값 속성(Pset_WallCommon 등)을 props 에 누적.
+    형식: { "IsExternal": True, "FireRating": "60", ... }"""
+    for p in (getattr(pdef, "HasProperties", []) or []):
+        if not p.is_a("IfcPropertySingleValue"):
+            continue
+        nominal = getattr(p, "NominalValue", None)
+        if nominal is None:
+            continue
+        key = getattr(p, "Name", None) or ""
+        try:
+            props[key] = nominal.wrappedValue
+        except AttributeError:
+            props[key] = str(nominal)
+
+
+def _build_relationship_index(ifc) -> dict[str, dict]:
+    """IfcRelAssociatesMaterial / IfcRelDefinesByProperties 를 한 번씩만 순회해
+    expressId → 재료명 / 수량 dict / 속성 dict 인덱스를 만든다.
+    부재마다 get_inverse 를 세 번 호출하고 관계를 다시 거르던 방식을 대체한다.
+
+    반환: {"material": {id: str}, "quantities": {id: dict}, "properties": {id: dict}}
+    """
+    materials: dict[int, str] = {}
+    quantities: dict[int, dict] = {}
+    properties: dict[int, dict] = {}
+
+    # ── 재료: 부재별 첫 번째로 이름이 확인된 재료 사용 ──────────────
     try:
-        for rel in ifc.get_inverse(product):
-            if not rel.is_a("IfcRelDefinesByProperties"):
+        for rel in ifc.by_type("IfcRelAssociatesMaterial"):
+            mat = getattr(rel, "RelatingMaterial", None)
+            if mat is None:
                 continue
-            pdef = getattr(rel, "RelatingPropertyDefinition", None)
-            if pdef is None or not pdef.is_a("IfcElementQuantity"):
+            try:
+                name = _material_name(mat)
+            except Exception:
                 continue
-            for q in (getattr(pdef, "Quantities", []) or []):
-                name = getattr(q, "Name", None) or ""
-                if q.is_a("IfcQuantityArea"):
-                    val = getattr(q, "AreaValue", None)
-                    if val is not None:
-                        quantities[name] = {"value": round(float(val), 6), "unit": "m²"}
-                elif q.is_a("IfcQuantityVolume"):
-                    val = getattr(q, "VolumeValue", None)
-                    if val is not None:
-                        quantities[name] = {"value": round(float(val), 6), "unit": "m³"}
-                elif q.is_a("IfcQuantityLength"):
-                    val = getattr(q, "LengthValue", None)
-                    if val is not None:
-                        quantities[name] = {"value": round(float(val), 6), "unit": "m"}
-                elif q.is_a("IfcQuantityWeight"):
-                    val = getattr(q, "WeightValue", None)
-                    if val is not None:
-                        quantities[name] = {"value": round(float(val), 6), "unit": "kg"}
-                elif q.is_a("IfcQuantityCount"):
-                    val = getattr(q, "CountValue", None)
-                    if val is not None:
-                        quantities[name] = {"value": int(val), "unit": "ea"}
-    except Exception:
-        pass
-    return quantities
-
+            if not name:
+                continue
+            for obj in (getattr(rel, "RelatedObjects", []) or []):
+                materials.setdefault(obj.id(), name)
+    except Exception as e:
+        logger.warning("[IFC Rel] 재료 인덱스 구축 실패: %s", e)
 
-def _extract_properties(ifc, product) -> dict:
-    """IfcPropertySet 에서 단일값 속성 추출 (Pset_WallCommon 등).
-    반환: { "IsExternal": True, "FireRating": "60", ... }"""
-    props: dict = {}
+    # ── 수량 / 속성: 정의 하나를 한 번만 파싱 후 관련 부재 전체에 병합 ─
     try:
-        for rel in ifc.get_inverse(product):
-            if not rel.is_a("IfcRelDefinesByProperties"):
-                continue
+        for rel in ifc.by_type("IfcRelDefinesByProperties"):
             pdef = getattr(rel, "RelatingPropertyDefinition", None)
-            if pdef is None or not pdef.is_a("IfcPropertySet"):
+            if pdef is None:
                 continue
-            for p in (getattr(pdef, "HasProperties", []) or []):
-                if not p.is_a("IfcPropertySingleValue"):
-                    continue
-                nominal = getattr(p, "NominalValue", None)
-                if nominal is None:
+            try:
+                if pdef.is_a("IfcElementQuantity"):
+                    parsed: dict = {}
+                    _collect_quantities(pdef, parsed)
+                    target = quantities
+                elif pdef.is_a("IfcPropertySet"):
+                    parsed = {}
+                    _collect_properties(pdef, parsed)
+                    target = properties
+                else:
                     continue
-                key = getattr(p, "Name", None) or ""
-                try:
-                    props[key] = nominal.wrappedValue
-                except AttributeError:
-                    props[key] = str(nominal)
-    except Exception:
-        pass
-    return props
+            except Exception:
+                continue
+            if not parsed:
+                continue
+            for obj in (getattr(rel, "RelatedObjects", []) or []):
+                target.setdefault(obj.id(), {}).update(parsed)
+    except Exception as e:
+        logger.warning("[IFC Rel] 속성·수량 인덱스 구축 실패: %s", e)
 
+    logger.info("[IFC Rel] 재료 %d개, 수량 %d개, 속성 %d개 부재 인덱싱",
+                len(materials), len(quantities), len(properties))
+    return {"material": materials, "quantities": quantities, "properties": properties}
 
-def _extract_rotation(product) -> tuple[float, float, float]:
-    """ObjectPlacement 체인을 따라 월드 회전을 ZYX Euler 각(degree)으로 반환.
+
+def _placement_rotation(product) -> Optional[np.ndarray]:
+    """ObjectPlacement 체인을 누적한 월드 회전 행렬(3×3, 열 정규화)을 반환. 없으면 None.
     ifcopenshell.util.placement.get_local_placement 가 전체 체인을 이미 누적함."""
     try:
         import ifcopenshell.util.placement as _ifc_pl
         placement = getattr(product, "ObjectPlacement", None)
         if placement is None:
-            return (0.0, 0.0, 0.0)
+            return None
 
         matrix = _ifc_pl.get_local_placement(placement)  # numpy 4×4
         if matrix is None:
-            return (0.0, 0.0, 0.0)
+            return None
 
         R = np.array(matrix[:3, :3], dtype=float)
         # 스케일 제거 (열 정규화)
@@ -359,8 +391,16 @@ def _extract_rotation(product) -> tuple[float, float, float]:
             n = np.linalg.norm(R[:, i])
             if n > 1e-8:
                 R[:, i] /= n
+        return R
+    except Exception:
+        return None
 
-        # ZYX Euler 추출
+
+def _rotation_to_euler(R: Optional[np.ndarray]) -> tuple[float, float, float]:
+    """회전 행렬 → ZYX Euler 각(degree). R 이 None 이면 (0, 0, 0)."""
+    if R is None:
+        return (0.0, 0.0, 0.0)
+    try:
         ry = float(np.arcsin(-float(np.clip(R[2, 0], -1.0, 1.0))))
         if abs(np.cos(ry)) > 1e-6:
             rx = float(np.arctan2(R[2, 1], R[2, 2]))
@@ -378,6 +418,11 @@ def _extract_rotation(product) -> tuple[float, float, float]:
         return (0.0, 0.0, 0.0)
 
 
+def _extract_rotation(product) -> tuple[float, float, float]:
+    """ObjectPlacement 체인을 따라 월드 회전을 ZYX Euler 각(degree)으로 반환."""
+    return _rotation_to_euler(_placement_rotation(product))
+
+
 def _extract_spatial_structure(ifc) -> tuple[dict, list]:
     """expressId → {storey, storeyElevation, building}  +  storeys list"""
     elem_to_spatial: dict[int, dict] = {}
@@ -570,32 +615,147 @@ def _align4(data: bytes) -> bytes:
     return data + b"\x00" * (4 - rem) if rem else data
 
 
+# glTF bufferView target / accessor componentType
+_ARRAY_BUFFER         = 34962
+_ELEMENT_ARRAY_BUFFER = 34963
+_BYTE                 = 5120
+_UNSIGNED_BYTE        = 5121
+_SHORT                = 5122
+_UNSIGNED_SHORT       = 5123
+_UNSIGNED_INT         = 5125
+_FLOAT                = 5126
+
+# 인스턴싱 해시 허용오차 — 로컬 좌표 0.1mm, 노말 1e-3 단위로 양자화 후 비교
+_INSTANCE_POS_TOL = 1e-4
+_INSTANCE_NRM_TOL = 1e-3
+
+
+def _quantize_positions(positions: np.ndarray) -> tuple[np.ndarray, np.ndarray, float]:
+    """KHR_mesh_quantization 위치 양자화 → (int16 (N,3), offset (3,), scale).
+    p ≈ offset + scale · q. 축별이 아닌 균일 scale 을 써서 노말 보정 없이 node scale 로 복원한다
+    (10m 부재 기준 해상도 약 0.15mm)."""
+    lo = positions.min(axis=0).astype(np.float64)
+    hi = positions.max(axis=0).astype(np.float64)
+    offset = (lo + hi) / 2.0
+    scale = max(float((hi - lo).max()) / 2.0, 1e-9) / 32767.0
+    q = np.round((positions - offset) / scale)
+    return np.clip(q, -32767, 32767).astype(np.int16), offset, scale
+
+
+def _pack_padded(arr: np.ndarray, dtype, width: int) -> bytes:
+    """(N,3) 정수 속성을 (N,width) 로 0 패딩 — 정점 속성 stride 4바이트 정렬 요건."""
+    out = np.zeros((len(arr), width), dtype=dtype)
+    out[:, :3] = arr
+    return out.tobytes()
+
+
+def _compact_indices(indices: np.ndarray, n_verts: int) -> tuple[bytes, int]:
+    """정점 수에 맞는 가장 작은 인덱스 타입 → (bytes, componentType)."""
+    if n_verts <= 0xFF:
+        return indices.astype(np.uint8).tobytes(), _UNSIGNED_BYTE
+    if n_verts <= 0xFFFF:
+        return indices.astype(np.uint16).tobytes(), _UNSIGNED_SHORT
+    return _pack_u32(indices), _UNSIGNED_INT
+
+
+def _rotation_to_quaternion(R: np.ndarray) -> list[float]:
+    """정규직교 회전 행렬 → glTF 쿼터니언 [x, y, z, w]."""
+    m00, m01, m02 = R[0]
+    m10, m11, m12 = R[1]
+    m20, m21, m22 = R[2]
+    tr = m00 + m11 + m22
+    if tr > 0:
+        t = np.sqrt(tr + 1.0) * 2
+        w, x, y, z = 0.25 * t, (m21 - m12) / t, (m02 - m20) / t, (m10 - m01) / t
+    elif m00 > m11 and m00 > m22:
+        t = np.sqrt(1.0 + m00 - m11 - m22) * 2
+        w, x, y, z = (m21 - m12) / t, 0.25 * t, (m01 + m10) / t, (m02 + m20) / t
+    elif m11 > m22:
+        t = np.sqrt(1.0 + m11 - m00 - m22) * 2
+        w, x, y, z = (m02 - m20) / t, (m01 + m10) / t, 0.25 * t, (m12 + m21) / t
+    else:
+        t = np.sqrt(1.0 + m22 - m00 - m11) * 2
+        w, x, y, z = (m10 - m01) / t, (m02 + m20) / t, (m12 + m21) / t, 0.25 * t
+    q = np.array([x, y, z, w], dtype=float)
+    q /= np.linalg.norm(q)
+    return [float(v) for v in q]
+
+
 class GlbBuilder:
     """glTF 2.0 GLB 바이너리를 직접 구성하는 헬퍼."""
 
-    def __init__(self):
+    def __init__(self, instancing: bool = False, merged: bool = False, bin_file=None,
+                 quantize: bool = False):
+        # bin_file(쓰기 가능한 바이너리 파일) 지정 시 BIN 청크를 메모리 대신 파일에 기록
+        # → build_to() 로 출력 (스트리밍 변환에서 최대 메모리 제한)
+        if merged and bin_file is not None:
+            raise ValueError("merged 모드는 bin_file(스트리밍 출력)과 함께 사용할 수 없습니다")
         self._bin: bytearray = bytearray()
+        self._bin_file = bin_file
+        self._bin_len = 0
         self._buffer_views: list[dict] = []
         self._accessors: list[dict] = []
         self._meshes: list[dict] = []
         self._nodes: list[dict] = []
         self._materials: list[dict] = []
         self._mat_cache: dict[tuple, int] = {}
+        # instancing=True: 동일 형상(로컬 좌표 기준 해시)은 mesh 1개를 여러 node가 참조
+        self._instancing = instancing
+        self._mesh_cache: dict[bytes, int] = {}
+        self.instanced_nodes = 0
+        self.triangles = 0   # add_element 로 들어온 삼각형 수 (인스턴스 재사용 포함)
+        # merged=True: 재질별로 부재를 이어 붙여 primitive 소수로 출력 (draw call 절감).
+        # 정점마다 _ELEMENT_INDEX 속성, 바이너리 feature table 로 index → elementId/globalId 매핑.
+        # instancing 보다 우선한다.
+        self._merged = merged
+        self._batches: dict[int, list[tuple]] = {}
+        self._features: list[dict] = []
+        self._flushed = False
+        # quantize=True: KHR_mesh_quantization — POSITION int16(+node scale/translation 로 복원),
+        # NORMAL int8 normalized, 인덱스는 정점 수에 따라 uint8/uint16.
+        # merged 모드는 primitive 여러 개가 node 하나를 공유하므로 위치는 float32 유지.
+        self._quantize = quantize
+        self._mesh_dequant: dict[int, tuple[np.ndarray, float]] = {}   # mesh_idx → (offset, scale)
+        self._gpu_instancing = False   # add_instances 사용 시 EXT_mesh_gpu_instancing 선언
+
+    @property
+    def mesh_count(self) -> int:
+        if self._merged and not self._flushed:
+            return len(self._batches)
+        return len(self._meshes)
+
+    @property
+    def node_count(self) -> int:
+        return len(self._nodes)
 
     # ── 버퍼 뷰 / 액세서 등록 ────────────────────────────────────────
 
-    def _add_buffer_view(self, data: bytes, target: int) -> int:
-        offset = len(self._bin)
-        self._bin.extend(data)
+    def _write_bin(self, data: bytes) -> None:
+        if self._bin_file is not None:
+            self._bin_file.write(data)
+        else:
+            self._bin.extend(data)
+        self._bin_len += len(data)
+
+    def _add_buffer_view(self, data: bytes, target: Optional[int] = None,
+                         byte_stride: Optional[int] = None) -> int:
+        offset = self._bin_len
+        self._write_bin(data)
         # 4바이트 정렬
-        pad = (4 - len(self._bin) % 4) % 4
-        self._bin.extend(b"\x00" * pad)
+        pad = (4 - self._bin_len % 4) % 4
+        if pad:
+            self._write_bin(b"\x00" * pad)
         idx = len(self._buffer_views)
-        self._buffer_views.append({"buffer": 0, "byteOffset": offset, "byteLength": len(data), "target": target})
+        view = {"buffer": 0, "byteOffset": offset, "byteLength": len(data)}
+        if byte_stride is not None:
+            view["byteStride"] = byte_stride
+        if target is not None:
+            view["target"] = target
+        self._buffer_views.append(view)
         return idx
 
     def _add_accessor(self, bv_idx: int, component_type: int, count: int,
-                      type_: str, min_=None, max_=None) -> int:
+                      type_: str, min_=None, max_=None, normalized: bool = False) -> int:
         acc: dict = {
             "bufferView": bv_idx,
             "byteOffset": 0,
@@ -603,6 +763,8 @@ class GlbBuilder:
             "count": count,
             "type": type_,
         }
+        if normalized:
+            acc["normalized"] = True
         if min_ is not None:
             acc["min"] = min_
         if max_ is not None:
@@ -633,55 +795,217 @@ class GlbBuilder:
 
     # ── 부재 추가 ────────────────────────────────────────────────────
 
-    def add_element(self, element_id: str, positions: np.ndarray,
-                    normals: np.ndarray, indices: np.ndarray,
-                    color: list, element_type: str, extras: dict) -> None:
-        """positions: (N,3) float32, normals: (N,3) float32, indices: (M,) uint32"""
-
-        ARRAY_BUFFER = 34962
-        ELEMENT_ARRAY_BUFFER = 34963
-        FLOAT = 5126
-        UNSIGNED_INT = 5125
+    def _add_primitive(self, positions: np.ndarray, normals: np.ndarray,
+                       indices: np.ndarray, mat_idx: int) -> dict:
+        """positions 가 int16 이면 양자화 좌표(_quantize_positions 결과)로 기록."""
+        n_verts = len(positions)
+        n_idx   = len(indices)
+        min_pos = positions.min(axis=0).tolist()
+        max_pos = positions.max(axis=0).tolist()
 
-        pos_bytes = _pack_f32(positions)
-        nrm_bytes = _pack_f32(normals)
-        idx_bytes = _pack_u32(indices)
+        if positions.dtype == np.int16:
+            bv_pos  = self._add_buffer_view(_pack_padded(positions, np.int16, 4), _ARRAY_BUFFER, 8)
+            acc_pos = self._add_accessor(bv_pos, _SHORT, n_verts, "VEC3", min_pos, max_pos)
+        else:
+            bv_pos  = self._add_buffer_view(_pack_f32(positions), _ARRAY_BUFFER)
+            acc_pos = self._add_accessor(bv_pos, _FLOAT, n_verts, "VEC3", min_pos, max_pos)
+
+        if self._quantize:
+            nrm_q   = np.clip(np.round(normals * 127.0), -127, 127)
+            bv_nrm  = self._add_buffer_view(_pack_padded(nrm_q, np.int8, 4), _ARRAY_BUFFER, 4)
+            acc_nrm = self._add_accessor(bv_nrm, _BYTE, n_verts, "VEC3", normalized=True)
+            idx_bytes, idx_type = _compact_indices(indices, n_verts)
+        else:
+            bv_nrm  = self._add_buffer_view(_pack_f32(normals), _ARRAY_BUFFER)
+            acc_nrm = self._add_accessor(bv_nrm, _FLOAT, n_verts, "VEC3")
+            idx_bytes, idx_type = _pack_u32(indices), _UNSIGNED_INT
 
-        bv_pos = self._add_buffer_view(pos_bytes, ARRAY_BUFFER)
-        bv_nrm = self._add_buffer_view(nrm_bytes, ARRAY_BUFFER)
-        bv_idx = self._add_buffer_view(idx_bytes, ELEMENT_ARRAY_BUFFER)
+        bv_idx  = self._add_buffer_view(idx_bytes, _ELEMENT_ARRAY_BUFFER)
+        acc_idx = self._add_accessor(bv_idx, idx_type, n_idx, "SCALAR")
 
-        min_pos = positions.min(axis=0).tolist()
-        max_pos = positions.max(axis=0).tolist()
+        return {
+            "attributes": {"POSITION": acc_pos, "NORMAL": acc_nrm},
+            "indices": acc_idx,
+            "material": mat_idx,
+        }
 
-        n_verts = len(positions)
-        n_idx   = len(indices)
+    def _add_mesh(self, positions: np.ndarray, normals: np.ndarray,
+                  indices: np.ndarray, mat_idx: int) -> int:
+        mesh_idx = len(self._meshes)
+        if self._quantize:
+            positions, offset, scale = _quantize_positions(positions)
+            self._mesh_dequant[mesh_idx] = (offset, scale)
+        self._meshes.append({"primitives": [self._add_primitive(positions, normals, indices, mat_idx)]})
+        return mesh_idx
+
+    def _add_instanced_mesh(self, positions: np.ndarray, normals: np.ndarray,
+                            indices: np.ndarray, mat_idx: int,
+                            rotation_matrix: Optional[np.ndarray]) -> tuple[int, dict]:
+        """부재 배치 회전(rotation_matrix) 기준 로컬 좌표로 되돌린 형상을 해시해
+        동일 mesh를 재사용한다. 반환: (mesh_idx, node TRS dict)."""
+        R = rotation_matrix
+        if R is not None and not (abs(np.linalg.det(R) - 1.0) < 1e-3):
+            R = None  # 반사 배치(det<0) 등은 회전 없이 평행이동만 사용
+
+        local = positions.astype(np.float64)
+        local_nrm = normals.astype(np.float64)
+        if R is not None:
+            local = local @ R          # p_local = Rᵀ · p
+            local_nrm = local_nrm @ R
+        origin = local.min(axis=0)
+        local -= origin
+
+        h = hashlib.sha1()
+        h.update(np.int32(mat_idx).tobytes())
+        h.update(np.round(local / _INSTANCE_POS_TOL).astype(np.int64).tobytes())
+        h.update(np.round(local_nrm / _INSTANCE_NRM_TOL).astype(np.int32).tobytes())
+        h.update(indices.astype(np.uint32).tobytes())
+        key = h.digest()
+
+        mesh_idx = self._mesh_cache.get(key)
+        if mesh_idx is None:
+            mesh_idx = self._add_mesh(local.astype(np.float32), local_nrm.astype(np.float32),
+                                      indices, mat_idx)
+            self._mesh_cache[key] = mesh_idx
+        else:
+            self.instanced_nodes += 1
+
+        trs: dict = {}
+        dequant = self._mesh_dequant.get(mesh_idx)
+        if dequant is not None:
+            # 양자화 복원: p = R·(origin + offset + scale·q) → translation 에 offset 포함 + 균일 scale
+            origin = origin + dequant[0]
+            trs["scale"] = [dequant[1]] * 3
+        if R is not None:
+            trs["translation"] = [float(v) for v in (R @ origin)]
+            trs["rotation"]    = _rotation_to_quaternion(R)
+        else:
+            trs["translation"] = [float(v) for v in origin]
+        return mesh_idx, trs
 
-        acc_pos = self._add_accessor(bv_pos, FLOAT,         n_verts, "VEC3", min_pos, max_pos)
-        acc_nrm = self._add_accessor(bv_nrm, FLOAT,         n_verts, "VEC3")
-        acc_idx = self._add_accessor(bv_idx, UNSIGNED_INT,  n_idx,   "SCALAR")
+    # ── 부재 추가 ────────────────────────────────────────────────────
 
+    def add_element(self, element_id: str, positions: np.ndarray,
+                    normals: np.ndarray, indices: np.ndarray,
+                    color: list, element_type: str, extras: dict,
+                    rotation_matrix: Optional[np.ndarray] = None) -> None:
+        """positions: (N,3) float32, normals: (N,3) float32, indices: (M,) uint32
+        rotation_matrix: 부재 배치 회전 (instancing 모드에서 회전된 반복 부재 매칭용)"""
         mat_idx = self._get_or_create_material(color)
+        self.triangles += len(indices) // 3
+
+        if self._merged:
+            feature_idx = len(self._features)
+            self._features.append({
+                "elementId":   element_id,
+                "globalId":    extras.get("globalId"),
+                "elementType": element_type,
+                "storey":      extras.get("storey"),
+            })
+            self._batches.setdefault(mat_idx, []).append((positions, normals, indices, feature_idx))
+            return
 
-        mesh_idx = len(self._meshes)
-        self._meshes.append({
-            "primitives": [{
-                "attributes": {"POSITION": acc_pos, "NORMAL": acc_nrm},
-                "indices": acc_idx,
-                "material": mat_idx,
-            }]
+        node: dict = {"name": element_id}
+        if self._instancing:
+            mesh_idx, trs = self._add_instanced_mesh(positions, normals, indices, mat_idx, rotation_matrix)
+            node.update(trs)
+        else:
+            mesh_idx = self._add_mesh(positions, normals, indices, mat_idx)
+            dequant = self._mesh_dequant.get(mesh_idx)
+            if dequant is not None:
+                offset, scale = dequant
+                node["translation"] = [float(v) for v in offset]
+                node["scale"] = [scale, scale, scale]
+
+        node["mesh"] = mesh_idx
+        node["extras"] = {**extras, "elementId": element_id, "elementType": element_type}
+        self._nodes.append(node)
+
+    def add_instances(self, name: str, positions: np.ndarray, normals: np.ndarray,
+                      indices: np.ndarray, color: list, translations: np.ndarray,
+                      rotations: np.ndarray, scales: np.ndarray, extras: dict) -> None:
+        """mesh 1개 + EXT_mesh_gpu_instancing node 1개로 인스턴스 N개를 기록.
+        translations/scales: (N,3), rotations: (N,4) 쿼터니언 [x, y, z, w].
+        인스턴스 TRS 는 node 변환 안쪽에 적용되므로 양자화 복원(node scale)·merged 모드와는 함께 쓸 수 없다."""
+        if self._quantize or self._merged:
+            raise ValueError("add_instances 는 quantize / merged 모드와 함께 사용할 수 없습니다")
+        mat_idx  = self._get_or_create_material(color)
+        mesh_idx = self._add_mesh(positions, normals, indices, mat_idx)
+        count = len(translations)
+        self.triangles += count * (len(indices) // 3)
+
+        attributes = {}
+        for key, arr, type_ in (("TRANSLATION", translations, "VEC3"),
+                                ("ROTATION", rotations, "VEC4"),
+                                ("SCALE", scales, "VEC3")):
+            bv = self._add_buffer_view(_pack_f32(np.ascontiguousarray(arr)))
+            attributes[key] = self._add_accessor(bv, _FLOAT, count, type_)
+
+        self._nodes.append({
+            "name":       name,
+            "mesh":       mesh_idx,
+            "extensions": {"EXT_mesh_gpu_instancing": {"attributes": attributes}},
+            "extras":     extras,
         })
+        self._gpu_instancing = True
+
+    # ── merged 모드: 재질별 병합 primitive + feature table ─────────────
+
+    def _add_string_column(self, values: list) -> dict:
+        """문자열 열 → {offsets: bufferView(uint32, N+1), strings: bufferView(utf-8)}."""
+        encoded = [str(v).encode("utf-8") if v is not None else b"" for v in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.uint32)
+        offsets[1:] = np.cumsum([len(b) for b in encoded], dtype=np.uint64)
+        return {
+            "offsets": self._add_buffer_view(offsets.tobytes()),
+            "strings": self._add_buffer_view(b"".join(encoded)),
+        }
+
+    def _flush_merged(self) -> Optional[dict]:
+        if self._flushed:
+            return None
+        self._flushed = True
+        if not self._features:
+            return None
+
+        primitives: list[dict] = []
+        for mat_idx, batch in self._batches.items():
+            pos = np.concatenate([b[0] for b in batch]).astype(np.float32)
+            nrm = np.concatenate([b[1] for b in batch]).astype(np.float32)
+            counts = np.array([len(b[0]) for b in batch], dtype=np.int64)
+            bases  = np.concatenate([[0], np.cumsum(counts)[:-1]])
+            idx = np.concatenate([
+                b[2].astype(np.uint32) + np.uint32(base) for b, base in zip(batch, bases)
+            ])
+            feature = np.repeat(
+                np.array([b[3] for b in batch], dtype=np.float32), counts,
+            )
+
+            prim = self._add_primitive(pos, nrm, idx, mat_idx)
+            bv_feat = self._add_buffer_view(feature.tobytes(), _ARRAY_BUFFER)
+            prim["attributes"]["_ELEMENT_INDEX"] = self._add_accessor(
+                bv_feat, _FLOAT, len(feature), "SCALAR",
+            )
+            primitives.append(prim)
+        self._batches.clear()
+
+        mesh_idx = len(self._meshes)
+        self._meshes.append({"primitives": primitives})
+        self._nodes.append({"name": "merged", "mesh": mesh_idx})
 
-        node: dict = {
-            "name": element_id,
-            "mesh": mesh_idx,
-            "extras": {**extras, "elementId": element_id, "elementType": element_type},
+        return {
+            "count":   len(self._features),
+            "columns": {
+                key: self._add_string_column([f[key] for f in self._features])
+                for key in ("elementId", "globalId", "elementType", "storey")
+            },
         }
-        self._nodes.append(node)
 
     # ── GLB 최종 빌드 ────────────────────────────────────────────────
 
-    def build(self) -> bytes:
+    def _glb_prefix(self) -> bytes:
+        """GLB 헤더 + JSON 청크 + BIN 청크 헤더 (BIN 데이터 직전까지)."""
+        feature_table = self._flush_merged() if self._merged else None
         scene_nodes = list(range(len(self._nodes)))
         gltf_json = {
             "asset": {"version": "2.0", "generator": "twinSpring-ifc-converter"},
@@ -692,62 +1016,174 @@ class GlbBuilder:
             "materials": self._materials,
             "accessors": self._accessors,
             "bufferViews": self._buffer_views,
-            "buffers": [{"byteLength": len(self._bin)}],
+            "buffers": [{"byteLength": self._bin_len}],
         }
+        if feature_table is not None:
+            gltf_json["extras"] = {"featureTable": feature_table}
+        extensions = []
+        if self._quantize and self._meshes:
+            extensions.append("KHR_mesh_quantization")
+        if self._gpu_instancing:
+            # 폴백 없이 node 1개가 인스턴스 전체를 나타내므로 필수 확장으로 선언
+            extensions.append("EXT_mesh_gpu_instancing")
+        if extensions:
+            gltf_json["extensionsUsed"]     = extensions
+            gltf_json["extensionsRequired"] = list(extensions)
 
         json_bytes = json.dumps(gltf_json, separators=(",", ":")).encode("utf-8")
         # JSON 청크: 4바이트 정렬, 패딩은 space(0x20)
         json_pad = (4 - len(json_bytes) % 4) % 4
         json_bytes += b" " * json_pad
 
-        bin_data = bytes(self._bin)
-
         # GLB 헤더: magic(4) + version(4) + length(4) = 12
         # JSON 청크: length(4) + type(4) + data
         # BIN  청크: length(4) + type(4) + data
         json_chunk = struct.pack("<II", len(json_bytes), 0x4E4F534A) + json_bytes
-        bin_chunk  = struct.pack("<II", len(bin_data),  0x004E4942) + bin_data
-        total_len  = 12 + len(json_chunk) + len(bin_chunk)
+        bin_header = struct.pack("<II", self._bin_len, 0x004E4942)
+        total_len  = 12 + len(json_chunk) + len(bin_header) + self._bin_len
         header     = struct.pack("<III", 0x46546C67, 2, total_len)
 
-        return header + json_chunk + bin_chunk
+        return header + json_chunk + bin_header
 
+    def build(self) -> bytes:
+        if self._bin_file is not None:
+            raise RuntimeError("bin_file 사용 시 build_to() 로 출력해야 합니다")
+        return self._glb_prefix() + bytes(self._bin)
+
+    def build_to(self, path: str) -> int:
+        """GLB 를 파일로 기록 (bin_file 은 청크 단위 복사). 반환: 파일 크기."""
+        import shutil
+
+        prefix = self._glb_prefix()
+        with open(path, "wb") as out:
+            out.write(prefix)
+            if self._bin_file is not None:
+                self._bin_file.flush()
+                self._bin_file.seek(0)
+                shutil.copyfileobj(self._bin_file, out, 1024 * 1024)
+            else:
+                out.write(self._bin)
+        return len(prefix) + self._bin_len
+
+
+# ── 삼각분할 (직렬 / 멀티코어) ───────────────────────────────────────
+
+def _collect_products(ifc) -> list[tuple]:
+    """ELEMENT_TYPE_MAP 순서대로 (product, our_type) 목록 반환.
+    IfcWall/IfcWallStandardCase 등 서브타입 중복은 먼저 나온 매핑만 유지."""
+    products: list[tuple] = []
+    seen: set[int] = set()
+    for ifc_type, our_type in ELEMENT_TYPE_MAP.items():
+        for product in ifc.by_type(ifc_type):
+            express_id = product.id()
+            if express_id in seen:
+                continue
+            seen.add(express_id)
+            products.append((product, our_type))
+    return products
 
-# ── 메인 변환 함수 ────────────────────────────────────────────────────
 
-def convert_ifc_to_glb(ifc_bytes: bytes, user_scale: float = 1.0, project_id: str = "") -> dict:
-    """
-    IFC 바이너리 → GLB + 메타데이터 변환.
+def _geometry_arrays(geom) -> Optional[tuple]:
+    """ifcopenshell geometry → (verts (N,3) f32, faces (M,) u32, normals (N,3) f32 | None).
+    정점·면이 비어 있으면 None."""
+    verts_flat = geom.verts   # [x0,y0,z0, x1,y1,z1, ...]
+    faces_flat = geom.faces   # [i0,i1,i2, ...]
+    if not verts_flat or not faces_flat:
+        return None
 
-    user_scale: 자동 감지 스케일에 추가로 곱하는 배율 (기본 1.0).
-                mm 단위 IFC면 1000 입력.
+    verts = np.array(verts_flat, dtype=np.float32).reshape(-1, 3)
+    faces = np.array(faces_flat, dtype=np.uint32)
+    if len(faces) == 0:
+        return None
 
-    반환 dict:
-      glb_bytes  : bytes
-      elements   : list[dict]   BimElementDTO 형식
-      storeys    : list[dict]
-      geo_origin : dict
-    """
+    normals = None
     try:
-        import ifcopenshell
-        import ifcopenshell.geom
-    except ImportError as e:
-        raise RuntimeError("ifcopenshell 미설치: pip install ifcopenshell") from e
+        nrm_flat = geom.normals
+        if nrm_flat and len(nrm_flat) == len(verts_flat):
+            normals = np.array(nrm_flat, dtype=np.float32).reshape(-1, 3)
+    except Exception:
+        pass
+    return verts, faces, normals
 
-    import tempfile, os
 
-    # ifcopenshell은 파일 경로가 필요 → 임시 파일 사용
-    with tempfile.NamedTemporaryFile(suffix=".ifc", delete=False) as tmp:
-        tmp.write(ifc_bytes)
-        tmp_path = tmp.name
+def _iter_shapes_serial(settings, products: list[tuple], progress=None,
+                        done_offset: int = 0, total: Optional[int] = None, profile=None):
+    """create_shape 으로 부재를 하나씩 삼각분할. (expressId, _geometry_arrays 결과) 를 yield.
+    profile 이 있으면 부재별 삼각분할 시간을 기록 (slowestProducts)."""
+    import ifcopenshell.geom
 
-    try:
-        ifc = ifcopenshell.open(tmp_path)
-    finally:
+    profile = profile if profile is not None else NULL_PROFILE
+    total = len(products) if total is None else total
+    for i, (product, _) in enumerate(products, 1):
+        if progress is not None:
+            progress("tessellate", done_offset + i, total)
+        t0 = time.perf_counter()
         try:
-            os.unlink(tmp_path)
+            shape = ifcopenshell.geom.create_shape(settings, product)
         except Exception:
-            pass
+            profile.count("shapeFailures")
+            continue
+        arrays = _geometry_arrays(shape.geometry)
+        if arrays is not None:
+            profile.product(product, time.perf_counter() - t0, len(arrays[1]) // 3)
+            yield product.id(), arrays
+
+
+def _iter_shapes_parallel(settings, ifc, products: list[tuple], num_workers: int, progress=None,
+                          profile=None):
+    """ifcopenshell 멀티스레드 geometry iterator로 삼각분할.
+    iterator는 완료 순서대로 결과를 내보내므로 호출 측이 expressId 로 재정렬해야 하며,
+    iterator가 놓친 부재는 create_shape 직렬 경로로 보충해 직렬 결과와 동일한 집합을 만든다."""
+    import ifcopenshell.geom
+
+    wanted = {p.id() for p, _ in products}
+    done: set[int] = set()
+    try:
+        iterator = ifcopenshell.geom.iterator(
+            settings, ifc, num_workers, include=[p for p, _ in products],
+        )
+        if iterator.initialize():
+            while True:
+                shape = iterator.get()
+                express_id = getattr(shape, "id", None)
+                if express_id in wanted and express_id not in done:
+                    arrays = _geometry_arrays(shape.geometry)
+                    if arrays is not None:
+                        done.add(express_id)
+                        if progress is not None:
+                            progress("tessellate", len(done), len(products))
+                        yield express_id, arrays
+                if not iterator.next():
+                    break
+    except Exception as e:
+        logger.warning("[IFC Geom] 병렬 iterator 실패 → 직렬 폴백: %s", e)
+
+    missing = [(p, t) for p, t in products if p.id() not in done]
+    logger.info("[IFC Geom] 병렬 삼각분할 %d개 (workers=%d, 직렬 보충 %d개)",
+                len(done), num_workers, len(missing))
+    if profile is not None:
+        profile.count("parallelShapes", len(done))
+    if missing:
+        yield from _iter_shapes_serial(settings, missing, progress,
+                                       done_offset=len(done), total=len(products), profile=profile)
+
+
+def _prepare_tessellation(ifc_path: str, user_scale: float, progress=None,
+                          optimize: bool = False, profile=None) -> dict:
+    """IFC 열기 + 단위·공간구조·관계 인덱스·geom 설정. tessellate_ifc / convert_ifc_file_streaming 공용.
+    profile(ifc_profile.ConversionProfile) 은 ctx["profile"] 로 이후 단계에 전달된다.
+    공유 mesh 저장소(ifc_meshstore)가 켜져 있으면 ctx["mesh_store"] 로 _iter_shapes 가 경유한다."""
+    try:
+        import ifcopenshell
+        import ifcopenshell.geom
+    except ImportError as e:
+        raise RuntimeError("ifcopenshell 미설치: pip install ifcopenshell") from e
+
+    profile = profile if profile is not None else NULL_PROFILE
+    if progress is not None:
+        progress("open", 0, 0)
+    with profile.phase("open"):
+        ifc = ifcopenshell.open(ifc_path)
 
     # ifcopenshell.geom.create_shape은 USE_WORLD_COORDS=True 시 자동으로 SI 단위(미터)를 반환.
     # → geometry 좌표에는 user_scale만 곱하면 됨 (unit_scale 이중 적용 시 1000배 축소 오류 발생).
@@ -760,8 +1196,11 @@ def convert_ifc_to_glb(ifc_bytes: bytes, user_scale: float = 1.0, project_id: st
     ifc_schema = getattr(ifc, "schema", None) or "UNKNOWN"
     logger.info("[IFC] 스키마: %s, 단위스케일: %s", ifc_schema, unit_scale)
 
-    geo_info = _extract_geo_origin(ifc)
-    elem_to_spatial, storeys = _extract_spatial_structure(ifc)
+    with profile.phase("spatial"):
+        geo_info = _extract_geo_origin(ifc)
+        elem_to_spatial, storeys = _extract_spatial_structure(ifc)
+    with profile.phase("relationships"):
+        rel_index = _build_relationship_index(ifc)
 
     # storey elevation을 미터 단위로 보정 (raw IFC 속성은 IFC 단위)
     for s in storeys:
@@ -781,117 +1220,448 @@ def convert_ifc_to_glb(ifc_bytes: bytes, user_scale: float = 1.0, project_id: st
         except Exception:
             pass
 
-    builder      = GlbBuilder()
-    lite_builder = GlbBuilder()
-    elements: list[dict] = []
+    return {
+        "ifc":             ifc,
+        "settings":        settings,
+        "products":        _collect_products(ifc),
+        "scale":           scale,
+        "ifc_schema":      ifc_schema,
+        "geo_info":        geo_info,
+        "storeys":         storeys,
+        "elem_to_spatial": elem_to_spatial,
+        "rel_index":       rel_index,
+        "meshopt":         _mesh_optimizer() if optimize else None,
+        "profile":         profile,
+        "unit_scale":      unit_scale,
+        "mesh_store":      get_mesh_store(),
+    }
 
-    all_positions: list[np.ndarray] = []  # 중앙 정렬용
-    raw_geoms: list[dict] = []            # 임시 저장
-    processed_ids: set[int] = set()       # 서브타입 중복 처리 방지
 
-    for ifc_type, our_type in ELEMENT_TYPE_MAP.items():
-        for product in ifc.by_type(ifc_type):
-            express_id = product.id()
-            if express_id in processed_ids:
-                continue  # IfcWall/IfcWallStandardCase 등 서브타입 중복 스킵
-            processed_ids.add(express_id)
-            # 이미 더 정밀한 타입으로 처리된 경우 스킵 (IfcWallStandardCase 등)
-            try:
-                shape = ifcopenshell.geom.create_shape(settings, product)
-            except Exception:
-                continue
+def _mesh_optimizer():
+    from ifc_meshopt import MeshOptimizer
+    return MeshOptimizer(pos_tol=_INSTANCE_POS_TOL)
 
-            geom = shape.geometry
-            verts_flat = geom.verts   # [x0,y0,z0, x1,y1,z1, ...]
-            faces_flat = geom.faces   # [i0,i1,i2, ...]
 
-            if not verts_flat or not faces_flat:
-                continue
+def _iter_shapes(ctx: dict, num_workers: int, progress=None):
+    if ctx.get("mesh_store") is not None:
+        from ifc_meshstore import iter_shapes
+        return iter_shapes(ctx, ctx["mesh_store"], num_workers, progress)
+    profile = ctx.get("profile")
+    if num_workers > 1:
+        return _iter_shapes_parallel(ctx["settings"], ctx["ifc"], ctx["products"], num_workers, progress,
+                                     profile=profile)
+    return _iter_shapes_serial(ctx["settings"], ctx["products"], progress, profile=profile)
 
-            # IFC Z-up 좌표계 그대로 유지 (축 변환 없음) + 스케일만 적용
-            arr = np.array(verts_flat, dtype=np.float32).reshape(-1, 3)
-            px = arr[:, 0] * scale  # IFC X → X
-            py = arr[:, 1] * scale  # IFC Y → Y
-            pz = arr[:, 2] * scale  # IFC Z → Z (높이, Z-up 유지)
 
-            pos = np.column_stack([px, py, pz]).astype(np.float32)
+def _element_geometry(ctx: dict, product, our_type: str, shape_arrays: tuple) -> dict:
+    """삼각분할 결과 1건 → 스케일 적용 형상(pos/nrm/idx) + bbox + 부재 속성."""
+    profile = ctx.get("profile") or NULL_PROFILE
+    with profile.phase("geometry"):
+        g = _scaled_geometry(ctx, shape_arrays)
+    with profile.phase("metadata"):
+        g.update(_element_attributes(ctx, product, our_type))
+    mesh_key = ctx.get("mesh_keys", {}).get(product.id())
+    if mesh_key is not None:
+        g["mesh_key"] = mesh_key
+    return g
 
-            idx = np.array(faces_flat, dtype=np.uint32)
-            if len(idx) == 0:
-                continue
 
-            # 노말 계산
-            try:
-                nrm_flat = geom.normals
-                if nrm_flat and len(nrm_flat) == len(verts_flat):
-                    nrm_arr = np.array(nrm_flat, dtype=np.float32).reshape(-1, 3)
-                    nx = nrm_arr[:, 0]
-                    ny = nrm_arr[:, 1]
-                    nz = nrm_arr[:, 2]
-                    nrm = np.column_stack([nx, ny, nz]).astype(np.float32)
-                else:
-                    raise ValueError("no normals")
-            except Exception:
-                # 노말 직접 계산 (face normal → vertex normal)
-                nrm = _compute_normals(pos, idx)
+def _scaled_geometry(ctx: dict, shape_arrays: tuple) -> dict:
+    """스케일 적용 + 노말 보완 + meshopt + bbox."""
+    arr, idx, nrm_arr = shape_arrays
+    scale = ctx["scale"]
 
-            express_id = product.id()
-            element_id = f"IFC-{express_id}-{project_id}" if project_id else f"IFC-{express_id}"
-
-            # IfcSlab with PredefinedType=ROOF → IfcRoof 재분류
-            # ifcopenshell은 IFC4 기준 "ROOF", IFC2x3 기준 ".ROOF." 반환
-            if our_type == "IfcSlab":
-                pre = getattr(product, "PredefinedType", None)
-                if pre is not None and str(pre).strip(".").upper() == "ROOF":
-                    our_type = "IfcRoof"
-
-            spatial   = elem_to_spatial.get(express_id, {})
-            global_id = getattr(product, "GlobalId", None)
-            ifc_name  = getattr(product, "Name", None)
-
-            min_pos = pos.min(axis=0)
-            max_pos = pos.max(axis=0)
-            center  = (min_pos + max_pos) / 2.0
-            size    = np.maximum(max_pos - min_pos, 0.05)
-
-            # ── 속성 추출 (B-1~B-4, C-1) ─────────────────────────────
-            material   = _extract_material(ifc, product)
-            quantities = _extract_quantities(ifc, product)
-            properties = _extract_properties(ifc, product)
-            rotation   = _extract_rotation(product)
-
-            raw_geoms.append({
-                "element_id": element_id,
-                "our_type":   our_type,
-                "pos":        pos,
-                "nrm":        nrm,
-                "idx":        idx,
-                "center":     center,
-                "size":       size,
-                "spatial":    spatial,
-                "global_id":  global_id,
-                "ifc_name":   ifc_name,
-                "material":   material,
-                "quantities": quantities,
-                "properties": properties,
-                "rotation":   rotation,
-            })
-            all_positions.append(pos)
+    # IFC Z-up 좌표계 그대로 유지 (축 변환 없음) + 스케일만 적용
+    px = arr[:, 0] * scale  # IFC X → X
+    py = arr[:, 1] * scale  # IFC Y → Y
+    pz = arr[:, 2] * scale  # IFC Z → Z (높이, Z-up 유지)
 
-    if not raw_geoms:
-        logger.warning("[IFC Convert] 변환 가능한 부재가 없습니다.")
-        return {
-            "glb_bytes":      builder.build(),
-            "glb_lite_bytes": lite_builder.build(),
-            "elements":       [],
-            "storeys":        storeys,
-            "geo_origin":     {**geo_info, "ifcOffsetX": 0, "ifcOffsetY": 0, "ifcOffsetZ": 0, "scale": scale, "ifcSchema": ifc_schema},
-        }
+    pos = np.column_stack([px, py, pz]).astype(np.float32)
+
+    # 노말: ifcopenshell 제공값 우선, 없으면 face normal → vertex normal 직접 계산
+    if nrm_arr is not None:
+        nrm = nrm_arr
+    else:
+        nrm = _compute_normals(pos, idx)
+
+    # 선택: 정점 용접 + 정점 캐시 재정렬 (ifc_meshopt)
+    if ctx.get("meshopt") is not None:
+        pos, nrm, idx = ctx["meshopt"].run(pos, nrm, idx)
+
+    min_pos = pos.min(axis=0)
+    max_pos = pos.max(axis=0)
+
+    return {
+        "pos":        pos,
+        "nrm":        nrm,
+        "idx":        idx,
+        "bbox_min":   min_pos,
+        "bbox_max":   max_pos,
+        "center":     (min_pos + max_pos) / 2.0,
+        "size":       np.maximum(max_pos - min_pos, 0.05),
+    }
+
+
+def _element_attributes(ctx: dict, product, our_type: str) -> dict:
+    """형상과 무관한 부재 속성 (B-1~B-4, C-1) — 증분 변환에서 형상 재사용 시에도 새로 추출."""
+    express_id = product.id()
+
+    # IfcSlab with PredefinedType=ROOF → IfcRoof 재분류
+    # ifcopenshell은 IFC4 기준 "ROOF", IFC2x3 기준 ".ROOF." 반환
+    if our_type == "IfcSlab":
+        pre = getattr(product, "PredefinedType", None)
+        if pre is not None and str(pre).strip(".").upper() == "ROOF":
+            our_type = "IfcRoof"
+
+    rel_index  = ctx["rel_index"]
+    rot_matrix = _placement_rotation(product)
+
+    return {
+        "express_id": express_id,
+        "our_type":   our_type,
+        "spatial":    ctx["elem_to_spatial"].get(express_id, {}),
+        "global_id":  getattr(product, "GlobalId", None),
+        "ifc_name":   getattr(product, "Name", None),
+        "material":   rel_index["material"].get(express_id),
+        "quantities": rel_index["quantities"].get(express_id, {}),
+        "properties": rel_index["properties"].get(express_id, {}),
+        "rotation":   _rotation_to_euler(rot_matrix),
+        "rot_matrix": rot_matrix,
+    }
+
+
+class _GeometrySpill:
+    """스트리밍 변환 1차 패스용 — 부재 형상을 임시 파일에 순차 기록하고 expressId 로 다시 읽는다."""
+
+    def __init__(self, dir: Optional[str] = None):
+        import tempfile
+        self._file = tempfile.TemporaryFile(dir=dir)
+        self._index: dict[int, tuple[int, int, int]] = {}   # expressId → (offset, 정점 수, 인덱스 수)
+        self.nbytes = 0
+
+    def write(self, key: int, pos: np.ndarray, nrm: np.ndarray, idx: np.ndarray) -> None:
+        self._index[key] = (self.nbytes, len(pos), len(idx))
+        for data in (_pack_f32(pos), _pack_f32(nrm), _pack_u32(idx)):
+            self._file.write(data)
+            self.nbytes += len(data)
+
+    def read(self, key: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        offset, n_verts, n_idx = self._index[key]
+        self._file.seek(offset)
+        pos = np.frombuffer(self._file.read(n_verts * 12), dtype=np.float32).reshape(-1, 3)
+        nrm = np.frombuffer(self._file.read(n_verts * 12), dtype=np.float32).reshape(-1, 3)
+        idx = np.frombuffer(self._file.read(n_idx * 4), dtype=np.uint32)
+        return pos, nrm, idx
+
+    def close(self) -> None:
+        self._file.close()
+
+
+# ── 메인 변환 함수 ────────────────────────────────────────────────────
+
+def convert_ifc_to_glb(ifc_bytes: bytes, user_scale: float = 1.0, project_id: str = "",
+                       num_workers: int = 1, instancing: bool = False,
+                       output_mode: str = "nodes", cache=None, progress=None,
+                       quantize: bool = False, optimize: bool = False, lods: bool = False,
+                       bvh: bool = False) -> dict:
+    """
+    IFC 바이너리 → GLB + 메타데이터 변환.
+    ifcopenshell은 파일 경로가 필요하므로 임시 파일에 기록 후 convert_ifc_file 호출.
+    인자·반환값은 convert_ifc_file 참고.
+    """
+    import tempfile, os
+
+    with tempfile.NamedTemporaryFile(suffix=".ifc", delete=False) as tmp:
+        tmp.write(ifc_bytes)
+        tmp_path = tmp.name
+
+    try:
+        return convert_ifc_file(tmp_path, user_scale=user_scale, project_id=project_id,
+                                num_workers=num_workers, instancing=instancing,
+                                output_mode=output_mode, cache=cache, progress=progress,
+                                quantize=quantize, optimize=optimize, lods=lods, bvh=bvh)
+    finally:
+        try:
+            os.unlink(tmp_path)
+        except Exception:
+            pass
+
+
+def convert_ifc_file(ifc_path: str, user_scale: float = 1.0, project_id: str = "",
+                     num_workers: int = 1, instancing: bool = False,
+                     output_mode: str = "nodes", cache=None, progress=None,
+                     quantize: bool = False, optimize: bool = False, lods: bool = False,
+                     bvh: bool = False) -> dict:
+    """
+    IFC 파일 → GLB + 메타데이터 변환.
+
+    user_scale:  자동 감지 스케일에 추가로 곱하는 배율 (기본 1.0).
+                 mm 단위 IFC면 1000 입력.
+    num_workers: 삼각분할 워커 수. 2 이상이면 ifcopenshell 멀티스레드 geometry
+                 iterator 사용 (출력은 직렬 경로와 동일). 0 이하는 CPU 코어 수.
+    instancing:  True면 동일 형상 부재(반복 기둥·창호 등)의 mesh를 한 번만 기록하고
+                 node translation/rotation 으로 배치.
+    output_mode: "nodes"  — 부재마다 node/mesh 1개 (기본)
+                 "merged" — 재질별 병합 primitive + _ELEMENT_INDEX 정점 속성 +
+                            extras.featureTable (index → elementId/globalId) 바이너리 표
+    cache:       ifc_cache.ConversionCache — SHA-256(IFC) + user_scale 키로 삼각분할·메타데이터
+                 재사용. 히트 시 ifcopenshell 을 열지 않고 project_id 의존 조립만 수행.
+    progress:    progress(phase, done, total) 콜백 — phase 는 "open" | "tessellate" | "assemble".
+                 작업 API(ifc_jobs)가 SSE 진행률로 전달한다.
+    quantize:    True면 KHR_mesh_quantization — POSITION int16 + node scale/translation,
+                 NORMAL int8, 인덱스 uint8/uint16 (GLB 크기 약 절반).
+    optimize:    True면 삼각분할 직후 정점 용접 + 정점 캐시 재정렬 (ifc_meshopt).
+                 통계는 stats.meshopt (정점 감소율, ACMR).
+    lods:        True면 부재별 quadric 단순화 LOD1~3 GLB 추가 (ifc_lod) —
+                 lod_glbs: list[bytes], lod_levels: [{level, screenCoverage, triangles}]
+    bvh:         True면 부재 삼각형 BVH 사이드카 (ifc_bvh) — bvh_bytes (ray / box 질의용 npz)
+
+    반환 dict:
+      glb_bytes  : bytes
+      elements   : list[dict]   BimElementDTO 형식
+      storeys    : list[dict]
+      geo_origin : dict
+      stats      : dict         부재·mesh·인스턴스·삼각형 수, 캐시 히트 여부,
+                                profile (ifc_profile — 단계별 시간, 최대 RSS, 느린 부재 Top-N)
+    """
+    profile = ConversionProfile()
+    tess, cache_hit = _cached_tessellation(ifc_path, user_scale, num_workers, cache,
+                                           progress, optimize, profile)
+    result = assemble_glb(tess, project_id=project_id, instancing=instancing,
+                          output_mode=output_mode, progress=progress, quantize=quantize,
+                          lods=lods, bvh=bvh, profile=profile)
+    result["stats"]["cacheHit"] = cache_hit
+    retain_meshes(project_id, geometry_keys(tess["geoms"]))
+    return result
+
+
+def convert_ifc_file_tiled(ifc_path: str, tile_sink, user_scale: float = 1.0,
+                           project_id: str = "", num_workers: int = 1, instancing: bool = False,
+                           cache=None, progress=None, quantize: bool = False,
+                           optimize: bool = False, max_tile_elements: int = 0) -> dict:
+    """
+    IFC 파일 → 층별 + 옥트리 타일 GLB + 매니페스트 (assemble_tiles).
+    삼각분할·변환 캐시는 convert_ifc_file 과 공유한다.
+    """
+    profile = ConversionProfile()
+    tess, cache_hit = _cached_tessellation(ifc_path, user_scale, num_workers, cache,
+                                           progress, optimize, profile)
+    result = assemble_tiles(tess, tile_sink, project_id=project_id, instancing=instancing,
+                            progress=progress, quantize=quantize,
+                            max_tile_elements=max_tile_elements, profile=profile)
+    result["stats"]["cacheHit"] = cache_hit
+    retain_meshes(project_id, geometry_keys(tess["geoms"]))
+    return result
+
+
+def _cached_tessellation(ifc_path: str, user_scale: float, num_workers: int, cache,
+                         progress, optimize: bool, profile=None) -> tuple[dict, bool]:
+    """변환 캐시 조회 → 없으면 tessellate_ifc 후 저장. 반환: (tess, 캐시 히트 여부)."""
+    profile = profile if profile is not None else NULL_PROFILE
+    tess = None
+    cache_key = None
+    if cache is not None:
+        from ifc_cache import file_sha256
+        with profile.phase("cache"):
+            cache_key = cache.key(file_sha256(ifc_path), user_scale, optimize)
+            tess = cache.get(cache_key)
+
+    cache_hit = tess is not None
+    if tess is None:
+        tess = tessellate_ifc(ifc_path, user_scale=user_scale, num_workers=num_workers,
+                              progress=progress, optimize=optimize, profile=profile)
+        if cache is not None:
+            with profile.phase("cache"):
+                cache.put(cache_key, tess)
+    return tess, cache_hit
+
+
+def tessellate_ifc(ifc_path: str, user_scale: float = 1.0, num_workers: int = 1,
+                   progress=None, optimize: bool = False, profile=None) -> dict:
+    """
+    IFC 파일 → project_id 와 무관한 삼각분할 결과 + 부재 메타데이터.
+    (변환 캐시에 그대로 저장되는 단위)
+
+    반환 dict:
+      geoms      : list[dict]  부재별 pos/nrm/idx(IFC 월드 좌표, 미터) + 속성
+      storeys    : list[dict]
+      geo_info   : dict
+      ifc_schema : str
+      scale      : float
+      meshopt    : dict | None  optimize=True 일 때 MeshOptimizer 통계
+    """
+    import os
+
+    if num_workers <= 0:
+        num_workers = os.cpu_count() or 1
 
+    ctx = _prepare_tessellation(ifc_path, user_scale, progress, optimize, profile)
+    with ctx["profile"].phase("tessellate"):
+        shapes = dict(_iter_shapes(ctx, num_workers, progress))
+
+    # 병렬 모드에서도 ELEMENT_TYPE_MAP 순서를 그대로 따라 직렬 경로와 동일한 출력 보장
+    raw_geoms: list[dict] = []
+    for product, our_type in ctx["products"]:
+        shape_arrays = shapes.pop(product.id(), None)
+        if shape_arrays is not None:
+            raw_geoms.append(_element_geometry(ctx, product, our_type, shape_arrays))
+
+    return {
+        "geoms":      raw_geoms,
+        "storeys":    ctx["storeys"],
+        "geo_info":   ctx["geo_info"],
+        "ifc_schema": ctx["ifc_schema"],
+        "scale":      ctx["scale"],
+        "meshopt":    ctx["meshopt"].stats() if ctx["meshopt"] is not None else None,
+    }
+
+
+def convert_ifc_file_streaming(ifc_path: str, glb_path: str, glb_lite_path: str,
+                               user_scale: float = 1.0, project_id: str = "",
+                               num_workers: int = 1, instancing: bool = False,
+                               progress=None, spill_dir: Optional[str] = None,
+                               quantize: bool = False, optimize: bool = False,
+                               lod_paths: Optional[list[str]] = None,
+                               bvh_path: Optional[str] = None) -> dict:
+    """
+    최대 메모리를 모델 크기와 무관하게 제한하는 2-패스 변환 (대용량 IFC 용).
+
+    1차 패스: 삼각분할 결과를 부재 단위로 임시 파일(spill)에 기록하면서
+              전체 bbox 를 running min/max 로 계산 → 원점(cx, cy, 지상 1층 Z) 확정
+    2차 패스: 부재를 ELEMENT_TYPE_MAP 순서로 하나씩 다시 읽어 원점 이동 후
+              파일 기반 GlbBuilder(bin_file) 에 바로 추가
+    → 메모리에는 부재 1개분 형상 + 메타데이터 / glTF JSON 만 남는다.
+      OCC 삼각분할을 두 번 돌리지 않도록 2차 패스는 spill 파일에서 읽는다.
+
+    merged 모드(재질별 병합)는 전체 형상을 모아야 하므로 지원하지 않고, 변환 캐시도 쓰지 않는다.
+    GLB 는 glb_path / glb_lite_path 에 기록. 반환 dict 는 convert_ifc_file 과 같되
+    glb_bytes / glb_lite_bytes 대신 glb_size / glb_lite_size.
+    lod_paths(ifc_lod.LOD_LEVELS 길이)를 주면 LOD1~3 GLB 도 기록하고 lod_sizes / lod_levels 추가.
+    bvh_path 를 주면 부재 삼각형 BVH 사이드카(ifc_bvh)도 기록하고 bvh_size 추가
+    (BVH 는 전체 삼각형을 모아야 하므로 그만큼 메모리를 더 쓴다).
+    """
+    import contextlib
+    import os
+    import tempfile
+
+    if num_workers <= 0:
+        num_workers = os.cpu_count() or 1
+
+    profile = ConversionProfile()
+    ctx = _prepare_tessellation(ifc_path, user_scale, progress, optimize, profile)
+    by_id = {p.id(): (p, t) for p, t in ctx["products"]}
+    spill = _GeometrySpill(spill_dir)
+    try:
+        # ── 1차 패스: 삼각분할 → spill + running bbox ────────────────
+        metas: dict[int, dict] = {}
+        all_min = np.full(3, np.inf)
+        all_max = np.full(3, -np.inf)
+        with profile.phase("tessellate"):
+            for express_id, shape_arrays in _iter_shapes(ctx, num_workers, progress):
+                product, our_type = by_id[express_id]
+                g = _element_geometry(ctx, product, our_type, shape_arrays)
+                with profile.phase("spill"):
+                    spill.write(express_id, g.pop("pos"), g.pop("nrm"), g.pop("idx"))
+                np.minimum(all_min, g["bbox_min"], out=all_min)
+                np.maximum(all_max, g["bbox_max"], out=all_max)
+                metas[express_id] = g
+
+        order = [p.id() for p, _ in ctx["products"] if p.id() in metas]
+        mesh_keys = geometry_keys(metas.values())
+        storeys, geo_info = ctx["storeys"], ctx["geo_info"]
+        ifc_schema, scale = ctx["ifc_schema"], ctx["scale"]
+        meshopt = ctx["meshopt"]
+        del ctx, by_id  # ifcopenshell 파일 핸들 해제 — 2차 패스에는 불필요
+        logger.info("[IFC Stream] 1차 패스: 부재 %d개, spill %.1fMB", len(order), spill.nbytes / 1e6)
+
+        # ── 2차 패스: spill → 파일 기반 GLB ────────────────────────
+        if order:
+            cx, cy, z_origin = _scene_origin(all_min, all_max, storeys)
+        else:
+            logger.warning("[IFC Convert] 변환 가능한 부재가 없습니다.")
+            cx = cy = z_origin = 0.0
+
+        elements: list[dict] = []
+        lod_paths = lod_paths or []
+        with contextlib.ExitStack() as stack:
+            def _file_builder() -> GlbBuilder:
+                bin_file = stack.enter_context(tempfile.TemporaryFile(dir=spill_dir))
+                return GlbBuilder(instancing=instancing, bin_file=bin_file, quantize=quantize)
+
+            builder      = _file_builder()
+            lite_builder = _file_builder()
+            lod_builders = [_file_builder() for _ in lod_paths]
+            bvh_builder  = _bvh_builder(bvh_path is not None)
+            with profile.phase("assemble"):
+                for i, express_id in enumerate(order, 1):
+                    if progress is not None:
+                        progress("assemble", i, len(order))
+                    g = metas.pop(express_id)
+                    with profile.phase("spill"):
+                        g["pos"], g["nrm"], g["idx"] = spill.read(express_id)
+                    elements.append(_assemble_element(g, (cx, cy, z_origin), project_id,
+                                                      builder, lite_builder, lod_builders, profile,
+                                                      bvh_builder))
+
+            stats = {
+                "elements":       len(elements),
+                "meshes":         builder.mesh_count,
+                "instancedNodes": builder.instanced_nodes,
+                "triangles":      builder.triangles,
+                "liteTriangles":  lite_builder.triangles,
+                "spillBytes":     spill.nbytes,
+            }
+            if meshopt is not None:
+                stats["meshopt"] = meshopt.stats()
+            with profile.phase("glbBuild"):
+                glb_size      = builder.build_to(glb_path)
+                glb_lite_size = lite_builder.build_to(glb_lite_path)
+                lod_sizes     = [b.build_to(path) for b, path in zip(lod_builders, lod_paths)]
+            lod_triangles = [b.triangles for b in lod_builders]
+            if bvh_builder is not None:
+                with profile.phase("bvh"):
+                    bvh_bytes = bvh_builder.build().to_bytes()
+                with open(bvh_path, "wb") as f:
+                    f.write(bvh_bytes)
+                stats["bvhBytes"] = len(bvh_bytes)
+                del bvh_bytes
+    finally:
+        spill.close()
+    stats["profile"] = profile.to_dict()
+    retain_meshes(project_id, mesh_keys)
+
+    logger.info("[IFC Stream] 부재 %d개 변환 완료 (GLB %.1fMB, lite %.1fMB)",
+                len(elements), glb_size / 1e6, glb_lite_size / 1e6)
+    _log_profile(stats["profile"])
+    result = {
+        "glb_size":      glb_size,
+        "glb_lite_size": glb_lite_size,
+        "elements":      elements,
+        "storeys":       storeys,
+        "geo_origin":    {
+            **geo_info,
+            "ifcOffsetX": cx,
+            "ifcOffsetY": cy,
+            "ifcOffsetZ": z_origin,
+            "scale":      scale,
+            "ifcSchema":  ifc_schema,
+        },
+        "stats":         stats,
+    }
+    if bvh_path is not None:
+        result["bvh_size"] = stats["bvhBytes"]
+    if lod_paths:
+        from ifc_lod import lod_manifest
+        result["lod_sizes"]  = lod_sizes
+        result["lod_levels"] = lod_manifest(lod_triangles)
+    return result
+
+
+def _scene_origin(all_min: np.ndarray, all_max: np.ndarray, storeys: list) -> tuple[float, float, float]:
+    """전체 bbox + 층 정보 → 렌더 원점 (cx, cy, z_origin)."""
     # ── 중앙 정렬 계산 (Z-up: XY 평면 중앙, Z IFC 원점 그대로) ──────────
-    all_pts = np.vstack(all_positions)
-    cx     = float((all_pts[:, 0].min() + all_pts[:, 0].max()) / 2.0)
-    cy     = float((all_pts[:, 1].min() + all_pts[:, 1].max()) / 2.0)
+    cx = float((all_min[0] + all_max[0]) / 2.0)
+    cy = float((all_min[1] + all_max[1]) / 2.0)
 
     # IFC Z 좌표를 그대로 사용: XY만 중앙 정렬, Z는 이동하지 않음
     # → IFC에서 지상=0, 지하=음수면 렌더에서도 지하가 Z<0으로 내려감
@@ -903,6 +1673,156 @@ def convert_ifc_to_glb(ifc_bytes: bytes, user_scale: float = 1.0, project_id: st
     else:
         z_origin = 0.0
         logger.info("[IFC Convert] 층 이름 미매칭 → IFC Z 원점 그대로 사용 (z_origin=0)")
+    return cx, cy, z_origin
+
+
+_STEEL_TYPES = {"IfcMember", "IfcRailing"}
+
+
+def _assemble_element(g: dict, origin: tuple[float, float, float], project_id: str,
+                      builder: GlbBuilder, lite_builder: GlbBuilder,
+                      lod_builders: Optional[list] = None, profile=None, bvh_builder=None) -> dict:
+    """부재 1건: 원점 이동 → full / lite (/ LOD1~3) GLB (/ BVH) 에 추가 → BimElementDTO 반환."""
+    profile = profile if profile is not None else NULL_PROFILE
+    cx, cy, z_origin = origin
+    express_id = g["express_id"]
+    element_id = f"IFC-{express_id}-{project_id}" if project_id else f"IFC-{express_id}"
+
+    pos = g["pos"].copy()
+    pos[:, 0] -= cx
+    pos[:, 1] -= cy
+    pos[:, 2] -= z_origin  # 지상 1층 바닥을 Z=0으로
+
+    color = ELEMENT_COLORS.get(g["our_type"], [0.7, 0.7, 0.7, 1.0])
+    center = g["center"].copy()
+    center[0] -= cx
+    center[1] -= cy
+    center[2] -= z_origin
+
+    extras = {
+        "elementType": g["our_type"],
+        "storey":      g["spatial"].get("storey"),
+        "building":    g["spatial"].get("building"),
+        "globalId":    g["global_id"],
+        "ifcName":     g["ifc_name"],
+        "color":       color,
+    }
+
+    builder.add_element(
+        element_id=element_id,
+        positions=pos,
+        normals=g["nrm"],
+        indices=g["idx"],
+        color=color,
+        element_type=g["our_type"],
+        extras=extras,
+        rotation_matrix=g["rot_matrix"],
+    )
+    if bvh_builder is not None:
+        bvh_builder.add(element_id, pos, g["idx"])
+
+    with profile.phase("hull"):
+        lite_pos, lite_idx = _simplify_to_convex_hull(pos)
+        lite_nrm = _compute_normals(lite_pos, lite_idx)
+    lite_builder.add_element(
+        element_id=element_id,
+        positions=lite_pos,
+        normals=lite_nrm,
+        indices=lite_idx,
+        color=color,
+        element_type=g["our_type"],
+        extras=extras,
+        rotation_matrix=g["rot_matrix"],
+    )
+
+    if lod_builders:
+        from ifc_lod import lod_chain
+        with profile.phase("lod"):
+            chain = lod_chain(pos, g["nrm"], g["idx"])
+        for lod_builder, (lod_pos, lod_nrm, lod_idx) in zip(lod_builders, chain):
+            lod_builder.add_element(
+                element_id=element_id,
+                positions=lod_pos,
+                normals=lod_nrm,
+                indices=lod_idx,
+                color=color,
+                element_type=g["our_type"],
+                extras=extras,
+                rotation_matrix=g["rot_matrix"],
+            )
+
+    size = g["size"]
+    rx, ry, rz = g["rotation"]
+    mat_name = g["material"] or (
+        "Steel S355" if g["our_type"] in _STEEL_TYPES else "Concrete C30"
+    )
+    return {
+        "elementId":     element_id,
+        "elementType":   g["our_type"],
+        "positionX":     round(float(center[0]), 4),
+        "positionY":     round(float(center[1]), 4),
+        "positionZ":     round(float(center[2]), 4),
+        "sizeX":         round(float(size[0]), 4),
+        "sizeY":         round(float(size[1]), 4),
+        "sizeZ":         round(float(size[2]), 4),
+        "rotationX":     rx,
+        "rotationY":     ry,
+        "rotationZ":     rz,
+        "material":      mat_name,
+        "globalId":      g["global_id"],
+        "ifcName":       g["ifc_name"],
+        "storey":        g["spatial"].get("storey") or "미분류",
+        "building":      g["spatial"].get("building") or "미분류",
+        "ifcQuantities": g["quantities"],
+        "ifcProperties": g["properties"],
+    }
+
+
+def assemble_glb(tess: dict, project_id: str = "", instancing: bool = False,
+                 output_mode: str = "nodes", progress=None, quantize: bool = False,
+                 lods: bool = False, origin: Optional[tuple[float, float, float]] = None,
+                 profile: Optional[ConversionProfile] = None, bvh: bool = False) -> dict:
+    """
+    삼각분할 결과(tessellate_ifc) → 중앙 정렬 + GLB(full / lite) + BimElementDTO 목록.
+    elementId 에 project_id 가 붙는 단계이므로 캐시 히트 시에도 매번 수행된다.
+    lods=True 면 lod_glbs(LOD1~3 GLB 목록) + lod_levels(화면 점유율 힌트) 추가.
+    bvh=True 면 bvh_bytes(ifc_bvh 부재 삼각형 BVH, GLB 와 같은 좌표계) 추가.
+    origin 을 주면 모델 자체 중앙 대신 그 (cx, cy, z_origin) 으로 이동 (다중 모델 정렬용).
+    profile 을 주면 삼각분할 단계 계측에 이어서 기록 (없으면 조립 단계만) → stats.profile.
+    """
+    profile = profile if profile is not None else ConversionProfile()
+    raw_geoms  = tess["geoms"]
+    storeys    = tess["storeys"]
+    geo_info   = tess["geo_info"]
+    ifc_schema = tess["ifc_schema"]
+    scale      = tess["scale"]
+
+    merged       = output_mode == "merged"
+    builder      = GlbBuilder(instancing=instancing, merged=merged, quantize=quantize)
+    lite_builder = GlbBuilder(instancing=instancing, merged=merged, quantize=quantize)
+    lod_builders = _lod_builders(lods, instancing=instancing, merged=merged, quantize=quantize)
+    bvh_builder  = _bvh_builder(bvh)
+    elements: list[dict] = []
+
+    if not raw_geoms:
+        logger.warning("[IFC Convert] 변환 가능한 부재가 없습니다.")
+        return {
+            "glb_bytes":      builder.build(),
+            "glb_lite_bytes": lite_builder.build(),
+            "elements":       [],
+            "storeys":        storeys,
+            "geo_origin":     {**geo_info, "ifcOffsetX": 0, "ifcOffsetY": 0, "ifcOffsetZ": 0, "scale": scale, "ifcSchema": ifc_schema},
+            "stats":          {"elements": 0, "meshes": 0, "instancedNodes": 0, "triangles": 0,
+                               "profile": profile.to_dict()},
+        }
+
+    if origin is not None:
+        cx, cy, z_origin = origin
+    else:
+        # 부재별 bbox 의 최소·최대만으로 전체 범위 계산 (전체 정점 vstack 불필요)
+        all_min = np.min([g["bbox_min"] for g in raw_geoms], axis=0)
+        all_max = np.max([g["bbox_max"] for g in raw_geoms], axis=0)
+        cx, cy, z_origin = _scene_origin(all_min, all_max, storeys)
 
     geo_origin = {
         **geo_info,
@@ -913,90 +1833,161 @@ def convert_ifc_to_glb(ifc_bytes: bytes, user_scale: float = 1.0, project_id: st
         "ifcSchema":  ifc_schema,
     }
 
-    for g in raw_geoms:
-        pos = g["pos"].copy()
-        pos[:, 0] -= cx
-        pos[:, 1] -= cy
-        pos[:, 2] -= z_origin  # 지상 1층 바닥을 Z=0으로
-
-        color = ELEMENT_COLORS.get(g["our_type"], [0.7, 0.7, 0.7, 1.0])
-        center = g["center"].copy()
-        center[0] -= cx
-        center[1] -= cy
-        center[2] -= z_origin
-
-        extras = {
-            "elementType": g["our_type"],
-            "storey":      g["spatial"].get("storey"),
-            "building":    g["spatial"].get("building"),
-            "globalId":    g["global_id"],
-            "ifcName":     g["ifc_name"],
-            "color":       color,
+    with profile.phase("assemble"):
+        for i, g in enumerate(raw_geoms, 1):
+            if progress is not None:
+                progress("assemble", i, len(raw_geoms))
+            elements.append(_assemble_element(g, (cx, cy, z_origin), project_id, builder, lite_builder,
+                                              lod_builders, profile, bvh_builder))
+
+    stats = {
+        "elements":       len(elements),
+        "meshes":         builder.mesh_count,
+        "instancedNodes": builder.instanced_nodes,
+        "triangles":      builder.triangles,
+        "liteTriangles":  lite_builder.triangles,
+    }
+    if tess.get("meshopt"):
+        stats["meshopt"] = tess["meshopt"]
+    logger.info("[IFC Convert] 부재 %d개, 층 %d개 변환 완료 (mesh %d개, 인스턴스 재사용 %d개)",
+                len(elements), len(storeys), stats["meshes"], stats["instancedNodes"])
+    with profile.phase("glbBuild"):
+        result = {
+            "glb_bytes":      builder.build(),
+            "glb_lite_bytes": lite_builder.build(),
+            "elements":       elements,
+            "storeys":        storeys,
+            "geo_origin":     geo_origin,
+            "stats":          stats,
         }
+        if lod_builders:
+            from ifc_lod import lod_manifest
+            result["lod_glbs"]   = [b.build() for b in lod_builders]
+            result["lod_levels"] = lod_manifest([b.triangles for b in lod_builders])
+    if bvh_builder is not None:
+        with profile.phase("bvh"):
+            result["bvh_bytes"] = bvh_builder.build().to_bytes()
+        stats["bvhBytes"] = len(result["bvh_bytes"])
+    stats["profile"] = profile.to_dict()
+    _log_profile(stats["profile"])
+    return result
+
+
+def _log_profile(profile: dict) -> None:
+    """단계별 시간 상위 항목 + 최대 RSS 를 한 줄로."""
+    phases = sorted(profile["phases"].items(), key=lambda kv: -kv[1])
+    logger.info("[IFC Profile] %.2fs (%s), peak RSS %sMB", profile["wallSec"],
+                ", ".join(f"{k} {v:.2f}s" for k, v in phases[:6]), profile["peakRssMb"])
+    if profile["slowestProducts"]:
+        p = profile["slowestProducts"][0]
+        logger.info("[IFC Profile] 가장 느린 부재: #%s %s %s (%.3fs, 삼각형 %d)", p["expressId"],
+                    p["ifcType"], p["globalId"], p["sec"], p["triangles"])
+
+
+def _bvh_builder(bvh: bool):
+    """bvh=True 면 ifc_bvh.BvhBuilder (아니면 None)."""
+    if not bvh:
+        return None
+    from ifc_bvh import BvhBuilder
+    return BvhBuilder()
 
-        builder.add_element(
-            element_id=g["element_id"],
-            positions=pos,
-            normals=g["nrm"],
-            indices=g["idx"],
-            color=color,
-            element_type=g["our_type"],
-            extras=extras,
-        )
 
-        lite_pos, lite_idx = _simplify_to_convex_hull(pos)
-        lite_nrm = _compute_normals(lite_pos, lite_idx)
-        lite_builder.add_element(
-            element_id=g["element_id"],
-            positions=lite_pos,
-            normals=lite_nrm,
-            indices=lite_idx,
-            color=color,
-            element_type=g["our_type"],
-            extras=extras,
-        )
+def _lod_builders(lods: bool, **kwargs) -> list:
+    """LOD_LEVELS 수만큼 GlbBuilder (lods=False 면 빈 목록)."""
+    if not lods:
+        return []
+    from ifc_lod import LOD_LEVELS
+    return [GlbBuilder(**kwargs) for _ in LOD_LEVELS]
 
-        size = g["size"]
-        rx, ry, rz = g["rotation"]
-        _steel_types = {"IfcMember", "IfcRailing"}
-        mat_name = g["material"] or (
-            "Steel S355" if g["our_type"] in _steel_types else "Concrete C30"
-        )
-        elements.append({
-            "elementId":     g["element_id"],
-            "elementType":   g["our_type"],
-            "positionX":     round(float(center[0]), 4),
-            "positionY":     round(float(center[1]), 4),
-            "positionZ":     round(float(center[2]), 4),
-            "sizeX":         round(float(size[0]), 4),
-            "sizeY":         round(float(size[1]), 4),
-            "sizeZ":         round(float(size[2]), 4),
-            "rotationX":     rx,
-            "rotationY":     ry,
-            "rotationZ":     rz,
-            "material":      mat_name,
-            "globalId":      g["global_id"],
-            "ifcName":       g["ifc_name"],
-            "storey":        g["spatial"].get("storey") or "미분류",
-            "building":      g["spatial"].get("building") or "미분류",
-            "ifcQuantities": g["quantities"],
-            "ifcProperties": g["properties"],
-        })
 
-    logger.info("[IFC Convert] 부재 %d개, 층 %d개 변환 완료", len(elements), len(storeys))
+def assemble_tiles(tess: dict, tile_sink, project_id: str = "", instancing: bool = False,
+                   progress=None, quantize: bool = False, max_tile_elements: int = 0,
+                   profile: Optional[ConversionProfile] = None) -> dict:
+    """
+    삼각분할 결과 → 층별 + 옥트리 타일 GLB (ifc_tiles).
+
+    tile_sink(tile_id, glb_bytes) -> str  타일 GLB 를 저장하고 ID 반환 (예: ArtifactStore.put).
+    타일 GLB 는 만들자마자 sink 로 넘기므로 메모리에는 타일 하나 분량만 남는다.
+    전체 개요용 lite GLB(convex hull) 는 단일 파일로 함께 생성.
+
+    반환 dict: convert_ifc_file 과 같되 glb_bytes 대신 manifest (ifc_tiles.tile_manifest),
+    elements 는 타일 순서로 정렬.
+    """
+    from ifc_tiles import MAX_TILE_ELEMENTS, plan_tiles, tile_manifest
+
+    profile = profile if profile is not None else ConversionProfile()
+    raw_geoms  = tess["geoms"]
+    storeys    = tess["storeys"]
+    lite_builder = GlbBuilder(instancing=instancing, quantize=quantize)
+    elements: list[dict] = []
+
+    if raw_geoms:
+        all_min = np.min([g["bbox_min"] for g in raw_geoms], axis=0)
+        all_max = np.max([g["bbox_max"] for g in raw_geoms], axis=0)
+        cx, cy, z_origin = _scene_origin(all_min, all_max, storeys)
+    else:
+        logger.warning("[IFC Tiles] 변환 가능한 부재가 없습니다.")
+        cx = cy = z_origin = 0.0
+    geo_origin = {
+        **tess["geo_info"],
+        "ifcOffsetX": cx,
+        "ifcOffsetY": cy,
+        "ifcOffsetZ": z_origin,
+        "scale":      tess["scale"],
+        "ifcSchema":  tess["ifc_schema"],
+    }
+
+    tiles = plan_tiles(raw_geoms, storeys, (cx, cy, z_origin),
+                       max_tile_elements or MAX_TILE_ELEMENTS)
+    meshes = instanced = triangles = 0
+    for t_i, tile in enumerate(tiles, 1):
+        if progress is not None:
+            progress("assemble", t_i, len(tiles))
+        builder = GlbBuilder(instancing=instancing, quantize=quantize)
+        tile["elementStart"] = len(elements)
+        with profile.phase("assemble"):
+            for gi in tile.pop("members"):
+                elements.append(_assemble_element(raw_geoms[gi], (cx, cy, z_origin), project_id,
+                                                  builder, lite_builder, profile=profile))
+        tile["elementCount"] = len(elements) - tile["elementStart"]
+        tile["triangles"]    = builder.triangles
+        with profile.phase("glbBuild"):
+            glb = builder.build()
+        tile["glbId"]        = tile_sink(tile["tileId"], glb)
+        meshes    += builder.mesh_count
+        instanced += builder.instanced_nodes
+        triangles += builder.triangles
+
+    stats = {
+        "elements":       len(elements),
+        "meshes":         meshes,
+        "instancedNodes": instanced,
+        "triangles":      triangles,
+        "liteTriangles":  lite_builder.triangles,
+        "tiles":          len(tiles),
+    }
+    if tess.get("meshopt"):
+        stats["meshopt"] = tess["meshopt"]
+    logger.info("[IFC Tiles] 부재 %d개 → 타일 %d개", len(elements), len(tiles))
+    with profile.phase("glbBuild"):
+        glb_lite = lite_builder.build()
+    stats["profile"] = profile.to_dict()
+    _log_profile(stats["profile"])
     return {
-        "glb_bytes":      builder.build(),
-        "glb_lite_bytes": lite_builder.build(),
+        "glb_lite_bytes": glb_lite,
+        "manifest":       tile_manifest(tiles, geo_origin),
         "elements":       elements,
         "storeys":        storeys,
         "geo_origin":     geo_origin,
+        "stats":          stats,
     }
 
 
 def _compute_normals(positions: np.ndarray, indices: np.ndarray) -> np.ndarray:
-    """face normal → vertex normal (평균)."""
-    normals = np.zeros_like(positions)
-    tris = indices.reshape(-1, 3)
+    """face normal → vertex normal (평균).
+    정점별 누적은 np.bincount 가중합(scatter-add)으로 한 번에 처리."""
+    n_verts = len(positions)
+    tris = indices.reshape(-1, 3).astype(np.intp)
     v0 = positions[tris[:, 0]]
     v1 = positions[tris[:, 1]]
     v2 = positions[tris[:, 2]]
@@ -1004,10 +1995,14 @@ def _compute_normals(positions: np.ndarray, indices: np.ndarray) -> np.ndarray:
     norms = np.linalg.norm(face_normals, axis=1, keepdims=True)
     norms[norms == 0] = 1
     face_normals /= norms
-    for i, tri in enumerate(tris):
-        normals[tri[0]] += face_normals[i]
-        normals[tri[1]] += face_normals[i]
-        normals[tri[2]] += face_normals[i]
+
+    # 삼각형 3개 꼭짓점 모두에 face normal 을 더함: (T*3,) 인덱스 ↔ (T*3, 3) 가중치
+    flat_idx = tris.ravel()
+    weights  = np.repeat(face_normals, 3, axis=0)
+    normals = np.column_stack([
+        np.bincount(flat_idx, weights=weights[:, k], minlength=n_verts)
+        for k in range(3)
+    ])
     norms2 = np.linalg.norm(normals, axis=1, keepdims=True)
     norms2[norms2 == 0] = 1
     return (normals / norms2).astype(np.float32)
@@ -1054,18 +2049,19 @@ def _simplify_to_convex_hull(positions: np.ndarray) -> tuple[np.ndarray, np.ndar
         hull = ConvexHull(positions)
         # hull.vertices: 실제 사용된 정점 인덱스, hull.simplices: 삼각형 면
         used_idx = hull.vertices
-        remap = {old: new for new, old in enumerate(used_idx)}
+        remap = np.empty(len(positions), dtype=np.intp)
+        remap[used_idx] = np.arange(len(used_idx))
         verts = positions[used_idx].astype(np.float32)
-        faces = []
-        for simplex in hull.simplices:
-            a, b, c = [remap[i] for i in simplex]
-            # 법선이 밖을 향하도록 방향 보정
-            n = np.cross(verts[b] - verts[a], verts[c] - verts[a])
-            centroid = verts.mean(axis=0)
-            if np.dot(n, verts[a] - centroid) < 0:
-                a, b = b, a
-            faces.extend([a, b, c])
-        idx = np.array(faces, dtype=np.uint32)
+        faces = remap[hull.simplices]
+
+        # 법선이 밖을 향하도록 방향 보정 — 모든 면을 한 번에 판정 후 a, b 교환
+        centroid = verts.mean(axis=0)
+        a, b, c = verts[faces[:, 0]], verts[faces[:, 1]], verts[faces[:, 2]]
+        n = np.cross(b - a, c - a)
+        inward = np.einsum("ij,ij->i", n, a - centroid) < 0
+        faces[inward] = faces[inward][:, [1, 0, 2]]
+
+        idx = faces.astype(np.uint32).ravel()
         return verts, idx
     except Exception:
         return _make_aabb_mesh(positions)
@@ -0,0 +1,211 @@
+"""
+다중 IFC 연합(federation) 변환 — 공통 원점 정렬
+
+건축·구조·MEP 모델을 따로 변환하면 각자 자기 bbox 중앙과 지상층 기준으로 이동되어
+뷰어에서 서로 어긋난다. 연합 변환은:
+
+  1. 모델별 삼각분할을 작업 프로세스에서 동시에 수행 (변환 캐시 히트는 건너뜀)
+     — 프로세스마다 RLIMIT_AS 상한, ifcopenshell 스레드는 CPU 를 프로세스 수로 나눠 배정
+  2. 전체 모델 bbox 합 + 층 목록 합으로 공통 원점 (cx, cy, 지상층 z) 한 번 계산
+  3. 같은 원점으로 모델별 GLB 조립 → 그대로 겹쳐 로드하면 정렬됨
+  4. 모델별 산출물 ID·bbox 를 담은 통합 매니페스트
+
+elementId 는 모델 간 expressId 충돌을 피하도록 "{project_id}-{모델 이름}" 을 project_id 로 사용.
+변환 작업 API(ifc_jobs, params["federate"])에서는 작업 자식 프로세스 안에서 순차 삼각분할(processes=0)하고
+store_federation 으로 산출물을 저장해 ID 만 부모로 돌려준다.
+"""
+from __future__ import annotations
+
+import logging
+import json
+import multiprocessing as mp
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_NAME_RE = re.compile(r"[^0-9A-Za-z가-힣_.-]+")
+
+
+def _tessellate_worker(ifc_path: str, user_scale: float, num_workers: int, optimize: bool) -> dict:
+    """작업 프로세스 진입점 (spawn 이므로 모듈 최상위 함수)."""
+    from ifc_converter import tessellate_ifc
+    return tessellate_ifc(ifc_path, user_scale=user_scale, num_workers=num_workers, optimize=optimize)
+
+
+def _pool_init(memory_mb: int) -> None:
+    """작업 프로세스 초기화 — 변환 작업 API 와 같은 주소공간 상한."""
+    from ifc_jobs import _limit_memory
+    _limit_memory(memory_mb)
+
+
+def model_name(name: str, index: int) -> str:
+    """elementId·매니페스트용 모델 이름 (비어 있거나 특수문자면 정리)."""
+    cleaned = _NAME_RE.sub("_", (name or "").strip()).strip("_")
+    return cleaned or f"model{index + 1}"
+
+
+def federate_ifc_files(models: list[tuple[str, str]], user_scale: float = 1.0, project_id: str = "",
+                       processes: int = 2, num_workers: int = 1, instancing: bool = False,
+                       cache=None, progress=None, quantize: bool = False,
+                       optimize: bool = False, bvh: bool = False, memory_mb: int = 0) -> dict:
+    """
+    models: [(모델 이름, IFC 경로)] — 순서가 곧 매니페스트 순서 (지상층 탐색도 앞 모델 우선).
+    processes: 동시 삼각분할 프로세스 수 (0 이면 현재 프로세스에서 순차 — 작업 자식 프로세스용,
+               daemon 프로세스는 자식을 만들 수 없음).
+    num_workers: 프로세스당 ifcopenshell 스레드 수 (0 이하면 CPU 수 / 프로세스 수).
+    memory_mb: 작업 프로세스당 주소공간 상한 (0: 무제한).
+    bvh: True면 모델별 bvh_bytes (ifc_bvh, 공통 원점 좌표계).
+
+    반환 dict:
+      models     : [{name, projectId, glb_bytes, glb_lite_bytes, elements, storeys, stats, bboxMin, bboxMax, ifcSchema}]
+      geo_origin : 공통 원점 (모든 모델 동일)
+      bboxMin / bboxMax : 공통 원점 기준 전체 범위
+    """
+    from ifc_converter import _scene_origin, assemble_glb
+    from ifc_meshstore import geometry_keys, retain_meshes
+
+    names = [model_name(n, i) for i, (n, _) in enumerate(models)]
+    if len(set(names)) != len(names):
+        names = [f"{n}_{i + 1}" for i, n in enumerate(names)]
+
+    # ── 1. 삼각분할 (캐시 → 미스만 프로세스 풀) ──────────────────────
+    tess: list[Optional[dict]] = [None] * len(models)
+    keys: list[Optional[str]] = [None] * len(models)
+    if cache is not None:
+        from ifc_cache import file_sha256
+        for i, (_, path) in enumerate(models):
+            keys[i] = cache.key(file_sha256(path), user_scale, optimize)
+            tess[i] = cache.get(keys[i])
+    pending = [i for i, t in enumerate(tess) if t is None]
+    if progress is not None:
+        progress("tessellate", len(models) - len(pending), len(models))
+    if pending and processes <= 0:
+        threads = num_workers if num_workers > 0 else (os.cpu_count() or 1)
+        for done, i in enumerate(pending, 1):
+            tess[i] = _tessellate_worker(models[i][1], user_scale, threads, optimize)
+            if cache is not None:
+                cache.put(keys[i], tess[i])
+            if progress is not None:
+                progress("tessellate", len(models) - len(pending) + done, len(models))
+    elif pending:
+        workers = max(1, min(processes, len(pending)))
+        # 프로세스마다 전체 CPU 스레드를 쓰면 workers 배로 과다 구독 → CPU 를 나눠 배정
+        threads = num_workers if num_workers > 0 else max(1, (os.cpu_count() or 1) // workers)
+        logger.info("[IFC Federation] 삼각분할 프로세스 %d개 × 스레드 %d, 메모리 상한 %dMB",
+                    workers, threads, memory_mb)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn"),
+                                 initializer=_pool_init, initargs=(memory_mb,)) as pool:
+            futures = {i: pool.submit(_tessellate_worker, models[i][1], user_scale, threads, optimize)
+                       for i in pending}
+            for done, (i, fut) in enumerate(futures.items(), 1):
+                tess[i] = fut.result()
+                if cache is not None:
+                    cache.put(keys[i], tess[i])
+                if progress is not None:
+                    progress("tessellate", len(models) - len(pending) + done, len(models))
+
+    # ── 2. 공통 원점 ─────────────────────────────────────────────────
+    mins = [g["bbox_min"] for t in tess for g in t["geoms"]]
+    maxs = [g["bbox_max"] for t in tess for g in t["geoms"]]
+    all_storeys = [s for t in tess for s in t["storeys"]]
+    if mins:
+        origin = _scene_origin(np.min(mins, axis=0), np.max(maxs, axis=0), all_storeys)
+    else:
+        origin = (0.0, 0.0, 0.0)
+    logger.info("[IFC Federation] 모델 %d개 공통 원점 (%.3f, %.3f, %.3f)", len(models), *origin)
+
+    # ── 3. 모델별 조립 ───────────────────────────────────────────────
+    out = []
+    shift = np.asarray(origin)
+    for i, (name, t) in enumerate(zip(names, tess)):
+        if progress is not None:
+            progress("assemble", i + 1, len(models))
+        model_project = f"{project_id}-{name}" if project_id else name
+        result = assemble_glb(t, project_id=model_project, instancing=instancing,
+                              quantize=quantize, origin=origin, bvh=bvh)
+        retain_meshes(model_project, geometry_keys(t["geoms"]))
+        if t["geoms"]:
+            lo = np.min([g["bbox_min"] for g in t["geoms"]], axis=0) - shift
+            hi = np.max([g["bbox_max"] for g in t["geoms"]], axis=0) - shift
+        else:
+            lo = hi = np.zeros(3)
+        out.append({
+            "name":           name,
+            "projectId":      model_project,
+            "glb_bytes":      result["glb_bytes"],
+            "glb_lite_bytes": result["glb_lite_bytes"],
+            "elements":       result["elements"],
+            "storeys":        result["storeys"],
+            "stats":          result["stats"],
+            **({"bvh_bytes": result["bvh_bytes"]} if "bvh_bytes" in result else {}),
+            "ifcSchema":      t["ifc_schema"],
+            "bboxMin":        [round(float(v), 4) for v in lo],
+            "bboxMax":        [round(float(v), 4) for v in hi],
+        })
+
+    # 좌표계 정보(geo_info)는 앞 모델 중 값이 있는 것 우선
+    geo_info = next((t["geo_info"] for t in tess if t["geo_info"]), tess[0]["geo_info"] if tess else {})
+    geo_origin = {
+        **geo_info,
+        "ifcOffsetX": origin[0],
+        "ifcOffsetY": origin[1],
+        "ifcOffsetZ": origin[2],
+        "scale":      tess[0]["scale"] if tess else user_scale,
+    }
+    boxes = [m for m in out if m["elements"]]
+    return {
+        "models":     out,
+        "geo_origin": geo_origin,
+        "bboxMin":    np.min([m["bboxMin"] for m in boxes], axis=0).tolist() if boxes else [0, 0, 0],
+        "bboxMax":    np.max([m["bboxMax"] for m in boxes], axis=0).tolist() if boxes else [0, 0, 0],
+    }
+
+
+def store_federation(result: dict, store, file_names: list[str], ifc_paths: list[str],
+                     user_scale: float = 1.0) -> dict:
+    """
+    federate_ifc_files 결과 → 모델별 산출물(GLB / 경량 GLB / 메타데이터 / 사이드카)을 store 에 기록하고
+    IFC 를 상주 모델 저장소에 보관. 반환: 매니페스트 {manifestId, geoOrigin, bboxMin, bboxMax, models}.
+    """
+    from ifc_bvh import store_bvh_sidecar
+    from ifc_columnar import store_elements_sidecar
+    from ifc_models import retain_model
+
+    manifest_models = []
+    for file_name, path, m in zip(file_names, ifc_paths, result["models"]):
+        retain_model(m["projectId"], path, m["elements"], user_scale)
+        arrow_id = store_elements_sidecar(store, m["elements"])
+        bvh_id = store_bvh_sidecar(store, m)
+        metadata = json.dumps({
+            "elements":  m["elements"],
+            "storeys":   m["storeys"],
+            "geoOrigin": result["geo_origin"],
+        }, ensure_ascii=False, default=str).encode("utf-8")
+        manifest_models.append({
+            "name":         m["name"],
+            "projectId":    m["projectId"],
+            "fileName":     file_name,
+            "glbId":        store.put(m["glb_bytes"]),
+            "glbLiteId":    store.put(m["glb_lite_bytes"]),
+            "metadataId":   store.put(metadata),
+            "elementCount": len(m["elements"]),
+            "bboxMin":      m["bboxMin"],
+            "bboxMax":      m["bboxMax"],
+            "ifcSchema":    m["ifcSchema"],
+            "stats":        m["stats"],
+            **({"elementsArrowId": arrow_id} if arrow_id is not None else {}),
+            **({"bvhId": bvh_id} if bvh_id is not None else {}),
+        })
+    manifest = {
+        "geoOrigin": result["geo_origin"],
+        "bboxMin":   result["bboxMin"],
+        "bboxMax":   result["bboxMax"],
+        "models":    manifest_models,
+    }
+    manifest_id = store.put(json.dumps(manifest, ensure_ascii=False, default=str).encode("utf-8"))
+    return {"manifestId": manifest_id, **manifest}
@@ -0,0 +1,346 @@
+"""
+IFC 증분 재변환 (GlobalId 기준 diff)
+
+설계 변경으로 벽 몇 개만 바뀐 IFC 를 다시 올려도 전체를 재삼각분할하지 않도록,
+프로젝트별 직전 변환 결과(revision)를 보관하고 GlobalId 단위로 비교한다.
+
+  geometry hash  — 부재 Representation + ObjectPlacement(+ 개구부) 하위 엔티티의 STEP 텍스트.
+                   재내보내기마다 바뀌는 #id 는 순회 순번으로 치환해 파일 간 비교 가능.
+  attribute hash — 이름·타입·층·재질·속성·물량·회전 (삼각분할 없이 추출 가능한 값)
+
+  형상 hash 같음 → 직전 pos/nrm/idx 재사용 (속성만 새로 추출)
+  형상 hash 다름 / 신규 → 해당 부재만 삼각분할
+  직전에만 있음 → removed
+
+결과는 전체 GLB 를 다시 조립(patched GLB)하고 delta(added / changed / removed)를 함께 반환한다.
+조립은 삼각분할 대비 비용이 작아 재변환 시간은 변경 부재 수에 비례한다.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from typing import Optional
+
+from ifc_converter import (
+    _element_attributes, _element_geometry, _iter_shapes, _prepare_tessellation, assemble_glb,
+)
+from ifc_meshstore import geometry_keys, retain_meshes
+from ifc_profile import ConversionProfile
+
+logger = logging.getLogger(__name__)
+
+_REF_RE = re.compile(r"#(\d+)")
+_REVISION_FORMAT = 1
+
+
+# ── fingerprint ──────────────────────────────────────────────────────
+
+def _subtree_digest(ifc, roots: list, h) -> None:
+    """roots 하위 엔티티를 #id 무관한 형태로 h 에 누적."""
+    for root in roots:
+        if root is None:
+            continue
+        entities = ifc.traverse(root)
+        order = {e.id(): i for i, e in enumerate(entities)}
+        for e in entities:
+            body = str(e).split("=", 1)[-1]
+            h.update(_REF_RE.sub(lambda m: f"#{order.get(int(m.group(1)), '?')}", body).encode())
+            h.update(b"\n")
+
+
+def geometry_hash(ifc, product) -> str:
+    """삼각분할 결과를 결정하는 엔티티(형상 표현·배치·개구부)의 hash."""
+    h = hashlib.sha1()
+    _subtree_digest(ifc, [product.Representation, product.ObjectPlacement], h)
+    for rel in getattr(product, "HasOpenings", None) or ():
+        opening = rel.RelatedOpeningElement
+        _subtree_digest(ifc, [opening.Representation, opening.ObjectPlacement], h)
+    return h.hexdigest()
+
+
+def attribute_hash(attrs: dict) -> str:
+    """_element_attributes 결과 중 #id·행렬을 뺀 값의 hash."""
+    payload = {k: v for k, v in attrs.items() if k not in ("express_id", "rot_matrix")}
+    return hashlib.sha1(
+        json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str).encode()
+    ).hexdigest()
+
+
+# ── 증분 변환 ────────────────────────────────────────────────────────
+
+def tessellate_incremental(ifc_path: str, base: Optional[dict], user_scale: float = 1.0,
+                           num_workers: int = 1, progress=None, optimize: bool = False,
+                           profile=None) -> tuple[dict, dict]:
+    """
+    base(직전 revision 의 tess) 대비 바뀐 부재만 삼각분할.
+
+    반환: (tess, diff)
+      tess — tessellate_ifc 형식 + fingerprints {globalId: [geometry hash, attribute hash]}
+      diff — {added, changed, removed: list[globalId], reused: int, tessellated: int}
+    base 가 None 이거나 scale / optimize 가 다르면 전체 삼각분할 (모두 added).
+    """
+    if num_workers <= 0:
+        num_workers = os.cpu_count() or 1
+    if base is not None and (base.get("user_scale") != float(user_scale)
+                             or bool(base.get("optimize")) != optimize):
+        logger.info("[IFC Incremental] scale/optimize 변경 — 전체 재변환")
+        base = None
+
+    ctx = _prepare_tessellation(ifc_path, user_scale, progress, optimize, profile)
+    profile = ctx["profile"]
+    ifc = ctx["ifc"]
+    prev_prints = base["fingerprints"] if base is not None else {}
+    prev_geoms  = {g["global_id"]: g for g in base["geoms"]} if base is not None else {}
+
+    fingerprints: dict[str, list[str]] = {}
+    attrs: dict[int, dict] = {}
+    dirty: list[tuple] = []
+    no_geometry: set[int] = set()   # 직전에도 형상이 없었고 형상 hash 도 같은 부재 — 재삼각분할 생략
+    added: list[str] = []
+    changed: list[str] = []
+    products = ctx["products"]
+    for i, (product, our_type) in enumerate(products, 1):
+        if progress is not None:
+            progress("diff", i, len(products))
+        gid = getattr(product, "GlobalId", None)
+        with profile.phase("metadata"):
+            a = _element_attributes(ctx, product, our_type)
+        attrs[product.id()] = a
+        with profile.phase("diff"):
+            geom_h, attr_h = geometry_hash(ifc, product), attribute_hash(a)
+        if gid is not None:
+            fingerprints[gid] = [geom_h, attr_h]
+        prev = prev_prints.get(gid)
+        if gid is None:
+            # GlobalId 없는 부재는 비교 불가 → 항상 삼각분할 (delta 에는 미포함)
+            dirty.append((product, our_type))
+        elif prev is None:
+            added.append(gid)
+            dirty.append((product, our_type))
+        elif prev[0] != geom_h:
+            changed.append(gid)
+            dirty.append((product, our_type))
+        elif gid not in prev_geoms:
+            no_geometry.add(product.id())
+        elif prev[1] != attr_h:
+            changed.append(gid)
+
+    ctx["products"] = dirty
+    with profile.phase("tessellate"):
+        shapes = dict(_iter_shapes(ctx, num_workers, progress))
+
+    # 출력 순서는 전체 변환(tessellate_ifc)과 동일하게 ELEMENT_TYPE_MAP 순서
+    dirty_ids = {p.id() for p, _ in dirty}
+    raw_geoms: list[dict] = []
+    for product, our_type in products:
+        express_id = product.id()
+        if express_id in dirty_ids:
+            shape_arrays = shapes.pop(express_id, None)
+            if shape_arrays is not None:
+                raw_geoms.append(_element_geometry(ctx, product, our_type, shape_arrays))
+        elif express_id not in no_geometry:
+            prev = prev_geoms[getattr(product, "GlobalId", None)]
+            g = {
+                **{k: prev[k] for k in ("pos", "nrm", "idx", "bbox_min", "bbox_max", "center", "size")},
+                **attrs[express_id],
+            }
+            if prev.get("mesh_key"):
+                g["mesh_key"] = prev["mesh_key"]
+            raw_geoms.append(g)
+
+    current = {p.GlobalId for p, _ in products if getattr(p, "GlobalId", None) is not None}
+    removed = [gid for gid in prev_geoms if gid not in current]
+    tess = {
+        "geoms":        raw_geoms,
+        "storeys":      ctx["storeys"],
+        "geo_info":     ctx["geo_info"],
+        "ifc_schema":   ctx["ifc_schema"],
+        "scale":        ctx["scale"],
+        "meshopt":      ctx["meshopt"].stats() if ctx["meshopt"] is not None else None,
+        "fingerprints": fingerprints,
+        "user_scale":   float(user_scale),
+        "optimize":     optimize,
+    }
+    diff = {
+        "added":       added,
+        "changed":     changed,
+        "removed":     removed,
+        "reused":      len(products) - len(dirty) - len(no_geometry),
+        "tessellated": len(dirty),
+    }
+    logger.info("[IFC Incremental] 추가 %d / 변경 %d / 삭제 %d (삼각분할 %d, 재사용 %d)",
+                len(added), len(changed), len(removed), diff["tessellated"], diff["reused"])
+    return tess, diff
+
+
+def convert_ifc_incremental(ifc_path: str, revisions: "RevisionStore", user_scale: float = 1.0,
+                            project_id: str = "", num_workers: int = 1, instancing: bool = False,
+                            output_mode: str = "nodes", progress=None, quantize: bool = False,
+                            optimize: bool = False, bvh: bool = False) -> dict:
+    """
+    project_id 의 직전 revision 기준 증분 변환 → patched GLB + delta. 결과를 새 revision 으로 저장.
+
+    반환 dict: convert_ifc_file 과 같고 delta 추가
+      delta: {added, changed, removed: [{globalId, elementId}], reused, tessellated, baseRevision}
+    """
+    profile = ConversionProfile()
+    base = revisions.get(project_id)
+    tess, diff = tessellate_incremental(ifc_path, base, user_scale=user_scale,
+                                        num_workers=num_workers, progress=progress,
+                                        optimize=optimize, profile=profile)
+    result = assemble_glb(tess, project_id=project_id, instancing=instancing,
+                          output_mode=output_mode, progress=progress, quantize=quantize,
+                          profile=profile, bvh=bvh)
+
+    new_ids = {el["globalId"]: el["elementId"] for el in result["elements"]}
+    old_ids = base.get("element_ids", {}) if base is not None else {}
+    # 삼각분할 결과 형상이 없는 부재는 GLB·elements 에 없으므로 delta 에서도 제외
+    # (직전에 있던 부재의 형상이 사라졌으면 removed)
+    removed = diff["removed"] + [g for g in diff["changed"] if g not in new_ids and g in old_ids]
+    result["delta"] = {
+        "added":        [{"globalId": g, "elementId": new_ids[g]} for g in diff["added"] if g in new_ids],
+        "changed":      [{"globalId": g, "elementId": new_ids[g]} for g in diff["changed"] if g in new_ids],
+        "removed":      [{"globalId": g, "elementId": old_ids.get(g)} for g in removed],
+        "reused":       diff["reused"],
+        "tessellated":  diff["tessellated"],
+        "baseRevision": base.get("revision") if base is not None else None,
+    }
+    tess["element_ids"] = new_ids
+    tess["revision"] = (base.get("revision", 0) if base is not None else 0) + 1
+    revisions.put(project_id, tess)
+    result["delta"]["revision"] = tess["revision"]
+    result["stats"]["incremental"] = {k: diff[k] for k in ("reused", "tessellated")}
+    retain_meshes(project_id, geometry_keys(tess["geoms"]))
+    return result
+
+
+# ── revision 저장소 ──────────────────────────────────────────────────
+
+class RevisionStore:
+    """
+    프로젝트별 최신 변환 결과(tess + fingerprints) 1건 — 디스크 npz (ifc_cache 형식, pickle 없음).
+
+    put 때마다 prune — 마지막 사용(저장·조회 시 mtime 갱신) 후 ttl_sec 이 지난 revision 을 지우고,
+    합계가 max_bytes 를 넘으면 오래 쓰이지 않은 순으로 삭제 (0 이면 해당 한도 없음, 방금 저장한 것은 유지).
+    삭제된 프로젝트의 다음 증분 변환은 전체 재변환이 된다.
+    """
+
+    def __init__(self, root: str, max_bytes: int = 0, ttl_sec: int = 0):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.ttl_sec = ttl_sec
+        self._lock = threading.Lock()
+        os.makedirs(root, mode=0o700, exist_ok=True)
+        for name in os.listdir(root):
+            if name.endswith(".pkl"):   # 이전 pickle 형식 — 읽지 않고 제거 (다음 변환은 전체 재변환)
+                try:
+                    os.unlink(os.path.join(root, name))
+                except OSError:
+                    pass
+
+    def _path(self, project_id: str) -> str:
+        name = hashlib.sha256(project_id.encode()).hexdigest()
+        return os.path.join(self.root, f"{name}.npz")
+
+    def get(self, project_id: str) -> Optional[dict]:
+        from ifc_cache import load_npz
+        path = self._path(project_id)
+        with self._lock:
+            if not os.path.exists(path):
+                return None
+            try:
+                value = load_npz(path)
+                os.utime(path)
+            except Exception:
+                logger.warning("[IFC Revision] 읽기 실패 — 전체 재변환: %s", project_id, exc_info=True)
+                return None
+        if value.get("format") != _REVISION_FORMAT:
+            return None
+        return value["tess"]
+
+    def put(self, project_id: str, tess: dict) -> None:
+        from ifc_cache import dump_npz
+        with self._lock:
+            fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    dump_npz(f, {"format": _REVISION_FORMAT, "tess": tess})
+                os.replace(tmp, self._path(project_id))
+            except Exception:
+                try:
+                    os.unlink(tmp)
+                except OSError:
+                    pass
+                logger.warning("[IFC Revision] 저장 실패: %s", project_id, exc_info=True)
+                return
+            self._prune(keep=self._path(project_id))
+
+    def _scan(self) -> list[tuple[float, str, int]]:
+        """(mtime, 경로, 크기) — 오래된 순."""
+        found = []
+        for entry in os.scandir(self.root):
+            if not entry.name.endswith(".npz"):
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            found.append((st.st_mtime, entry.path, st.st_size))
+        return sorted(found)
+
+    def _prune(self, keep: Optional[str] = None) -> None:
+        """보관 기간 경과 + 용량 상한 초과 revision 삭제 (_lock 보유 중 호출)."""
+        if self.max_bytes <= 0 and self.ttl_sec <= 0:
+            return
+        cutoff = time.time() - self.ttl_sec if self.ttl_sec > 0 else None
+        entries = self._scan()
+        total = sum(size for _, _, size in entries)
+        for mtime, path, size in entries:
+            if path == keep:
+                continue
+            expired = cutoff is not None and mtime < cutoff
+            if not expired and (self.max_bytes <= 0 or total <= self.max_bytes):
+                continue
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            logger.info("[IFC Revision] 삭제: %s (%d bytes)", os.path.basename(path), size)
+
+    def stats(self) -> dict:
+        entries = self._scan()
+        return {
+            "entries":  len(entries),
+            "bytes":    sum(size for _, _, size in entries),
+            "maxBytes": self.max_bytes,
+            "ttlSec":   self.ttl_sec,
+        }
+
+    def discard(self, project_id: str) -> None:
+        try:
+            os.unlink(self._path(project_id))
+        except OSError:
+            pass
+
+
+_revisions: Optional[RevisionStore] = None
+_revisions_lock = threading.Lock()
+
+
+def get_revision_store() -> RevisionStore:
+    """설정(IFC_REVISION_DIR) 기반 전역 revision 저장소."""
+    global _revisions
+    with _revisions_lock:
+        if _revisions is None:
+            from config.settings import IFC_REVISION_DIR, IFC_REVISION_MAX_BYTES, IFC_REVISION_TTL_SEC
+            _revisions = RevisionStore(IFC_REVISION_DIR, IFC_REVISION_MAX_BYTES, IFC_REVISION_TTL_SEC)
+            logger.info("[IFC Revision] 저장소: %s (상한 %d bytes, 보관 %ds)",
+                        IFC_REVISION_DIR, IFC_REVISION_MAX_BYTES, IFC_REVISION_TTL_SEC)
+        return _revisions
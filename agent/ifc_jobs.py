@@ -0,0 +1,428 @@
+"""
+IFC 변환 작업(Job) 관리자
+
+대용량 IFC 변환은 CPU·메모리를 오래 점유하므로 이벤트 루프나 API 워커 스레드에서
+직접 돌리지 않고, 작업 큐에 넣은 뒤 작업마다 별도 프로세스(spawn)에서 실행한다.
+
+- 제출:   submit() → job_id (큐가 가득 차면 QueueFull)
+- 진행률: 자식 프로세스가 progress(phase, done, total) 이벤트를 mp.Queue 로 전송
+          → Job.events 에 누적, SSE 구독자는 wait_events() 로 이어받기
+- 결과:   GLB / 메타데이터를 ArtifactStore 에 기록하고 ID만 부모로 전달
+          (IFC_STREAMING_MIN_MB 이상은 convert_ifc_file_streaming 으로 GLB 를 파일에 직접 기록)
+          params["federate"] 면 작업 디렉터리의 IFC 여러 개를 연합 변환 (ifc_federation)
+- 격리:   RLIMIT_AS 메모리 상한 + 타임아웃. 자식이 죽어도(segfault, OOM) 서버는 영향 없음
+          (ProcessPoolExecutor 는 워커 하나가 죽으면 풀 전체가 BrokenProcessPool 이 되므로 사용하지 않음)
+
+상태 흐름: queued → running → done | failed
+"""
+from __future__ import annotations
+
+import logging
+import multiprocessing as mp
+import os
+import queue
+import shutil
+import threading
+import time
+import uuid
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+_PROGRESS_INTERVAL_SEC = 0.5   # 자식 → 부모 진행률 전송 최소 간격
+_MAX_FINISHED_JOBS     = 200   # 메모리에 유지하는 완료 작업 수 (오래된 것부터 제거)
+
+
+class QueueFull(Exception):
+    """작업 큐가 가득 참 (API 에서 429 로 응답)."""
+
+
+class Job:
+    """변환 작업 1건의 상태. 필드 변경은 JobManager 잠금 하에서만 수행."""
+
+    def __init__(self, job_id: str, ifc_path: str, params: dict):
+        self.job_id     = job_id
+        self.ifc_path   = ifc_path
+        self.params     = params
+        self.status     = "queued"
+        self.phase: Optional[str] = None
+        self.done       = 0
+        self.total      = 0
+        self.result: Optional[dict] = None
+        self.error: Optional[str]   = None
+        self.created_at  = time.time()
+        self.started_at: Optional[float]  = None
+        self.finished_at: Optional[float] = None
+        self.events: list[dict] = []
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def to_dict(self) -> dict:
+        return {
+            "jobId":      self.job_id,
+            "status":     self.status,
+            "phase":      self.phase,
+            "done":       self.done,
+            "total":      self.total,
+            "error":      self.error,
+            "createdAt":  self.created_at,
+            "startedAt":  self.started_at,
+            "finishedAt": self.finished_at,
+        }
+
+
+# ── 자식 프로세스 ─────────────────────────────────────────────────────
+
+def _limit_memory(memory_mb: int) -> None:
+    if memory_mb <= 0:
+        return
+    try:
+        import resource
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError) as e:
+        logger.warning("[IFC Job] 메모리 상한 설정 실패: %s", e)
+
+
+def _run_job(ifc_path: str, params: dict, artifact_root: str, memory_mb: int, events,
+             streaming_min_bytes: int = 0, artifact_limits: tuple[int, int, int] = (0, 0, 600)) -> None:
+    """자식 프로세스 진입점. 모든 결과·오류는 events 큐로만 전달한다.
+    artifact_limits: 산출물 저장소 (max_bytes, ttl_sec, gc_interval_sec) — 자식이 쓸 때도 GC 가 돌도록."""
+    _limit_memory(memory_mb)
+
+    last = {"t": 0.0, "phase": None}
+
+    def progress(phase: str, done: int, total: int) -> None:
+        now = time.monotonic()
+        # 단계가 바뀌거나 마지막 항목이면 즉시, 그 외에는 간격 제한
+        if phase == last["phase"] and done < total and now - last["t"] < _PROGRESS_INTERVAL_SEC:
+            return
+        last["t"], last["phase"] = now, phase
+        events.put({"type": "progress", "phase": phase, "done": done, "total": total})
+
+    try:
+        import json
+        from ifc_converter import convert_ifc_file
+        from ifc_artifacts import ArtifactStore
+        from ifc_bvh import store_bvh_sidecar
+        from ifc_cache import get_cache
+
+        store = ArtifactStore(artifact_root, *artifact_limits)
+        if params.get("federate"):
+            events.put({"type": "result", "result": _run_federation(params, store, progress)})
+            return
+        tiled = params.get("output_mode") == "tiles"
+        incremental = bool(params.get("incremental")) and bool(params.get("project_id")) and not tiled
+        streaming = (streaming_min_bytes > 0 and params.get("output_mode") not in ("merged", "tiles")
+                     and not incremental and os.path.getsize(ifc_path) >= streaming_min_bytes)
+        lod_ids: list[str] = []
+        bvh_id = None
+        if incremental:
+            # 직전 revision 대비 변경 부재만 삼각분할 → patched GLB + delta
+            from ifc_incremental import convert_ifc_incremental, get_revision_store
+            inc_params = {k: v for k, v in params.items() if k not in ("lods", "incremental")}
+            result = convert_ifc_incremental(ifc_path, get_revision_store(), progress=progress,
+                                             **inc_params)
+            progress("store", 0, 0)
+            glb_id      = store.put(result.pop("glb_bytes"))
+            glb_lite_id = store.put(result.pop("glb_lite_bytes"))
+            bvh_id      = store_bvh_sidecar(store, result)
+        elif tiled:
+            # 층별 + 옥트리 타일: 타일 GLB 는 만들어지는 즉시 저장소로
+            from ifc_converter import convert_ifc_file_tiled
+            tile_params = {k: v for k, v in params.items()
+                           if k not in ("output_mode", "lods", "incremental", "bvh")}
+            result = convert_ifc_file_tiled(ifc_path, lambda _tile_id, glb: store.put(glb),
+                                            cache=get_cache(), progress=progress, **tile_params)
+            progress("store", 0, 0)
+            glb_lite_id = store.put(result.pop("glb_lite_bytes"))
+        elif streaming:
+            # 대용량: 2-패스 스트리밍 변환, GLB 를 저장소 임시 파일에 직접 기록 후 이동
+            from ifc_converter import convert_ifc_file_streaming
+            from ifc_lod import LOD_LEVELS
+            glb_tmp, lite_tmp = store.temp_path(".glb"), store.temp_path(".glb")
+            lod_tmps = [store.temp_path(".glb") for _ in LOD_LEVELS] if params.get("lods") else []
+            bvh_tmps = [store.temp_path(".npz")] if params.get("bvh") else []
+            try:
+                stream_params = {k: v for k, v in params.items()
+                                 if k not in ("output_mode", "lods", "incremental", "bvh")}
+                result = convert_ifc_file_streaming(ifc_path, glb_tmp, lite_tmp, progress=progress,
+                                                    spill_dir=os.path.dirname(ifc_path),
+                                                    lod_paths=lod_tmps,
+                                                    bvh_path=bvh_tmps[0] if bvh_tmps else None,
+                                                    **stream_params)
+                progress("store", 0, 0)
+                glb_id      = store.put_file(glb_tmp)
+                glb_lite_id = store.put_file(lite_tmp)
+                lod_ids     = [store.put_file(tmp) for tmp in lod_tmps]
+                bvh_id      = store.put_file(bvh_tmps[0]) if bvh_tmps else None
+            finally:
+                for tmp in (glb_tmp, lite_tmp, *lod_tmps, *bvh_tmps):
+                    if os.path.exists(tmp):
+                        os.unlink(tmp)
+        else:
+            full_params = {k: v for k, v in params.items() if k != "incremental"}
+            result = convert_ifc_file(ifc_path, cache=get_cache(), progress=progress, **full_params)
+            progress("store", 0, 0)
+            glb_id      = store.put(result.pop("glb_bytes"))
+            glb_lite_id = store.put(result.pop("glb_lite_bytes"))
+            lod_ids     = [store.put(glb) for glb in result.pop("lod_glbs", [])]
+            bvh_id      = store_bvh_sidecar(store, result)
+        from ifc_models import retain_model
+        retain_model(params.get("project_id", ""), ifc_path, result["elements"],
+                     params.get("user_scale", 1.0))
+        metadata = json.dumps({
+            "elements":  result["elements"],
+            "storeys":   result["storeys"],
+            "geoOrigin": result["geo_origin"],
+        }, ensure_ascii=False, default=str).encode("utf-8")
+        if tiled:
+            manifest = json.dumps(result["manifest"], ensure_ascii=False).encode("utf-8")
+            job_result = {"manifestId": store.put(manifest),
+                          "tileCount":  len(result["manifest"]["tiles"])}
+        else:
+            job_result = {"glbId": glb_id}
+        job_result.update({
+            "glbLiteId":    glb_lite_id,
+            "metadataId":   store.put(metadata),
+            "elementCount": len(result["elements"]),
+            "stats":        result["stats"],
+        })
+        from ifc_columnar import store_elements_sidecar
+        arrow_id = store_elements_sidecar(store, result["elements"])
+        if arrow_id is not None:
+            job_result["elementsArrowId"] = arrow_id
+        if bvh_id is not None:
+            job_result["bvhId"] = bvh_id
+        if "delta" in result:
+            job_result["delta"] = result["delta"]
+        if lod_ids:
+            job_result["lods"] = [result["lod_levels"][0]] + [
+                {**level, "glbId": lod_id} for level, lod_id in zip(result["lod_levels"][1:], lod_ids)
+            ]
+        events.put({"type": "result", "result": job_result})
+    except MemoryError:
+        events.put({"type": "error", "error": f"메모리 상한({memory_mb}MB) 초과"})
+    except Exception as e:
+        events.put({"type": "error", "error": f"{type(e).__name__}: {e}"})
+
+
+def _run_federation(params: dict, store, progress) -> dict:
+    """연합 변환 작업 — daemon 자식이라 프로세스 풀 없이 순차 삼각분할 (ifcopenshell 스레드는 num_workers)."""
+    from ifc_cache import get_cache
+    from ifc_federation import federate_ifc_files, store_federation
+
+    models = params["models"]
+    result = federate_ifc_files(
+        [(m["name"], m["path"]) for m in models], user_scale=params.get("user_scale", 1.0),
+        project_id=params.get("project_id", ""), processes=0,
+        num_workers=params.get("num_workers", 0), instancing=params.get("instancing", False),
+        cache=get_cache(), progress=progress, quantize=params.get("quantize", False),
+        optimize=params.get("optimize", False), bvh=params.get("bvh", False),
+    )
+    progress("store", 0, 0)
+    return store_federation(result, store, [m["fileName"] for m in models],
+                            [m["path"] for m in models], params.get("user_scale", 1.0))
+
+
+# ── 작업 관리자 ───────────────────────────────────────────────────────
+
+class JobManager:
+    """제한된 큐 + 디스패처 스레드 N개. 디스패처 하나가 한 번에 자식 프로세스 하나를 관리."""
+
+    def __init__(self, job_dir: str, artifact_root: str, workers: int = 2, queue_size: int = 8,
+                 memory_mb: int = 0, timeout_sec: int = 0, streaming_min_bytes: int = 0,
+                 artifact_max_bytes: int = 0, artifact_ttl_sec: int = 0, artifact_gc_interval_sec: int = 600):
+        self.job_dir       = job_dir
+        self.streaming_min_bytes = streaming_min_bytes
+        self.artifact_root = artifact_root
+        self.artifact_limits = (artifact_max_bytes, artifact_ttl_sec, artifact_gc_interval_sec)
+        self.memory_mb     = memory_mb
+        self.timeout_sec   = timeout_sec
+        self._jobs: dict[str, Job] = {}
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._cond = threading.Condition()
+        self._ctx  = mp.get_context("spawn")  # fork 는 서버의 스레드·소켓 상태를 복제하므로 피함
+        os.makedirs(job_dir, exist_ok=True)
+        for i in range(max(workers, 1)):
+            threading.Thread(target=self._dispatch_loop, name=f"ifc-job-{i}", daemon=True).start()
+
+    # ── 공개 API ──────────────────────────────────────────────────────
+
+    def new_upload_path(self) -> tuple[str, str]:
+        """제출 전에 업로드를 기록할 (job_id, 파일 경로)."""
+        job_id = uuid.uuid4().hex
+        return job_id, os.path.join(self.job_dir, f"{job_id}.ifc")
+
+    def new_upload_dir(self) -> tuple[str, str]:
+        """IFC 여러 개를 받는 작업(연합 변환)용 (job_id, 디렉터리) — 작업 종료 시 통째로 삭제."""
+        job_id = uuid.uuid4().hex
+        path = os.path.join(self.job_dir, job_id)
+        os.makedirs(path)
+        return job_id, path
+
+    def submit(self, job_id: str, ifc_path: str, params: dict) -> Job:
+        job = Job(job_id, ifc_path, params)
+        with self._cond:
+            self._prune()
+            self._jobs[job_id] = job
+            self._append_event(job, {"type": "status", "status": "queued"})
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._cond:
+                del self._jobs[job_id]
+            raise QueueFull(f"작업 큐가 가득 찼습니다 (최대 {self._queue.maxsize}건)")
+        logger.info("[IFC Job] 제출: %s (대기 %d건)", job_id, self._queue.qsize())
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def wait_events(self, job: Job, cursor: int, timeout: float = 15.0) -> tuple[list[dict], int]:
+        """cursor 이후 이벤트를 반환. 새 이벤트가 없으면 timeout 까지 대기 (빈 목록이면 keep-alive)."""
+        with self._cond:
+            if cursor >= len(job.events) and not job.finished:
+                self._cond.wait(timeout)
+            events = job.events[cursor:]
+            return events, cursor + len(events)
+
+    def stats(self) -> dict:
+        with self._cond:
+            counts: dict[str, int] = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+        return {"queueSize": self._queue.qsize(), "queueMax": self._queue.maxsize, "jobs": counts}
+
+    # ── 내부 ──────────────────────────────────────────────────────────
+
+    def _append_event(self, job: Job, event: dict) -> None:
+        job.events.append(event)
+        self._cond.notify_all()
+
+    def _prune(self) -> None:
+        finished = sorted((j for j in self._jobs.values() if j.finished), key=lambda j: j.finished_at)
+        for job in finished[:max(len(finished) - _MAX_FINISHED_JOBS, 0)]:
+            del self._jobs[job.job_id]
+
+    def _dispatch_loop(self) -> None:
+        while True:
+            job = self._queue.get()
+            try:
+                self._run(job)
+            except Exception as e:
+                logger.exception("[IFC Job] 디스패처 오류: %s", job.job_id)
+                self._finish(job, error=str(e))
+            finally:
+                if os.path.isdir(job.ifc_path):
+                    shutil.rmtree(job.ifc_path, ignore_errors=True)
+                else:
+                    try:
+                        os.unlink(job.ifc_path)
+                    except OSError:
+                        pass
+
+    def _run(self, job: Job) -> None:
+        with self._cond:
+            job.status, job.started_at = "running", time.time()
+            self._append_event(job, {"type": "status", "status": "running"})
+
+        events = self._ctx.Queue()
+        proc = self._ctx.Process(
+            target=_run_job,
+            args=(job.ifc_path, job.params, self.artifact_root, self.memory_mb, events,
+                  self.streaming_min_bytes, self.artifact_limits),
+            name=f"ifc-convert-{job.job_id[:8]}",
+            daemon=True,
+        )
+        proc.start()
+        deadline = time.monotonic() + self.timeout_sec if self.timeout_sec > 0 else None
+        result = error = None
+
+        while result is None and error is None:
+            # 진행률 이벤트가 계속 들어와도 제한 시간은 매 반복마다 확인
+            if deadline is not None and time.monotonic() > deadline:
+                proc.kill()
+                error = f"변환 시간 초과 ({self.timeout_sec}s)"
+                break
+            try:
+                msg = events.get(timeout=1.0)
+            except queue.Empty:
+                if not proc.is_alive():
+                    # 종료 직전에 보낸 메시지가 남아 있을 수 있으므로 한 번 더 확인
+                    try:
+                        msg = events.get(timeout=1.0)
+                    except queue.Empty:
+                        error = f"변환 프로세스 비정상 종료 (exit code {proc.exitcode})"
+                        break
+                else:
+                    continue
+            if msg["type"] == "progress":
+                with self._cond:
+                    job.phase, job.done, job.total = msg["phase"], msg["done"], msg["total"]
+                    self._append_event(job, msg)
+            elif msg["type"] == "result":
+                result = msg["result"]
+            else:
+                error = msg["error"]
+
+        proc.join(timeout=10)
+        if proc.is_alive():
+            proc.kill()
+            proc.join()
+        events.close()
+        self._finish(job, result=result, error=error)
+
+    def _finish(self, job: Job, result: Optional[dict] = None, error: Optional[str] = None) -> None:
+        with self._cond:
+            job.finished_at = time.time()
+            if error is None:
+                job.status, job.result = "done", result
+                self._append_event(job, {"type": "status", "status": "done", "result": result})
+            else:
+                job.status, job.error = "failed", error
+                self._append_event(job, {"type": "status", "status": "failed", "error": error})
+        elapsed = job.finished_at - (job.started_at or job.created_at)
+        from ifc_profile import get_metrics
+        mode = "federation" if job.params.get("federate") else "job"
+        if error is None and mode == "federation":
+            for m in (result or {}).get("models", []):
+                get_metrics().record(m.get("stats", {}), mode)
+        elif error is None:
+            get_metrics().record((result or {}).get("stats", {}), mode)
+        else:
+            get_metrics().record_failure(mode)
+        if error is None:
+            logger.info("[IFC Job] 완료: %s (%.1fs)", job.job_id, elapsed)
+        else:
+            logger.warning("[IFC Job] 실패: %s (%.1fs) — %s", job.job_id, elapsed, error)
+
+
+_manager: Optional[JobManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """설정(IFC_JOB_*) 기반 전역 작업 관리자."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            from config.settings import (
+                IFC_ARTIFACT_DIR, IFC_JOB_DIR, IFC_JOB_WORKERS, IFC_JOB_QUEUE_SIZE,
+                IFC_JOB_MEMORY_MB, IFC_JOB_TIMEOUT_SEC, IFC_STREAMING_MIN_MB,
+                IFC_ARTIFACT_MAX_BYTES, IFC_ARTIFACT_TTL_SEC, IFC_ARTIFACT_GC_INTERVAL_SEC,
+            )
+            _manager = JobManager(
+                IFC_JOB_DIR, IFC_ARTIFACT_DIR,
+                workers=IFC_JOB_WORKERS, queue_size=IFC_JOB_QUEUE_SIZE,
+                memory_mb=IFC_JOB_MEMORY_MB, timeout_sec=IFC_JOB_TIMEOUT_SEC,
+                streaming_min_bytes=IFC_STREAMING_MIN_MB * 1024 * 1024,
+                artifact_max_bytes=IFC_ARTIFACT_MAX_BYTES, artifact_ttl_sec=IFC_ARTIFACT_TTL_SEC,
+                artifact_gc_interval_sec=IFC_ARTIFACT_GC_INTERVAL_SEC,
+            )
+            logger.info("[IFC Job] 워커 %d개, 큐 %d건, 메모리 상한 %dMB",
+                        IFC_JOB_WORKERS, IFC_JOB_QUEUE_SIZE, IFC_JOB_MEMORY_MB)
+        return _manager
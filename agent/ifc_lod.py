@@ -0,0 +1,147 @@
+"""
+IFC 부재 LOD 체인 (quadric 오차 기반 단순화)
+
+full 형상(LOD0)과 convex hull lite GLB 사이를 메우는 중간 단계.
+부재마다 bbox 크기에 비례한 삼각형 예산으로 LOD1~3 을 만들고,
+변환기가 레벨별 GLB 와 화면 점유율(screen coverage) 힌트를 함께 출력한다.
+뷰어는 대형 모델에서 거친 레벨부터 받아 먼저 그린 뒤 가까운 부재만 상세 레벨로 교체한다.
+
+단순화 방식: quadric 오차 기반 정점 클러스터링 (Lindstrom 2000).
+  격자 셀마다 면 quadric(Garland-Heckbert) 을 누적해 오차 최소 위치를 대표점으로 삼는다.
+  edge collapse 와 같은 오차 척도를 쓰면서 numpy 로 일괄 계산되어 부재 수만 개에도 빠르다.
+  예산을 넘으면 격자를 키워 재시도하고, 끝내 넘거나 형상이 사라지면 AABB 로 폴백.
+"""
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+from ifc_converter import _compute_normals, _make_aabb_mesh
+
+# (level, 기준 삼각형 예산 — bbox 대각선 10m 부재 기준, 화면 점유율 하한)
+# 뷰어는 부재 투영 크기/화면 높이 ≥ screenCoverage 인 레벨 중 가장 상세한 것을 사용.
+LOD_LEVELS: list[tuple[int, int, float]] = [
+    (1, 512, 0.10),
+    (2, 96,  0.03),
+    (3, 16,  0.0),
+]
+LOD0_SCREEN_COVERAGE = 0.30
+_REFERENCE_DIAG = 10.0
+_MAX_RETRIES = 5
+
+
+def triangle_budget(base: int, bbox_diag: float) -> int:
+    """부재 크기에 비례한 삼각형 예산 (기준의 1/4 ~ 4배, 최소 12 = 상자)."""
+    factor = min(max(bbox_diag / _REFERENCE_DIAG, 0.25), 4.0)
+    return max(12, int(base * factor))
+
+
+def _face_quadrics(v0: np.ndarray, v1: np.ndarray, v2: np.ndarray) -> np.ndarray:
+    """면 평면 quadric (면적 가중) → (F, 10) 대칭 4x4 의 상삼각 성분."""
+    n = np.cross(v1 - v0, v2 - v0)
+    area2 = np.linalg.norm(n, axis=1)
+    ok = area2 > 0
+    n[ok] /= area2[ok, None]
+    d = -np.einsum("ij,ij->i", n, v0)
+    a, b, c = n[:, 0], n[:, 1], n[:, 2]
+    w = area2 * 0.5
+    return np.column_stack([
+        a * a, a * b, a * c, a * d,
+        b * b, b * c, b * d,
+        c * c, c * d,
+        d * d,
+    ]) * w[:, None]
+
+
+def simplify_clustering(positions: np.ndarray, indices: np.ndarray,
+                        cell_size: float) -> tuple[np.ndarray, np.ndarray]:
+    """cell_size 격자로 정점 클러스터링. 반환: (positions f32, indices u32) — 비어 있을 수 있음."""
+    pos = positions.astype(np.float64)
+    tris = indices.reshape(-1, 3).astype(np.intp)
+    lo = pos.min(axis=0)
+
+    cell = np.floor((pos - lo) / cell_size).astype(np.int64)
+    _, vert_cell = np.unique(cell, axis=0, return_inverse=True)
+    vert_cell = vert_cell.reshape(-1)
+    n_cells = int(vert_cell.max()) + 1
+
+    # 셀 quadric = 셀에 속한 꼭짓점을 가진 면들의 quadric 합
+    q_face = _face_quadrics(pos[tris[:, 0]], pos[tris[:, 1]], pos[tris[:, 2]])
+    corner_cell = vert_cell[tris].reshape(-1)
+    q_corner = np.repeat(q_face, 3, axis=0)
+    q = np.column_stack([
+        np.bincount(corner_cell, weights=q_corner[:, k], minlength=n_cells) for k in range(10)
+    ])
+
+    # 셀 평균 위치 (quadric 해가 불안정하거나 셀 밖으로 튈 때 폴백)
+    cnt = np.bincount(vert_cell, minlength=n_cells)[:, None]
+    mean = np.column_stack([
+        np.bincount(vert_cell, weights=pos[:, k], minlength=n_cells) for k in range(3)
+    ]) / np.maximum(cnt, 1)
+
+    A = np.empty((n_cells, 3, 3))
+    A[:, 0, 0], A[:, 0, 1], A[:, 0, 2] = q[:, 0], q[:, 1], q[:, 2]
+    A[:, 1, 0], A[:, 1, 1], A[:, 1, 2] = q[:, 1], q[:, 4], q[:, 5]
+    A[:, 2, 0], A[:, 2, 1], A[:, 2, 2] = q[:, 2], q[:, 5], q[:, 7]
+    rhs = -q[:, [3, 6, 8]]
+
+    out = mean.copy()
+    stable = np.linalg.cond(A) < 1e4
+    if stable.any():
+        x = np.linalg.solve(A[stable], rhs[stable][..., None])[..., 0]
+        # 셀(여유 절반 포함) 밖으로 나간 해는 버림
+        cell_lo = np.floor((mean[stable] - lo) / cell_size) * cell_size + lo
+        inside = np.all((x >= cell_lo - cell_size / 2) & (x <= cell_lo + cell_size * 1.5), axis=1)
+        idx = np.flatnonzero(stable)[inside]
+        out[idx] = x[inside]
+
+    # 삼각형 재매핑: 퇴화(같은 셀 2개 이상) 제거 + 중복 면 제거
+    t = vert_cell[tris]
+    keep = (t[:, 0] != t[:, 1]) & (t[:, 1] != t[:, 2]) & (t[:, 0] != t[:, 2])
+    t = t[keep]
+    if len(t) == 0:
+        return np.zeros((0, 3), np.float32), np.zeros(0, np.uint32)
+    _, first = np.unique(np.sort(t, axis=1), axis=0, return_index=True)
+    t = t[np.sort(first)]
+
+    used, t = np.unique(t, return_inverse=True)
+    return out[used].astype(np.float32), t.reshape(-1).astype(np.uint32)
+
+
+def lod_chain(positions: np.ndarray, normals: np.ndarray, indices: np.ndarray
+              ) -> list[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """LOD_LEVELS 순서의 (positions, normals, indices) 목록.
+    이전 레벨이 이미 예산 안이면 그대로 재사용 (작은 부재는 추가 비용 없음)."""
+    lo, hi = positions.min(axis=0), positions.max(axis=0)
+    diag = float(np.linalg.norm(hi - lo))
+    cur_pos, cur_nrm, cur_idx = positions, normals, indices
+    chain = []
+    for _, base, _ in LOD_LEVELS:
+        budget = triangle_budget(base, diag)
+        if len(cur_idx) // 3 > budget:
+            # 표면 삼각형 ≈ 2·(셀 수)² 가정으로 시작 셀 크기 추정 후 예산 안에 들 때까지 확대
+            cell = max(diag, 1e-6) / max(math.sqrt(budget / 2.0), 1.0)
+            new_pos = new_idx = None
+            for _ in range(_MAX_RETRIES):
+                p, i = simplify_clustering(cur_pos, cur_idx, cell)
+                if 0 < len(i) // 3 <= budget:
+                    new_pos, new_idx = p, i
+                    break
+                if len(i) == 0:
+                    break
+                cell *= 1.5
+            if new_pos is None:
+                new_pos, new_idx = _make_aabb_mesh(positions)
+            cur_pos, cur_idx = new_pos, new_idx
+            cur_nrm = _compute_normals(cur_pos, cur_idx)
+        chain.append((cur_pos, cur_nrm, cur_idx))
+    return chain
+
+
+def lod_manifest(lod_triangles: list[int]) -> list[dict]:
+    """레벨별 화면 점유율 힌트 + 삼각형 수. LOD0 = full GLB."""
+    levels = [{"level": 0, "screenCoverage": LOD0_SCREEN_COVERAGE}]
+    for (level, _, coverage), tris in zip(LOD_LEVELS, lod_triangles):
+        levels.append({"level": level, "screenCoverage": coverage, "triangles": tris})
+    return levels
@@ -0,0 +1,409 @@
+"""
+프로젝트 간 공유 부재 형상 저장소 (content-addressed mesh store)
+
+같은 제조사 카탈로그·사내 라이브러리 부재(기둥·창호·설비 fitting)는 프로젝트가 달라도
+형상 표현이 같다. 변환 캐시(ifc_cache)는 IFC 파일 전체 hash 단위라 이런 재사용을 못 한다.
+이 저장소는 부재 하나의 형상 표현을 키로 로컬 좌표 mesh 를 디스크에 두고 모든 변환이 공유한다.
+
+  키     sha256(표현 하위 엔티티의 #id 무관 직렬화 + 단위 배율 + ifcopenshell 버전 + 설정 태그)
+         ObjectPlacement 는 키에 넣지 않는다 — 같은 형상이 다른 위치에 놓여도 히트.
+  값     로컬 좌표(미터) 정점·인덱스·노말 + 최초 삼각분할 시간(sec)
+  히트   create_shape 생략. 배치 행렬(ifcopenshell.util.placement)로 월드 좌표 복원
+  미스   평소처럼 삼각분할 후 배치 역변환해 로컬 좌표로 저장
+
+개구부가 있는 부재(HasOpenings)는 boolean 결과가 개구부 배치에 따라 달라 저장소를 우회한다.
+
+참조 카운트: 프로젝트별 manifest(owners/*.json)에 마지막 변환이 쓴 키 목록을 기록하고,
+키의 참조 수 = 그 키를 가진 manifest 수. GC 는 참조 0 이면서 유예 시간(IFC_MESH_STORE_GRACE_SEC)
+이 지난 mesh 를 지우고, 그래도 상한을 넘으면 오래 안 쓰인(mtime) 순으로 지운다.
+작업 API 는 변환마다 자식 프로세스이므로 상태는 모두 파일(원자적 rename·mtime)로만 공유한다.
+
+절약 시간: 히트마다 저장된 삼각분할 시간을 더해 profile counters(meshStoreSavedMs)로 보고.
+병렬 iterator 경로의 시간은 결과당 평균 경과 시간으로 추정한 값이다.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import struct
+import tempfile
+import threading
+import time
+from collections import Counter
+from typing import Iterator, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_FORMAT = 1
+_MAGIC = b"IMS1"
+_HEADER = struct.Struct("<4sIIIf")   # magic, 정점 수, 인덱스 수, 노말 여부, 삼각분할 시간(sec)
+_PARALLEL_MIN = 64                   # 삼각분할할 부재가 이보다 적으면 병렬 iterator 대신 직렬
+
+
+def _settings_tag(unit_scale: float) -> str:
+    import ifcopenshell
+    # _prepare_tessellation 의 geom 설정(월드 좌표, 정점 용접 없음)이 바뀌면 여기도 바꿀 것
+    return f"v{_FORMAT}|ifcopenshell {ifcopenshell.version}|world-coords|no-weld|unit {float(unit_scale)!r}"
+
+
+def representation_key(ifc, product, tag: str) -> Optional[str]:
+    """부재 형상 표현의 내용 hash. 저장소를 쓸 수 없는 부재(형상 없음·개구부)는 None."""
+    from ifc_incremental import _subtree_digest
+
+    if product.Representation is None or getattr(product, "HasOpenings", None):
+        return None
+    h = hashlib.sha256(tag.encode())
+    _subtree_digest(ifc, [product.Representation], h)
+    return h.hexdigest()
+
+
+def placement_matrix(placement, unit_scale: float, memo: dict) -> np.ndarray:
+    """IfcLocalPlacement → 월드 4x4 (이동 성분 미터). 상위 배치(층·건물)는 memo 로 한 번만 계산."""
+    import ifcopenshell.util.placement
+
+    if placement is None:
+        return np.eye(4)
+    m = memo.get(placement.id())
+    if m is None:
+        m = np.array(ifcopenshell.util.placement.get_axis2placement(placement.RelativePlacement),
+                     dtype=np.float64)
+        m[:3, 3] *= unit_scale
+        if placement.PlacementRelTo is not None:
+            m = placement_matrix(placement.PlacementRelTo, unit_scale, memo) @ m
+        memo[placement.id()] = m
+    return m
+
+
+def _to_local(arrays: tuple, m: np.ndarray) -> tuple:
+    """월드 좌표 → 로컬 (회전 성분은 정규 직교이므로 역행렬 = 전치)."""
+    verts, faces, normals = arrays
+    R, t = m[:3, :3], m[:3, 3]
+    local = ((verts.astype(np.float64) - t) @ R).astype(np.float32)
+    nrm = (normals.astype(np.float64) @ R).astype(np.float32) if normals is not None else None
+    return local, faces, nrm
+
+
+def _to_world(arrays: tuple, m: np.ndarray) -> tuple:
+    verts, faces, normals = arrays
+    R, t = m[:3, :3], m[:3, 3]
+    world = (verts.astype(np.float64) @ R.T + t).astype(np.float32)
+    nrm = (normals.astype(np.float64) @ R.T).astype(np.float32) if normals is not None else None
+    return world, faces, nrm
+
+
+class MeshStore:
+    """디스크 mesh 저장소. 여러 프로세스가 같은 root 를 동시에 쓴다."""
+
+    def __init__(self, root: str, max_bytes: int, grace_sec: int = 3600, gc_interval_sec: int = 600):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.grace_sec = grace_sec
+        self.gc_interval_sec = gc_interval_sec
+        self.hits = 0
+        self.misses = 0
+        self.saved_sec = 0.0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(root, "owners"), exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.mesh")
+
+    def _owner_path(self, owner: str) -> str:
+        return os.path.join(self.root, "owners", hashlib.sha256(owner.encode()).hexdigest() + ".json")
+
+    def _write_atomic(self, path: str, data: bytes) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except Exception:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+    # ── 조회 / 저장 ──────────────────────────────────────────────────
+
+    def get(self, key: str) -> Optional[tuple]:
+        """(로컬 정점, 인덱스, 노말 | None, 삼각분할 시간) — 없거나 손상이면 None."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)  # mtime = 마지막 사용 시각 (GC LRU 기준)
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        try:
+            magic, n_verts, n_idx, has_nrm, sec = _HEADER.unpack_from(data)
+            if magic != _MAGIC:
+                raise ValueError("magic")
+            off = _HEADER.size
+            verts = np.frombuffer(data, np.float32, n_verts * 3, off).reshape(-1, 3)
+            off += verts.nbytes
+            faces = np.frombuffer(data, np.uint32, n_idx, off)
+            off += faces.nbytes
+            normals = np.frombuffer(data, np.float32, n_verts * 3, off).reshape(-1, 3) if has_nrm else None
+        except (ValueError, struct.error):
+            logger.warning("[IFC MeshStore] 항목 손상 — 삭제: %s", key)
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+            self.saved_sec += sec
+        return verts, faces, normals, float(sec)
+
+    def put(self, key: str, arrays: tuple, sec: float) -> None:
+        verts, faces, normals = arrays
+        parts = [_HEADER.pack(_MAGIC, len(verts), len(faces), normals is not None, sec),
+                 np.ascontiguousarray(verts, np.float32).tobytes(),
+                 np.ascontiguousarray(faces, np.uint32).tobytes()]
+        if normals is not None:
+            parts.append(np.ascontiguousarray(normals, np.float32).tobytes())
+        try:
+            self._write_atomic(self._path(key), b"".join(parts))
+        except OSError:
+            logger.warning("[IFC MeshStore] 항목 저장 실패: %s", key, exc_info=True)
+
+    # ── 참조 / GC ────────────────────────────────────────────────────
+
+    def set_owner(self, owner: str, keys) -> None:
+        """owner(프로젝트)가 참조하는 키 집합을 교체. 빈 집합이면 참조 해제."""
+        path = self._owner_path(owner)
+        keys = sorted({k for k in keys if k})
+        if not keys:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            return
+        body = json.dumps({"owner": owner, "updatedAt": time.time(), "keys": keys})
+        self._write_atomic(path, body.encode())
+
+    def refcounts(self) -> Counter:
+        """키 → 참조하는 owner 수."""
+        refs: Counter = Counter()
+        owners = os.path.join(self.root, "owners")
+        for entry in os.scandir(owners):
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                with open(entry.path, encoding="utf-8") as f:
+                    refs.update(json.load(f)["keys"])
+            except (OSError, ValueError, KeyError):
+                logger.warning("[IFC MeshStore] owner manifest 읽기 실패: %s", entry.name)
+        return refs
+
+    def _scan(self) -> Iterator[tuple[str, str, int, float]]:
+        """(key, 경로, 크기, mtime)."""
+        for shard in os.scandir(self.root):
+            if not shard.is_dir() or len(shard.name) != 2:
+                continue
+            for entry in os.scandir(shard.path):
+                if not entry.name.endswith(".mesh"):
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                yield entry.name[:-5], entry.path, st.st_size, st.st_mtime
+
+    def gc(self) -> dict:
+        """참조 0 + 유예 경과 mesh 삭제 → 상한 초과분은 참조 여부와 무관하게 LRU 삭제."""
+        refs = self.refcounts()
+        cutoff = time.time() - self.grace_sec
+        kept, removed, freed = [], 0, 0
+        for key, path, size, mtime in self._scan():
+            if refs[key] == 0 and mtime < cutoff:
+                try:
+                    os.unlink(path)
+                    removed += 1
+                    freed += size
+                except OSError:
+                    pass
+            else:
+                kept.append((refs[key] > 0, mtime, size, path))
+
+        total = sum(size for _, _, size, _ in kept)
+        if total > self.max_bytes:
+            # 참조 없는 것 먼저, 그다음 오래된 순
+            for _, _, size, path in sorted(kept):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.unlink(path)
+                    removed += 1
+                    freed += size
+                    total -= size
+                except OSError:
+                    pass
+        logger.info("[IFC MeshStore] GC: %d개 삭제 (%d bytes), 남은 용량 %d bytes", removed, freed, total)
+        return {"removed": removed, "freedBytes": freed, "bytes": total}
+
+    def maybe_gc(self) -> None:
+        """마지막 GC 후 gc_interval_sec 가 지났으면 GC (프로세스 간 표식 파일 mtime 으로 조정)."""
+        marker = os.path.join(self.root, ".gc")
+        try:
+            if time.time() - os.stat(marker).st_mtime < self.gc_interval_sec:
+                return
+        except FileNotFoundError:
+            pass
+        with open(marker, "a"):
+            os.utime(marker)
+        try:
+            self.gc()
+        except OSError:
+            logger.warning("[IFC MeshStore] GC 실패", exc_info=True)
+
+    def stats(self) -> dict:
+        refs = self.refcounts()
+        entries = total = referenced = 0
+        for key, _, size, _ in self._scan():
+            entries += 1
+            total += size
+            referenced += refs[key] > 0
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits":       self.hits,
+                "misses":     self.misses,
+                "hitRatio":   round(self.hits / lookups, 4) if lookups else 0.0,
+                "savedSec":   round(self.saved_sec, 3),
+                "entries":    entries,
+                "referenced": referenced,
+                "owners":     len(os.listdir(os.path.join(self.root, "owners"))),
+                "bytes":      total,
+                "maxBytes":   self.max_bytes,
+            }
+
+
+_store: Optional[MeshStore] = None
+_store_lock = threading.Lock()
+
+
+def get_mesh_store() -> Optional[MeshStore]:
+    """설정(IFC_MESH_STORE_DIR / IFC_MESH_STORE_MAX_BYTES) 기반 전역 저장소. 상한이 0이면 비활성(None)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            from config.settings import (IFC_MESH_STORE_DIR, IFC_MESH_STORE_GC_INTERVAL_SEC,
+                                         IFC_MESH_STORE_GRACE_SEC, IFC_MESH_STORE_MAX_BYTES)
+            if IFC_MESH_STORE_MAX_BYTES <= 0:
+                return None
+            _store = MeshStore(IFC_MESH_STORE_DIR, IFC_MESH_STORE_MAX_BYTES,
+                               IFC_MESH_STORE_GRACE_SEC, IFC_MESH_STORE_GC_INTERVAL_SEC)
+            logger.info("[IFC MeshStore] 저장소: %s (상한 %d bytes)", IFC_MESH_STORE_DIR, IFC_MESH_STORE_MAX_BYTES)
+        return _store
+
+
+def iter_shapes(ctx: dict, store: MeshStore, num_workers: int, progress=None):
+    """
+    ifc_converter._iter_shapes 의 저장소 경유판 — 히트는 바로 yield, 미스만 삼각분할 후 저장.
+    같은 키의 미스가 여럿이면(한 파일 안 반복 부재) 첫 부재만 삼각분할하고 나머지는 그 결과를 배치한다.
+    부재별 키는 ctx["mesh_keys"] {expressId: key} 에 남겨 _element_geometry 가 geom 에 붙인다.
+    """
+    from ifc_converter import _iter_shapes_parallel, _iter_shapes_serial
+    from ifc_profile import NULL_PROFILE
+
+    ifc, unit_scale = ctx["ifc"], ctx["unit_scale"]
+    profile = ctx.get("profile") or NULL_PROFILE
+    tag = _settings_tag(unit_scale)
+    keys: dict[int, str] = ctx.setdefault("mesh_keys", {})
+    memo: dict[int, np.ndarray] = {}
+    leaders: dict[int, np.ndarray] = {}            # 삼각분할할 부재 expressId → 배치
+    followers: dict[str, list[tuple]] = {}         # key → [(product, our_type, 배치)] 선행 부재 결과 대기
+    loaded: dict[str, tuple] = {}                  # 이번 변환에서 읽은 저장소 항목 (같은 키 반복 조회 방지)
+    pending: list[tuple] = []
+    hits = 0
+    saved = 0.0
+
+    products = ctx["products"]
+    for i, (product, our_type) in enumerate(products, 1):
+        if progress is not None and i % 256 == 0:
+            progress("meshStore", i, len(products))
+        key = representation_key(ifc, product, tag)
+        if key is None:
+            profile.count("meshStoreBypass")
+            pending.append((product, our_type))
+            continue
+        express_id = product.id()
+        keys[express_id] = key
+        m = placement_matrix(product.ObjectPlacement, unit_scale, memo)
+        if key in followers:
+            followers[key].append((product, our_type, m))
+            continue
+        cached = loaded.get(key) or store.get(key)
+        if cached is None:
+            profile.count("meshStoreMisses")
+            leaders[express_id] = m
+            followers[key] = []
+            pending.append((product, our_type))
+            continue
+        loaded[key] = cached
+        hits += 1
+        saved += cached[3]
+        yield express_id, _to_world(cached[:3], m)
+
+    # 미스가 적으면 병렬 iterator 초기화 비용이 더 크다 (시간 추정도 초기화 비용에 묻힌다)
+    parallel = num_workers > 1 and len(pending) >= _PARALLEL_MIN
+    if pending:
+        if parallel:
+            shapes = _iter_shapes_parallel(ctx["settings"], ifc, pending, num_workers, progress, profile=profile)
+        else:
+            shapes = _iter_shapes_serial(ctx["settings"], pending, progress, profile=profile)
+        start = t0 = time.perf_counter()
+        for n, (express_id, arrays) in enumerate(shapes, 1):
+            # 직렬: 직전 결과 이후 경과 시간 = 이 부재 삼각분할 시간
+            # 병렬: 완료 순서로 나와 부재별 시간을 알 수 없으므로 지금까지의 결과당 평균 경과 시간
+            now = time.perf_counter()
+            sec = (now - start) / n if parallel else now - t0
+            m = leaders.pop(express_id, None)
+            if m is None:
+                yield express_id, arrays
+            else:
+                key = keys[express_id]
+                local = _to_local(arrays, m)
+                store.put(key, local, sec)
+                yield express_id, arrays
+                for product, _, fm in followers.pop(key):
+                    hits += 1
+                    saved += sec
+                    yield product.id(), _to_world(local, fm)
+            t0 = time.perf_counter()
+
+    # 선행 부재가 삼각분할에 실패한 키는 나머지 부재를 직접 삼각분할 (형상 오류면 똑같이 빠진다)
+    orphans = [(p, t) for group in followers.values() for p, t, _ in group]
+    if orphans:
+        yield from _iter_shapes_serial(ctx["settings"], orphans, profile=profile)
+    profile.count("meshStoreHits", hits)
+    profile.count("meshStoreSavedMs", int(saved * 1000))
+    store.maybe_gc()
+
+
+def geometry_keys(geoms) -> list[str]:
+    """geom 목록(또는 메타데이터 dict)에 붙은 저장소 키."""
+    return [g["mesh_key"] for g in geoms if g.get("mesh_key")]
+
+
+def retain_meshes(project_id: str, keys) -> None:
+    """프로젝트의 마지막 변환이 쓴 mesh 참조 기록 (저장소 비활성·project_id 없음이면 무시)."""
+    store = get_mesh_store()
+    if store is None or not project_id:
+        return
+    try:
+        store.set_owner(project_id, keys)
+    except OSError:
+        logger.warning("[IFC MeshStore] 참조 기록 실패: %s", project_id, exc_info=True)
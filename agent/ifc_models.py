@@ -0,0 +1,328 @@
+"""
+상주(resident) IFC 모델 서버 — 부재 상세 정보 on-demand 조회
+
+변환 응답의 elements 에 모든 Pset·물량을 미리 담아 보내고 IFC 는 버리던 방식 대신,
+변환 시 IFC 를 프로젝트별로 보관해 두고 상세 패널이 필요할 때 GlobalId 로 조회한다.
+
+  register(project_id, ifc_path)  — 변환 직후 IFC 보관 (작업 자식 프로세스에서도 호출 가능)
+  element(project_id, global_id)  — 속성 / 물량 / 재질 / 공간 포함 관계
+  model_file(project_id)          — 보관 IFC 경로 + 변환 시 user_scale (간섭 검출 등 형상 재계산용)
+
+파싱된 ifcopenshell.file 과 관계 인덱스(_build_relationship_index)는 LRU 로 메모리에 유지한다.
+첫 조회만 파일 로드 비용(수 초)이 들고 이후 조회는 dict 조회 수준.
+상주 한도는 개수(max_models)와 추정 메모리(max_resident_bytes) 둘 다 — 파싱 결과는 대략
+IFC 파일 크기의 _MEMORY_FACTOR 배를 차지하므로 파일 크기 × 배수로 추정하고, 둘 중 하나라도 넘으면
+오래 쓰이지 않은 모델부터 해제한다 (방금 로드한 모델은 한도보다 커도 유지).
+보관 파일이 다시 등록되면(재변환) inode/mtime 변화로 감지해 다음 조회 때 다시 로드한다.
+
+디스크 보관본은 등록 시 prune() 으로 제한한다 — 마지막 사용(등록·조회 시 .json mtime 갱신) 후
+ttl_sec 이 지난 프로젝트를 지우고, 남은 IFC 합계가 max_bytes 를 넘으면 오래 쓰이지 않은 순으로 삭제
+(0 이면 해당 한도 없음, 방금 등록한 프로젝트는 유지).
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+_MEMORY_FACTOR = 8   # 파싱된 ifcopenshell.file + 인덱스 메모리 ≈ IFC 파일 크기 × 배수 (실측 5~10배)
+
+
+class ModelNotFound(Exception):
+    """등록된 IFC 또는 GlobalId 없음 (API 에서 404)."""
+
+
+class _ResidentModel:
+    """로드된 IFC 1건 + 조회 인덱스."""
+
+    def __init__(self, path: str):
+        import ifcopenshell
+        from ifc_converter import _build_relationship_index, _extract_spatial_structure
+
+        st = os.stat(path)
+        self.stamp = (st.st_ino, st.st_mtime_ns)
+        self.est_bytes = st.st_size * _MEMORY_FACTOR
+        t0 = time.monotonic()
+        self.ifc = ifcopenshell.open(path)
+        self.rel_index = _build_relationship_index(self.ifc)
+        self.elem_to_spatial, _ = _extract_spatial_structure(self.ifc)
+        self.by_global_id = {p.GlobalId: p for p in self.ifc.by_type("IfcRoot")}
+        self.load_sec = round(time.monotonic() - t0, 3)
+
+    def element(self, global_id: str) -> dict:
+        product = self.by_global_id.get(global_id)
+        if product is None:
+            raise ModelNotFound(f"GlobalId 없음: {global_id}")
+        express_id = product.id()
+
+        contained_in = None
+        for rel in getattr(product, "ContainedInStructure", None) or ():
+            contained_in = _entity_ref(rel.RelatingStructure)
+            break
+        part_of = None
+        for rel in getattr(product, "Decomposes", None) or ():
+            part_of = _entity_ref(rel.RelatingObject)
+            break
+        spatial = self.elem_to_spatial.get(express_id, {})
+
+        return {
+            "globalId":   global_id,
+            "expressId":  express_id,
+            "ifcType":    product.is_a(),
+            "ifcName":    getattr(product, "Name", None),
+            "material":   self.rel_index["material"].get(express_id),
+            "properties": self.rel_index["properties"].get(express_id, {}),
+            "quantities": self.rel_index["quantities"].get(express_id, {}),
+            "spatial": {
+                "storey":          spatial.get("storey"),
+                "storeyElevation": spatial.get("storeyElevation"),
+                "building":        spatial.get("building"),
+                "containedIn":     contained_in,
+                "partOf":          part_of,
+            },
+        }
+
+
+def _entity_ref(entity) -> Optional[dict]:
+    if entity is None:
+        return None
+    return {
+        "globalId": getattr(entity, "GlobalId", None),
+        "ifcType":  entity.is_a(),
+        "name":     getattr(entity, "Name", None),
+    }
+
+
+class ModelServer:
+    """프로젝트별 IFC 보관(디스크) + 파싱 결과 LRU(메모리)."""
+
+    def __init__(self, root: str, max_models: int = 4, max_bytes: int = 0, ttl_sec: int = 0,
+                 max_resident_bytes: int = 0):
+        self.root = root
+        self.max_models = max_models
+        self.max_resident_bytes = max_resident_bytes
+        self.max_bytes = max_bytes
+        self.ttl_sec = ttl_sec
+        self.hits = 0
+        self.loads = 0
+        self._lock = threading.Lock()
+        self._models: OrderedDict[str, _ResidentModel] = OrderedDict()
+        self._loading: dict[str, threading.Lock] = {}   # 같은 프로젝트 동시 로드 방지
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, project_id: str) -> str:
+        name = hashlib.sha256(project_id.encode()).hexdigest()
+        return os.path.join(self.root, f"{name}.ifc")
+
+    def register(self, project_id: str, ifc_path: str, user_scale: float = 1.0) -> bool:
+        """IFC 를 프로젝트 보관본으로 복사 (임시 파일 → rename 이므로 조회 중인 로드와 충돌 없음)."""
+        if not project_id:
+            return False
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".tmp-")
+        os.close(fd)
+        try:
+            shutil.copyfile(ifc_path, tmp)
+            path = self._path(project_id)
+            with open(path[:-4] + ".json", "w", encoding="utf-8") as f:
+                json.dump({"projectId": project_id, "userScale": float(user_scale)}, f)
+            os.replace(tmp, path)
+        except Exception:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            logger.warning("[IFC Models] 보관 실패: %s", project_id, exc_info=True)
+            return False
+        logger.info("[IFC Models] 보관: %s", project_id)
+        self.prune(keep=path)
+        return True
+
+    @staticmethod
+    def _touch(path: str) -> None:
+        """마지막 사용 시각 — IFC 자체의 mtime 은 재등록 감지(stamp)에 쓰므로 .json 에 기록."""
+        try:
+            os.utime(path[:-4] + ".json")
+        except OSError:
+            pass
+
+    def _scan(self) -> list[tuple[float, str, int]]:
+        """보관본 (마지막 사용 시각, IFC 경로, 크기) — 오래된 순."""
+        found = []
+        for entry in os.scandir(self.root):
+            if not entry.name.endswith(".ifc") or entry.name.startswith("."):
+                continue
+            try:
+                st = entry.stat()
+                used = max(st.st_mtime, os.path.getmtime(entry.path[:-4] + ".json"))
+            except OSError:
+                continue
+            found.append((used, entry.path, st.st_size))
+        return sorted(found)
+
+    def _remove(self, path: str) -> None:
+        meta = path[:-4] + ".json"
+        try:
+            with open(meta, encoding="utf-8") as f:
+                project_id = json.load(f).get("projectId")
+        except (OSError, ValueError):
+            project_id = None
+        for p in (path, meta):
+            try:
+                os.unlink(p)
+            except OSError:
+                pass
+        if project_id is not None:
+            with self._lock:
+                self._models.pop(project_id, None)
+        logger.info("[IFC Models] 보관본 삭제: %s", project_id or os.path.basename(path))
+
+    def prune(self, keep: Optional[str] = None) -> dict:
+        """보관 기간 경과 + 용량 상한 초과 보관본 삭제. keep 경로는 제외."""
+        if self.max_bytes <= 0 and self.ttl_sec <= 0:
+            return {"removed": 0}
+        cutoff = time.time() - self.ttl_sec if self.ttl_sec > 0 else None
+        kept, removed = [], 0
+        for used, path, size in self._scan():
+            if path != keep and cutoff is not None and used < cutoff:
+                self._remove(path)
+                removed += 1
+            else:
+                kept.append((used, path, size))
+        total = sum(size for _, _, size in kept)
+        if self.max_bytes > 0:
+            for _, path, size in kept:
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                self._remove(path)
+                removed += 1
+                total -= size
+        return {"removed": removed, "bytes": total}
+
+    def _model(self, project_id: str) -> _ResidentModel:
+        path = self._path(project_id)
+        try:
+            st = os.stat(path)
+        except OSError:
+            raise ModelNotFound(f"등록된 모델 없음: {project_id}")
+        stamp = (st.st_ino, st.st_mtime_ns)
+        self._touch(path)
+
+        with self._lock:
+            model = self._models.get(project_id)
+            if model is not None and model.stamp == stamp:
+                self._models.move_to_end(project_id)
+                self.hits += 1
+                return model
+            load_lock = self._loading.setdefault(project_id, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                model = self._models.get(project_id)
+                if model is not None and model.stamp == stamp:
+                    self.hits += 1
+                    return model
+            try:
+                model = _ResidentModel(path)
+            except OSError:
+                # stat 이후 prune 으로 보관본이 지워진 경우
+                raise ModelNotFound(f"등록된 모델 없음: {project_id}")
+            logger.info("[IFC Models] 로드: %s (%.2fs, 추정 %.0fMB)",
+                        project_id, model.load_sec, model.est_bytes / 1024 ** 2)
+            with self._lock:
+                self.loads += 1
+                self._models[project_id] = model
+                self._models.move_to_end(project_id)
+                while len(self._models) > 1 and (len(self._models) > self.max_models or
+                                                 self._resident_bytes() > self.max_resident_bytes > 0):
+                    evicted, _ = self._models.popitem(last=False)
+                    logger.info("[IFC Models] LRU 해제: %s", evicted)
+            return model
+
+    def _resident_bytes(self) -> int:
+        """상주 모델 추정 메모리 합 (_lock 보유 중 호출)."""
+        return sum(m.est_bytes for m in self._models.values())
+
+    # ── 조회 API ──────────────────────────────────────────────────────
+
+    def model_file(self, project_id: str) -> tuple[str, float]:
+        """보관된 IFC 경로와 변환 시 user_scale."""
+        path = self._path(project_id)
+        if not os.path.exists(path):
+            raise ModelNotFound(f"등록된 모델 없음: {project_id}")
+        self._touch(path)
+        try:
+            with open(path[:-4] + ".json", encoding="utf-8") as f:
+                user_scale = float(json.load(f).get("userScale", 1.0))
+        except (OSError, ValueError):
+            user_scale = 1.0
+        return path, user_scale
+
+    def element(self, project_id: str, global_id: str) -> dict:
+        return self._model(project_id).element(global_id)
+
+    def stats(self) -> dict:
+        stored = self._scan()
+        with self._lock:
+            return {
+                "resident":         list(self._models),
+                "maxModels":        self.max_models,
+                "residentBytes":    self._resident_bytes(),
+                "maxResidentBytes": self.max_resident_bytes,
+                "hits":             self.hits,
+                "loads":            self.loads,
+                "stored":           len(stored),
+                "storedBytes":      sum(size for _, _, size in stored),
+                "maxBytes":         self.max_bytes,
+                "ttlSec":           self.ttl_sec,
+            }
+
+
+_server: Optional[ModelServer] = None
+_server_lock = threading.Lock()
+
+
+def get_model_server() -> Optional[ModelServer]:
+    """설정(IFC_MODEL_DIR / IFC_RESIDENT_MODELS) 기반 전역 모델 서버. 상주 수가 0이면 비활성(None)."""
+    global _server
+    with _server_lock:
+        if _server is None:
+            from config.settings import (
+                IFC_MODEL_DIR, IFC_RESIDENT_MODELS, IFC_MODEL_MAX_BYTES, IFC_MODEL_TTL_SEC,
+                IFC_RESIDENT_MAX_MB,
+            )
+            if IFC_RESIDENT_MODELS <= 0:
+                return None
+            _server = ModelServer(IFC_MODEL_DIR, IFC_RESIDENT_MODELS, IFC_MODEL_MAX_BYTES, IFC_MODEL_TTL_SEC,
+                                  IFC_RESIDENT_MAX_MB * 1024 * 1024)
+            logger.info("[IFC Models] 저장소: %s (상주 %d개, 추정 메모리 상한 %dMB)",
+                        IFC_MODEL_DIR, IFC_RESIDENT_MODELS, IFC_RESIDENT_MAX_MB)
+        return _server
+
+
+def retain_model(project_id: str, ifc_path: str, elements: list[dict],
+                 user_scale: float = 1.0) -> bool:
+    """
+    변환 직후 호출 — IFC 를 상주 모델 저장소에 보관하고, IFC_ELEMENTS_LIGHTWEIGHT 면
+    elements 에서 조회 API 로 대체되는 상세(ifcProperties / ifcQuantities)를 제거 (in-place).
+    반환: 보관 여부 (비활성·project_id 없음이면 False, elements 유지).
+    """
+    server = get_model_server()
+    if server is None or not server.register(project_id, ifc_path, user_scale):
+        return False
+    from config.settings import IFC_ELEMENTS_LIGHTWEIGHT
+    if IFC_ELEMENTS_LIGHTWEIGHT:
+        for el in elements:
+            el.pop("ifcProperties", None)
+            el.pop("ifcQuantities", None)
+    return True
@@ -0,0 +1,240 @@
+"""
+IFC 변환 계측 — 단계별 시간 / 최대 메모리 / 느린 부재 Top-N + 프로세스 전역 메트릭
+
+변환 함수는 ConversionProfile 하나를 ctx 로 넘겨 단계마다 경과 시간을 누적한다.
+단계는 중첩 가능하며 자기 시간(self time)만 기록하므로 phases 합 ≈ 계측된 전체 시간.
+
+  open          ifcopenshell.open
+  spatial       좌표계·공간구조 추출 (_extract_geo_origin / _extract_spatial_structure)
+  relationships 재질·속성·물량 인덱스 (_build_relationship_index)
+  tessellate    create_shape / geometry iterator
+  geometry      스케일·노말·meshopt (부재별)
+  metadata      부재 속성 추출 (_element_attributes)
+  diff          증분 변환 fingerprint 비교 (ifc_incremental)
+  cache         변환 캐시 조회·저장
+  assemble      원점 이동·DTO 생성 + GlbBuilder.add_element
+  hull          lite GLB 용 convex hull 단순화
+  lod           LOD1~3 단순화
+  spill         스트리밍 1차 패스 임시 파일 기록·읽기
+  glbBuild      GlbBuilder.build / build_to
+  bvh           부재 삼각형 BVH 사이드카 생성 (ifc_bvh)
+
+slowestProducts 는 직렬 create_shape 경로(병렬 iterator 가 놓친 보충분 포함)에서만 측정된다.
+병렬 iterator 는 여러 스레드 결과가 완료 순서로 나와 부재별 시간을 알 수 없다.
+
+counters 의 meshStoreHits / meshStoreMisses / meshStoreBypass / meshStoreSavedMs 는
+공유 mesh 저장소(ifc_meshstore) 조회 결과와 히트로 건너뛴 삼각분할 시간(ms).
+
+peakRssMb 는 프로세스 최대 RSS(getrusage) — 작업 API 는 변환마다 새 자식 프로세스이므로
+변환 단위 값이고, 동기 API 는 서버 프로세스가 지금까지 찍은 최대값이다.
+
+record_conversion() 은 변환 결과 stats 를 프로세스 전역 집계(ConversionMetrics)에 더한다.
+작업 API 는 자식 프로세스가 stats 를 결과로 넘기므로 부모(JobManager)에서 기록한다.
+"""
+from __future__ import annotations
+
+import contextlib
+import heapq
+import sys
+import threading
+import time
+from typing import Optional
+
+SLOWEST_PRODUCTS = 10   # stats.profile.slowestProducts / 전역 메트릭에 남기는 부재 수
+
+
+def peak_rss_mb() -> Optional[float]:
+    """프로세스 최대 RSS (MB). resource 모듈이 없는 플랫폼(Windows)은 None."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 는 KB, macOS 는 byte 단위
+    return round(rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024, 1)
+
+
+class ConversionProfile:
+    """변환 1회의 계측값. 한 스레드에서만 사용 (변환 파이프라인은 Python 레벨에서 단일 스레드)."""
+
+    def __init__(self, enabled: bool = True, top_n: int = SLOWEST_PRODUCTS):
+        self.enabled  = enabled
+        self.top_n    = top_n
+        self.phases: dict[str, float] = {}
+        self.counters: dict[str, int] = {}
+        self._stack: list[float] = []            # 진행 중인 단계별 하위 단계 누적 시간
+        self._slowest: list[tuple] = []          # min-heap (sec, expressId, info)
+        self._t0 = time.perf_counter()
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        if not self.enabled:
+            yield
+            return
+        t0 = time.perf_counter()
+        self._stack.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - t0
+            child = self._stack.pop()
+            self.phases[name] = self.phases.get(name, 0.0) + elapsed - child
+            if self._stack:
+                self._stack[-1] += elapsed
+
+    def count(self, name: str, n: int = 1) -> None:
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def product(self, product, sec: float, triangles: int = 0) -> None:
+        """부재 1건의 삼각분할 시간 — 상위 top_n 에 들 때만 속성을 읽는다."""
+        if not self.enabled or self.top_n <= 0:
+            return
+        if len(self._slowest) >= self.top_n and sec <= self._slowest[0][0]:
+            return
+        info = {
+            "expressId": product.id(),
+            "globalId":  getattr(product, "GlobalId", None),
+            "ifcType":   product.is_a(),
+            "ifcName":   getattr(product, "Name", None),
+            "triangles": int(triangles),
+        }
+        entry = (sec, info["expressId"], info)
+        if len(self._slowest) < self.top_n:
+            heapq.heappush(self._slowest, entry)
+        else:
+            heapq.heapreplace(self._slowest, entry)
+
+    def to_dict(self) -> dict:
+        return {
+            "wallSec":         round(time.perf_counter() - self._t0, 3),
+            "phases":          {k: round(v, 4) for k, v in self.phases.items()},
+            "counters":        dict(self.counters),
+            "peakRssMb":       peak_rss_mb(),
+            "slowestProducts": [
+                {**info, "sec": round(sec, 4)}
+                for sec, _, info in sorted(self._slowest, key=lambda e: -e[0])
+            ],
+        }
+
+
+NULL_PROFILE = ConversionProfile(enabled=False)
+
+
+# ── 프로세스 전역 메트릭 ──────────────────────────────────────────────
+
+class ConversionMetrics:
+    """변환 stats.profile 누적 (단계별 시간·카운터 합, 부재·삼각형 수, 최대 RSS, 전체 중 느린 부재)."""
+
+    def __init__(self, top_n: int = SLOWEST_PRODUCTS):
+        self.top_n = top_n
+        self._lock = threading.Lock()
+        self.conversions: dict[str, int] = {}
+        self.failures: dict[str, int] = {}
+        self.phase_sec: dict[str, float] = {}
+        self.wall_sec = 0.0
+        self.elements = 0
+        self.triangles = 0
+        self.cache_hits = 0
+        self.counters: dict[str, int] = {}
+        self.max_peak_rss_mb = 0.0
+        self.last: Optional[dict] = None
+        self._slowest: list[tuple] = []
+
+    def record(self, stats: dict, mode: str = "sync") -> None:
+        profile = stats.get("profile") or {}
+        with self._lock:
+            self.conversions[mode] = self.conversions.get(mode, 0) + 1
+            for name, sec in profile.get("phases", {}).items():
+                self.phase_sec[name] = self.phase_sec.get(name, 0.0) + sec
+            self.wall_sec += profile.get("wallSec", 0.0)
+            self.elements += int(stats.get("elements", 0))
+            self.triangles += int(stats.get("triangles", 0))
+            self.cache_hits += int(bool(stats.get("cacheHit")))
+            for name, n in profile.get("counters", {}).items():
+                self.counters[name] = self.counters.get(name, 0) + n
+            if profile.get("peakRssMb"):
+                self.max_peak_rss_mb = max(self.max_peak_rss_mb, profile["peakRssMb"])
+            for p in profile.get("slowestProducts", []):
+                entry = (p["sec"], id(p), p)
+                if len(self._slowest) < self.top_n:
+                    heapq.heappush(self._slowest, entry)
+                elif p["sec"] > self._slowest[0][0]:
+                    heapq.heapreplace(self._slowest, entry)
+            self.last = {"mode": mode, "finishedAt": time.time(), "elements": stats.get("elements"),
+                         "triangles": stats.get("triangles"), **profile}
+
+    def record_failure(self, mode: str = "sync") -> None:
+        with self._lock:
+            self.failures[mode] = self.failures.get(mode, 0) + 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "conversions":     dict(self.conversions),
+                "failures":        dict(self.failures),
+                "phaseSec":        {k: round(v, 3) for k, v in self.phase_sec.items()},
+                "wallSec":         round(self.wall_sec, 3),
+                "elements":        self.elements,
+                "triangles":       self.triangles,
+                "cacheHits":       self.cache_hits,
+                "counters":        dict(self.counters),
+                "maxPeakRssMb":    self.max_peak_rss_mb,
+                "slowestProducts": [p for _, _, p in sorted(self._slowest, key=lambda e: -e[0])],
+                "last":            self.last,
+            }
+
+    def prometheus(self) -> str:
+        """Prometheus text exposition (클라이언트 라이브러리 없이 직접 작성)."""
+        snap = self.snapshot()
+        lines = [
+            "# HELP ifc_conversions_total IFC conversions completed.",
+            "# TYPE ifc_conversions_total counter",
+            *(f'ifc_conversions_total{{mode="{m}"}} {n}' for m, n in sorted(snap["conversions"].items())),
+            "# HELP ifc_conversion_failures_total IFC conversions failed.",
+            "# TYPE ifc_conversion_failures_total counter",
+            *(f'ifc_conversion_failures_total{{mode="{m}"}} {n}' for m, n in sorted(snap["failures"].items())),
+            "# HELP ifc_conversion_phase_seconds_total Self time spent per conversion phase.",
+            "# TYPE ifc_conversion_phase_seconds_total counter",
+            *(f'ifc_conversion_phase_seconds_total{{phase="{p}"}} {s}' for p, s in sorted(snap["phaseSec"].items())),
+            "# HELP ifc_conversion_seconds_total Wall time of profiled conversions.",
+            "# TYPE ifc_conversion_seconds_total counter",
+            f"ifc_conversion_seconds_total {snap['wallSec']}",
+            "# HELP ifc_conversion_elements_total Elements converted.",
+            "# TYPE ifc_conversion_elements_total counter",
+            f"ifc_conversion_elements_total {snap['elements']}",
+            "# HELP ifc_conversion_triangles_total Triangles written to full GLBs.",
+            "# TYPE ifc_conversion_triangles_total counter",
+            f"ifc_conversion_triangles_total {snap['triangles']}",
+            "# HELP ifc_conversion_cache_hits_total Conversions served from the tessellation cache.",
+            "# TYPE ifc_conversion_cache_hits_total counter",
+            f"ifc_conversion_cache_hits_total {snap['cacheHits']}",
+            "# HELP ifc_mesh_store_lookups_total Shared mesh store lookups by result.",
+            "# TYPE ifc_mesh_store_lookups_total counter",
+            *(f'ifc_mesh_store_lookups_total{{result="{r}"}} {snap["counters"].get(c, 0)}'
+              for r, c in (("hit", "meshStoreHits"), ("miss", "meshStoreMisses"), ("bypass", "meshStoreBypass"))),
+            "# HELP ifc_mesh_store_saved_seconds_total Tessellation time skipped by shared mesh store hits.",
+            "# TYPE ifc_mesh_store_saved_seconds_total counter",
+            f"ifc_mesh_store_saved_seconds_total {snap['counters'].get('meshStoreSavedMs', 0) / 1000}",
+            "# HELP ifc_conversion_peak_rss_megabytes Largest peak RSS reported by a conversion.",
+            "# TYPE ifc_conversion_peak_rss_megabytes gauge",
+            f"ifc_conversion_peak_rss_megabytes {snap['maxPeakRssMb']}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+_metrics: Optional[ConversionMetrics] = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> ConversionMetrics:
+    """프로세스 전역 변환 메트릭."""
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = ConversionMetrics()
+        return _metrics
+
+
+def record_conversion(stats: dict, mode: str = "sync") -> None:
+    get_metrics().record(stats, mode)
@@ -0,0 +1,100 @@
+"""
+IFC 공간 타일 분할 — 층별 + 옥트리
+
+단일 GLB 는 부재 20만 개급 모델에서 버퍼 하나가 수 GB 가 되고, 뷰어는 보이지 않는
+층까지 전부 받아야 한다. tiles 모드는 부재를 층(_extract_spatial_structure 결과)으로 먼저
+나누고, 층 안에서 다시 옥트리로 쪼개 타일마다 GLB 하나를 만든다.
+
+  plan_tiles     — 부재 bbox 만으로 타일 배치 결정 (형상 데이터 불필요)
+  tile_manifest  — 타일 bounds / 부재 범위 / GLB ID 를 담은 JSON 매니페스트
+
+부재 목록(elements)은 타일 순서로 정렬되어, 타일 i 의 부재는
+elements[elementStart : elementStart + elementCount] 이다.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+MAX_TILE_ELEMENTS = 2000   # 이보다 많으면 옥트리로 분할
+MAX_DEPTH = 6              # 옥트리 최대 깊이 (같은 위치에 몰린 부재가 무한 분할되지 않도록)
+_UNCLASSIFIED = "미분류"
+
+
+def _octree(centers: np.ndarray, members: np.ndarray, lo: np.ndarray, hi: np.ndarray,
+            max_elements: int, depth: int, path: str, out: list[tuple[str, np.ndarray]]) -> None:
+    """members(부재 인덱스)를 중심점 기준 8분할. 잎 노드만 (경로, 부재) 로 out 에 추가."""
+    if len(members) <= max_elements or depth >= MAX_DEPTH:
+        out.append((path, members))
+        return
+    mid = (lo + hi) / 2.0
+    upper = centers[members] >= mid                          # (n, 3) bool
+    octant = upper[:, 0] * 1 + upper[:, 1] * 2 + upper[:, 2] * 4
+    for o in range(8):
+        child = members[octant == o]
+        if len(child) == 0:
+            continue
+        bits = np.array([o & 1, o & 2, o & 4], dtype=bool)
+        c_lo = np.where(bits, mid, lo)
+        c_hi = np.where(bits, hi, mid)
+        _octree(centers, child, c_lo, c_hi, max_elements, depth + 1, path + str(o), out)
+
+
+def plan_tiles(geoms: list[dict], storeys: list[dict], origin: tuple[float, float, float],
+               max_elements: int = MAX_TILE_ELEMENTS) -> list[dict]:
+    """
+    부재(tessellate_ifc 의 geoms) → 타일 목록.
+
+    반환: [{tileId, storey, building, members: list[int], bboxMin, bboxMax}]
+      members 는 geoms 인덱스 (원래 순서 유지), bbox 는 origin 이동 후 장면 좌표(Z-up).
+    층 순서는 storeys(건물·표고 정렬) 를 따르고 층 미지정 부재는 마지막 타일들.
+    """
+    if not geoms:
+        return []
+    shift = np.asarray(origin, dtype=np.float64)
+    bmin = np.array([g["bbox_min"] for g in geoms], dtype=np.float64) - shift
+    bmax = np.array([g["bbox_max"] for g in geoms], dtype=np.float64) - shift
+    centers = (bmin + bmax) / 2.0
+
+    storey_order = {(s["building"], s["name"]): i for i, s in enumerate(storeys)}
+    groups: dict[tuple, list[int]] = {}
+    for i, g in enumerate(geoms):
+        spatial = g["spatial"]
+        groups.setdefault((spatial.get("building"), spatial.get("storey")), []).append(i)
+
+    def _order(key: tuple) -> tuple:
+        return (key not in storey_order, storey_order.get(key, 0), str(key[0]), str(key[1]))
+
+    tiles: list[dict] = []
+    for s_idx, key in enumerate(sorted(groups, key=_order)):
+        members = np.array(groups[key], dtype=np.intp)
+        leaves: list[tuple[str, np.ndarray]] = []
+        _octree(centers, members, bmin[members].min(axis=0), bmax[members].max(axis=0),
+                max_elements, 0, "", leaves)
+        building, storey = key
+        for path, leaf in leaves:
+            tiles.append({
+                "tileId":   f"s{s_idx:03d}" + (f"-{path}" if path else ""),
+                "storey":   storey or _UNCLASSIFIED,
+                "building": building or _UNCLASSIFIED,
+                "members":  leaf.tolist(),
+                "bboxMin":  [round(float(v), 4) for v in bmin[leaf].min(axis=0)],
+                "bboxMax":  [round(float(v), 4) for v in bmax[leaf].max(axis=0)],
+            })
+    return tiles
+
+
+def tile_manifest(tiles: list[dict], geo_origin: dict) -> dict:
+    """plan_tiles 결과(elementStart / elementCount / glbId / triangles 가 채워진) → 매니페스트."""
+    keys = ("tileId", "storey", "building", "bboxMin", "bboxMax",
+            "elementStart", "elementCount", "triangles", "glbId")
+    entries = [{k: t[k] for k in keys} for t in tiles]
+    manifest = {
+        "version":   1,
+        "upAxis":    "Z",
+        "geoOrigin": geo_origin,
+        "tiles":     entries,
+    }
+    if entries:
+        manifest["bboxMin"] = np.min([t["bboxMin"] for t in entries], axis=0).tolist()
+        manifest["bboxMax"] = np.max([t["bboxMax"] for t in entries], axis=0).tolist()
+    return manifest
@@ -0,0 +1,187 @@
+"""
+IFC 재개 가능(resumable) 청크 업로드
+
+수백 MB 급 IFC 를 multipart 한 번으로 올리면 서버가 전체 바이트를 메모리에 들고
+다시 임시 파일로 쓰게 된다. 이 모듈은 업로드를 디스크에 바로 이어 쓰고,
+완료 시 파일 경로를 그대로 변환 작업(ifc_jobs)에 넘긴다.
+
+프로토콜:
+  1. create(filename, size)           → upload_id
+  2. begin_append(upload_id, offset) → 이어 쓰기 → end_append(upload_id)
+     offset 은 현재 기록된 크기와 같아야 함 (다르면 OffsetMismatch)
+     연결이 끊기면 status() 로 offset 을 확인하고 그 지점부터 다시 전송
+  3. finish(upload_id)                 → 완성된 파일 경로 (size 와 일치해야 함)
+     전송 중이거나 이미 완료 처리 중인 업로드는 UploadBusy(409). 완료 처리는 discard(성공) 또는
+     release(변환 작업 제출 실패 → 나중에 재시도)로 끝낸다.
+
+디렉터리 구조:
+  {root}/{upload_id}.part   — 기록 중인 데이터
+  {root}/{upload_id}.json   — filename / size / createdAt
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+
+class UploadError(Exception):
+    """잘못된 업로드 요청 (API 에서 4xx 로 응답)."""
+
+    status_code = 400
+
+
+class UploadNotFound(UploadError):
+    status_code = 404
+
+
+class UploadBusy(UploadError):
+    """전송 중이거나 완료 처리 중인 업로드에 대한 충돌 요청."""
+
+    status_code = 409
+
+
+class OffsetMismatch(UploadError):
+    """요청 offset 이 서버에 기록된 크기와 다름 — 클라이언트는 status() 의 offset 부터 재전송."""
+
+    status_code = 409
+
+    def __init__(self, expected: int):
+        super().__init__(f"offset 불일치 (현재 {expected} bytes)")
+        self.expected = expected
+
+
+class UploadStore:
+    """디스크 기반 청크 업로드 저장소."""
+
+    def __init__(self, root: str, max_bytes: int, ttl_sec: int = 24 * 3600):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.ttl_sec = ttl_sec
+        self._lock = threading.Lock()
+        self._busy: set[str] = set()         # append 중인 업로드 — 같은 업로드 동시 쓰기 방지
+        self._completing: set[str] = set()   # finish 로 넘겨진 업로드 — 중복 완료·완료 중 쓰기 방지
+        os.makedirs(root, exist_ok=True)
+
+    def _paths(self, upload_id: str) -> tuple[str, str]:
+        if not _ID_RE.match(upload_id or ""):
+            raise UploadNotFound("upload not found")
+        base = os.path.join(self.root, upload_id)
+        return base + ".part", base + ".json"
+
+    def _meta(self, upload_id: str) -> dict:
+        part, meta_path = self._paths(upload_id)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            raise UploadNotFound("upload not found")
+        meta["offset"] = os.path.getsize(part) if os.path.exists(part) else 0
+        return meta
+
+    # ── 공개 API ──────────────────────────────────────────────────────
+
+    def create(self, filename: str, size: int) -> dict:
+        if size <= 0:
+            raise UploadError("size 는 1 이상이어야 합니다")
+        if size > self.max_bytes:
+            raise UploadError(f"파일이 너무 큽니다 (최대 {self.max_bytes} bytes)")
+        self.cleanup()
+        upload_id = uuid.uuid4().hex
+        part, meta_path = self._paths(upload_id)
+        open(part, "wb").close()
+        meta = {"uploadId": upload_id, "filename": filename, "size": size, "createdAt": time.time()}
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        logger.info("[IFC Upload] 생성: %s (%s, %d bytes)", upload_id, filename, size)
+        return {**meta, "offset": 0}
+
+    def status(self, upload_id: str) -> dict:
+        return self._meta(upload_id)
+
+    def begin_append(self, upload_id: str, offset: int) -> tuple[str, int]:
+        """쓰기 시작 — (part 경로, 허용 최대 바이트 수). 끝나면 반드시 end_append 호출."""
+        meta = self._meta(upload_id)
+        with self._lock:
+            if upload_id in self._busy:
+                raise UploadBusy("같은 업로드에 대한 전송이 이미 진행 중입니다")
+            if upload_id in self._completing:
+                raise UploadBusy("이미 완료 처리 중인 업로드입니다")
+            if offset != meta["offset"]:
+                raise OffsetMismatch(meta["offset"])
+            self._busy.add(upload_id)
+        return self._paths(upload_id)[0], meta["size"] - offset
+
+    def end_append(self, upload_id: str) -> dict:
+        with self._lock:
+            self._busy.discard(upload_id)
+        return self._meta(upload_id)
+
+    def finish(self, upload_id: str) -> str:
+        """완성된 업로드의 .part 경로를 넘기고 완료 처리 중으로 표시.
+        크기가 선언값과 다르면 OffsetMismatch, 전송·완료 처리 중이면 UploadBusy."""
+        with self._lock:
+            if upload_id in self._completing:
+                raise UploadBusy("이미 완료 처리 중인 업로드입니다")
+            if upload_id in self._busy:
+                raise UploadBusy("전송이 아직 진행 중입니다")
+            meta = self._meta(upload_id)
+            if meta["offset"] != meta["size"]:
+                raise OffsetMismatch(meta["offset"])
+            self._completing.add(upload_id)
+        return self._paths(upload_id)[0]
+
+    def release(self, upload_id: str) -> None:
+        """finish 취소 — .part 를 되돌려 둔 뒤 호출하면 다시 complete 할 수 있다."""
+        with self._lock:
+            self._completing.discard(upload_id)
+
+    def discard(self, upload_id: str) -> None:
+        for p in self._paths(upload_id):
+            try:
+                os.unlink(p)
+            except OSError:
+                pass
+        with self._lock:
+            self._completing.discard(upload_id)
+
+    def cleanup(self) -> int:
+        """ttl_sec 동안 갱신되지 않은 업로드 삭제. 반환: 삭제 수."""
+        now = time.time()
+        removed = 0
+        for name in os.listdir(self.root):
+            upload_id, ext = os.path.splitext(name)
+            if (ext != ".json" or not _ID_RE.match(upload_id)
+                    or upload_id in self._busy or upload_id in self._completing):
+                continue
+            paths = [p for p in self._paths(upload_id) if os.path.exists(p)]
+            if paths and now - max(os.path.getmtime(p) for p in paths) > self.ttl_sec:
+                self.discard(upload_id)
+                removed += 1
+        if removed:
+            logger.info("[IFC Upload] 만료 업로드 %d건 삭제", removed)
+        return removed
+
+
+_store: Optional[UploadStore] = None
+_store_lock = threading.Lock()
+
+
+def get_upload_store() -> UploadStore:
+    """설정(IFC_UPLOAD_*) 기반 전역 업로드 저장소."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            from config.settings import IFC_UPLOAD_DIR, IFC_UPLOAD_MAX_MB, IFC_UPLOAD_TTL_SEC
+            _store = UploadStore(IFC_UPLOAD_DIR, IFC_UPLOAD_MAX_MB * 1024 * 1024, IFC_UPLOAD_TTL_SEC)
+            logger.info("[IFC Upload] 저장소: %s (최대 %dMB)", IFC_UPLOAD_DIR, IFC_UPLOAD_MAX_MB)
+        return _store
@@ -20,6 +20,7 @@ def _system(state: AgentState) -> str:
         "  - get_test_tab_guide  : 테스트 탭 전반 사용 안내",
         "  - get_keyboard_controls: 키보드 단축키·조작법 안내",
         "  - get_collision_log   : 충돌 감지 이력 조회",
+        "  - detect_bim_clashes  : BIM 모델 부재 간 간섭(관통·근접) 서버 검출 (project_id 필요)",
     ]
     note = lang_instruction(lang)
     if note:
@@ -32,9 +33,11 @@ def _finalize(state: AgentState) -> dict:
 
 
 def _make_subgraph():
-    from tools.test_tools import get_test_tab_guide, get_keyboard_controls, get_collision_log
+    from tools.test_tools import (
+        get_test_tab_guide, get_keyboard_controls, get_collision_log, detect_bim_clashes,
+    )
     return build_react_subgraph(
-        tools=[get_test_tab_guide, get_keyboard_controls, get_collision_log],
+        tools=[get_test_tab_guide, get_keyboard_controls, get_collision_log, detect_bim_clashes],
         system_fn=_system,
         finalize_fn=_finalize,
     )
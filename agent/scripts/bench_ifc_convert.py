@@ -0,0 +1,442 @@
+"""
+IFC 변환 성능 벤치마크 — 합성 IFC 코퍼스 + 모드별 시간 / 최대 RSS / 산출물 크기
+
+고객 모델 대신 ifcopenshell 저작 API 로 만든 재현 가능한 파라메트릭 IFC 를 입력으로 쓴다.
+(GlobalId 도 순번 기반이라 같은 인자면 같은 파일)
+
+  typed    타입 + RepresentationMap 공유 기둥·보 격자 (반복 형상 → 인스턴싱 효과)
+  curtain  층별 외곽 커튼월 — 패널(IfcPlate)·멀리언(IfcMember) 을 커튼월에 집계
+  deep     대지 → 건물 N개 → 층 → 실(IfcSpace) 깊은 공간 트리, 부재 절반은 실에 포함
+
+변환은 convert_ifc_to_glb 를 (모델 × 모드)마다 새 프로세스(spawn)에서 실행해
+최대 RSS 가 실행 단위로 분리되게 하고, 변환 캐시는 쓰지 않는다.
+결과 JSON 을 --baseline 으로 넘기면 같은 (모델, 모드) 끼리 증감률을 출력한다.
+
+Run: python scripts/bench_ifc_convert.py [--profiles typed,curtain,deep] [--sizes 1k,10k,50k,200k]
+                                         [--modes nodes,instanced,merged,quantized,optimized]
+                                         [--workers 0] [--out bench.json] [--baseline old.json]
+"""
+import sys
+import os
+import json
+import math
+import time
+import argparse
+import platform
+import tempfile
+import multiprocessing as mp
+import queue
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MODES = {
+    "nodes":     {"instancing": False},
+    "instanced": {"instancing": True},
+    "merged":    {"instancing": False, "output_mode": "merged"},
+    "quantized": {"instancing": True, "quantize": True},
+    "optimized": {"instancing": True, "optimize": True},
+}
+
+STOREY_HEIGHT = 3.6
+
+
+# ── 합성 IFC 생성 ─────────────────────────────────────────────────────
+
+def _assign(usecase: str, model, products: list, **kwargs) -> None:
+    """ifcopenshell.api 0.8+ (products=[...]) / 0.7 (product=...) 호환."""
+    import ifcopenshell.api
+    try:
+        ifcopenshell.api.run(usecase, model, products=products, **kwargs)
+    except TypeError:
+        for p in products:
+            ifcopenshell.api.run(usecase, model, product=p, **kwargs)
+
+
+class _ModelBuilder:
+    """프로젝트·단위·컨텍스트·공간 구조는 저작 API, 대량 부재는 엔티티 직접 생성 (API 호출당 비용 회피)."""
+
+    def __init__(self, name: str):
+        import ifcopenshell
+        import ifcopenshell.api
+
+        self._n_guid = 0
+        self.model = ifcopenshell.file(schema="IFC4")
+        self.project = ifcopenshell.api.run("root.create_entity", self.model, ifc_class="IfcProject", name=name)
+        self._fix_guid(self.project)
+        # 미터 단위 (assign_unit 기본값은 버전에 따라 mm)
+        ifcopenshell.api.run("unit.assign_unit", self.model, length={"is_metric": True, "raw": "METERS"})
+        model_ctx = ifcopenshell.api.run("context.add_context", self.model, context_type="Model")
+        self.body = ifcopenshell.api.run("context.add_context", self.model, context_type="Model",
+                                         context_identifier="Body", target_view="MODEL_VIEW", parent=model_ctx)
+        self.z_axis = self.model.createIfcDirection((0.0, 0.0, 1.0))
+        self.identity = self.model.createIfcCartesianTransformationOperator3D(
+            None, None, self.model.createIfcCartesianPoint((0.0, 0.0, 0.0)), None, None)
+        self._contained: dict = {}     # 공간 구조 → 부재 목록
+        self._typed: dict = {}         # 타입 → 부재 목록
+        self._aggregated: dict = {}    # 부모 부재 → 부분 부재 목록
+        self.count = 0
+
+    def _guid(self) -> str:
+        import ifcopenshell.guid
+        self._n_guid += 1
+        return ifcopenshell.guid.compress(f"{self._n_guid:032x}")
+
+    def _fix_guid(self, entity) -> None:
+        entity.GlobalId = self._guid()
+
+    # ── 공간 구조 (저작 API) ──────────────────────────────────────────
+
+    def spatial(self, ifc_class: str, name: str, parent, z: float = 0.0, **attrs):
+        import ifcopenshell.api
+        entity = ifcopenshell.api.run("root.create_entity", self.model, ifc_class=ifc_class, name=name)
+        self._fix_guid(entity)
+        for k, v in attrs.items():
+            setattr(entity, k, v)
+        _assign("aggregate.assign_object", self.model, [entity], relating_object=parent)
+        rel_to = getattr(parent, "ObjectPlacement", None)
+        entity.ObjectPlacement = self.placement(rel_to, 0.0, 0.0, z)
+        return entity
+
+    # ── 형상 ──────────────────────────────────────────────────────────
+
+    def placement(self, rel_to, x: float, y: float, z: float, angle: float = 0.0):
+        m = self.model
+        axis = m.createIfcAxis2Placement3D(
+            m.createIfcCartesianPoint((float(x), float(y), float(z))), self.z_axis,
+            m.createIfcDirection((math.cos(angle), math.sin(angle), 0.0)))
+        return m.createIfcLocalPlacement(rel_to, axis)
+
+    def box(self, w: float, d: float, h: float, x: float = 0.0, y: float = 0.0):
+        m = self.model
+        profile = m.createIfcRectangleProfileDef(
+            "AREA", None, m.createIfcAxis2Placement2D(m.createIfcCartesianPoint((float(x), float(y)))),
+            float(w), float(d))
+        return m.createIfcExtrudedAreaSolid(
+            profile, m.createIfcAxis2Placement3D(m.createIfcCartesianPoint((0.0, 0.0, 0.0))),
+            self.z_axis, float(h))
+
+    def shape(self, items: list, rep_type: str = "SweptSolid"):
+        m = self.model
+        rep = m.createIfcShapeRepresentation(self.body, "Body", rep_type, items)
+        return m.createIfcProductDefinitionShape(None, None, [rep])
+
+    def element_type(self, ifc_class: str, name: str, solid):
+        """타입 + RepresentationMap — 같은 타입 부재는 MappedItem 으로 형상 공유."""
+        import ifcopenshell.api
+        m = self.model
+        type_entity = ifcopenshell.api.run("root.create_entity", m, ifc_class=ifc_class, name=name)
+        self._fix_guid(type_entity)
+        rep = m.createIfcShapeRepresentation(self.body, "Body", "SweptSolid", [solid])
+        rmap = m.createIfcRepresentationMap(
+            m.createIfcAxis2Placement3D(m.createIfcCartesianPoint((0.0, 0.0, 0.0))), rep)
+        type_entity.RepresentationMaps = [rmap]
+        return type_entity
+
+    def element(self, ifc_class: str, name: str, container, placement, shape=None, type_entity=None,
+                parent=None):
+        if type_entity is not None and shape is None:
+            item = self.model.createIfcMappedItem(type_entity.RepresentationMaps[0], self.identity)
+            shape = self.shape([item], "MappedRepresentation")
+        entity = self.model.create_entity(ifc_class, GlobalId=self._guid(), Name=name,
+                                          ObjectPlacement=placement, Representation=shape)
+        if type_entity is not None:
+            self._typed.setdefault(type_entity, []).append(entity)
+        if parent is not None:
+            self._aggregated.setdefault(parent, []).append(entity)
+        elif container is not None:
+            self._contained.setdefault(container, []).append(entity)
+        self.count += 1
+        return entity
+
+    def write(self, path: str) -> None:
+        m = self.model
+        for type_entity, objects in self._typed.items():
+            m.createIfcRelDefinesByType(self._guid(), None, None, None, objects, type_entity)
+        for parent, parts in self._aggregated.items():
+            m.createIfcRelAggregates(self._guid(), None, None, None, parent, parts)
+        for container, elements in self._contained.items():
+            m.createIfcRelContainedInSpatialStructure(self._guid(), None, None, None, elements, container)
+        m.write(path)
+
+
+def _storeys(b: _ModelBuilder, building, count: int) -> list:
+    # 1층 이름을 "1F" 로 두어 지상층 원점 탐색 경로도 함께 측정
+    return [b.spatial("IfcBuildingStorey", f"{i + 1}F", building, z=i * STOREY_HEIGHT,
+                      Elevation=i * STOREY_HEIGHT) for i in range(count)]
+
+
+def _site_building(b: _ModelBuilder, n_buildings: int = 1) -> list:
+    site = b.spatial("IfcSite", "Site", b.project)
+    return [b.spatial("IfcBuilding", f"Building {i + 1}", site) for i in range(n_buildings)]
+
+
+def generate_typed(n: int, path: str) -> int:
+    """기둥 격자 k×k + 보 2k(k-1) + 슬래브·외벽 4 ≈ 층당 1000 부재."""
+    b = _ModelBuilder(f"typed-{n}")
+    per_storey = min(n, 1000)
+    k = max(2, int(math.sqrt(per_storey / 3)))
+    span = 6.0
+    building, = _site_building(b)
+    col_t = b.element_type("IfcColumnType", "C-400", b.box(0.4, 0.4, STOREY_HEIGHT - 0.5))
+    beam_x = b.element_type("IfcBeamType", "B-X", b.box(span, 0.3, 0.5, x=span / 2))
+    beam_y = b.element_type("IfcBeamType", "B-Y", b.box(0.3, span, 0.5, y=span / 2))
+    extent = span * (k - 1)
+    for s_i, storey in enumerate(_storeys(b, building, math.ceil(n / per_storey))):
+        sp = storey.ObjectPlacement
+        b.element("IfcSlab", "Slab", storey, b.placement(sp, 0, 0, -0.25),
+                  b.shape([b.box(extent + 1, extent + 1, 0.25, x=extent / 2, y=extent / 2)]))
+        for w_i, (x, y, w, d) in enumerate([(extent / 2, -0.5, extent + 1, 0.2),
+                                            (extent / 2, extent + 0.5, extent + 1, 0.2),
+                                            (-0.5, extent / 2, 0.2, extent + 1),
+                                            (extent + 0.5, extent / 2, 0.2, extent + 1)]):
+            b.element("IfcWall", f"W{w_i}", storey, b.placement(sp, 0, 0, 0),
+                      b.shape([b.box(w, d, STOREY_HEIGHT - 0.5, x=x, y=y)]))
+        for i in range(k):
+            for j in range(k):
+                if b.count >= n:
+                    break
+                b.element("IfcColumn", f"C{i}-{j}", storey, b.placement(sp, i * span, j * span, 0),
+                          type_entity=col_t)
+                if i < k - 1:
+                    b.element("IfcBeam", f"BX{i}-{j}", storey,
+                              b.placement(sp, i * span, j * span, STOREY_HEIGHT - 0.5), type_entity=beam_x)
+                if j < k - 1:
+                    b.element("IfcBeam", f"BY{i}-{j}", storey,
+                              b.placement(sp, i * span, j * span, STOREY_HEIGHT - 0.5), type_entity=beam_y)
+    b.write(path)
+    return b.count
+
+
+def generate_curtain(n: int, path: str) -> int:
+    """층별 외곽 4면 커튼월, 패널 1.5m 마다 IfcPlate + 멀리언 IfcMember (타입 공유)."""
+    b = _ModelBuilder(f"curtain-{n}")
+    panel_w = 1.5
+    per_side = max(4, min(60, n // 40))
+    side = per_side * panel_w
+    building, = _site_building(b)
+    panel_t = b.element_type("IfcPlateType", "Glass", b.box(panel_w - 0.05, 0.02, STOREY_HEIGHT - 0.1,
+                                                             x=panel_w / 2))
+    mullion_t = b.element_type("IfcMemberType", "Mullion", b.box(0.05, 0.15, STOREY_HEIGHT))
+    per_storey = 4 * (1 + 2 * per_side)
+    for storey in _storeys(b, building, max(1, math.ceil(n / per_storey))):
+        sp = storey.ObjectPlacement
+        for f_i, angle in enumerate((0.0, math.pi / 2, math.pi, 3 * math.pi / 2)):
+            if b.count >= n:
+                break
+            ox, oy = [(0, 0), (side, 0), (side, side), (0, side)][f_i]
+            cw_place = b.placement(sp, ox, oy, 0, angle)
+            cw = b.element("IfcCurtainWall", f"CW{f_i}", storey, cw_place)
+            for p_i in range(per_side):
+                b.element("IfcPlate", f"P{p_i}", None, b.placement(cw_place, p_i * panel_w, 0, 0.05),
+                          type_entity=panel_t, parent=cw)
+                b.element("IfcMember", f"M{p_i}", None, b.placement(cw_place, p_i * panel_w, 0, 0),
+                          type_entity=mullion_t, parent=cw)
+    b.write(path)
+    return b.count
+
+
+def generate_deep(n: int, path: str) -> int:
+    """건물 4개 × 층 × 실 8개, 실마다 벽 4 + 기둥 4 — 부재 절반은 층, 절반은 실에 포함."""
+    b = _ModelBuilder(f"deep-{n}")
+    rooms, room = 8, 5.0
+    per_storey = rooms * 8
+    storeys_total = max(1, math.ceil(n / per_storey))
+    buildings = _site_building(b, 4)
+    col_t = b.element_type("IfcColumnType", "C-300", b.box(0.3, 0.3, STOREY_HEIGHT))
+    for b_i, building in enumerate(buildings):
+        building.ObjectPlacement = b.placement(building.ObjectPlacement.PlacementRelTo, b_i * 60.0, 0, 0)
+        for storey in _storeys(b, building, math.ceil(storeys_total / len(buildings))):
+            for r_i in range(rooms):
+                if b.count >= n:
+                    break
+                space = b.spatial("IfcSpace", f"Room {r_i + 1}", storey)
+                space.ObjectPlacement = b.placement(storey.ObjectPlacement, (r_i % 4) * room,
+                                                    (r_i // 4) * room, 0)
+                sp = space.ObjectPlacement
+                for w_i, (x, y, w, d) in enumerate([(room / 2, 0, room, 0.15), (room / 2, room, room, 0.15),
+                                                    (0, room / 2, 0.15, room), (room, room / 2, 0.15, room)]):
+                    b.element("IfcWall", f"W{w_i}", space if w_i % 2 else storey, b.placement(sp, 0, 0, 0),
+                              b.shape([b.box(w, d, STOREY_HEIGHT, x=x, y=y)]))
+                for c_i, (x, y) in enumerate([(0, 0), (room, 0), (0, room), (room, room)]):
+                    b.element("IfcColumn", f"C{c_i}", space if c_i % 2 else storey,
+                              b.placement(sp, x, y, 0), type_entity=col_t)
+    b.write(path)
+    return b.count
+
+
+PROFILES = {"typed": generate_typed, "curtain": generate_curtain, "deep": generate_deep}
+
+
+def corpus_path(corpus_dir: str, profile: str, n: int, regenerate: bool = False) -> tuple[str, int]:
+    """(IFC 경로, 부재 수) — 이미 있으면 재사용."""
+    os.makedirs(corpus_dir, exist_ok=True)
+    path = os.path.join(corpus_dir, f"{profile}-{n}.ifc")
+    meta = path + ".json"
+    if not regenerate and os.path.exists(path) and os.path.exists(meta):
+        with open(meta) as f:
+            return path, json.load(f)["elements"]
+    t0 = time.perf_counter()
+    count = PROFILES[profile](n, path)
+    with open(meta, "w") as f:
+        json.dump({"elements": count}, f)
+    print(f"  generated {os.path.basename(path)}: {count:,} elements, "
+          f"{os.path.getsize(path) / 1e6:.1f}MB ({time.perf_counter() - t0:.1f}s)")
+    return path, count
+
+
+# ── 변환 실행 (실행마다 새 프로세스) ──────────────────────────────────
+
+def _convert_child(path: str, mode: str, workers: int, out) -> None:
+    import resource
+    from ifc_converter import convert_ifc_to_glb
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        t0 = time.perf_counter()
+        result = convert_ifc_to_glb(data, num_workers=workers, **MODES[mode])
+        sec = time.perf_counter() - t0
+        stats = result["stats"]
+        out.put({
+            "sec":          round(sec, 3),
+            "peakRssMb":    round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            "glbBytes":     len(result["glb_bytes"]),
+            "glbLiteBytes": len(result["glb_lite_bytes"]),
+            "elements":     stats["elements"],
+            "meshes":       stats["meshes"],
+            "triangles":    stats.get("triangles"),
+            "phases":       stats.get("profile", {}).get("phases", {}),
+        })
+    except Exception as e:
+        out.put({"error": f"{type(e).__name__}: {e}"})
+
+
+def run_once(path: str, mode: str, workers: int, timeout_sec: float = 0) -> dict:
+    """자식 프로세스 1회 변환. 자식이 결과 없이 죽거나(segfault, OOM kill) 시간을 넘기면 error 항목."""
+    ctx = mp.get_context("spawn")
+    out = ctx.Queue()
+    proc = ctx.Process(target=_convert_child, args=(path, mode, workers, out))
+    proc.start()
+    deadline = time.monotonic() + timeout_sec if timeout_sec > 0 else None
+    result = None
+    while result is None:
+        if deadline is not None and time.monotonic() > deadline:
+            proc.kill()
+            result = {"error": f"timeout ({timeout_sec:g}s)"}
+            break
+        try:
+            result = out.get(timeout=1.0)
+        except queue.Empty:
+            if not proc.is_alive():
+                # 종료 직전에 보낸 결과가 남아 있을 수 있으므로 한 번 더 확인
+                try:
+                    result = out.get(timeout=1.0)
+                except queue.Empty:
+                    result = {"error": f"exit code {proc.exitcode}"}
+    proc.join(timeout=10)
+    if proc.is_alive():
+        proc.kill()
+        proc.join()
+    out.close()
+    return result
+
+
+def _parse_size(text: str) -> int:
+    text = text.strip().lower()
+    return int(float(text[:-1]) * 1000) if text.endswith("k") else int(text)
+
+
+def _delta(new: float, old: float) -> str:
+    if not old:
+        return "    -"
+    return f"{(new - old) / old * 100:+5.1f}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IFC 변환 성능 벤치마크 (합성 코퍼스)")
+    parser.add_argument("--profiles", default="typed,curtain,deep")
+    parser.add_argument("--sizes", default="1k,10k", help="예: 1k,10k,50k,200k")
+    parser.add_argument("--modes", default="nodes,instanced,merged,quantized")
+    parser.add_argument("--workers", type=int, default=1, help="삼각분할 워커 수 (0: CPU 코어 수)")
+    parser.add_argument("--corpus-dir", default=os.path.join(tempfile.gettempdir(), "twinspring-ifc", "bench"))
+    parser.add_argument("--timeout", type=float, default=1800, help="실행 1회 제한 시간(초, 0: 무제한)")
+    parser.add_argument("--regenerate", action="store_true", help="코퍼스 IFC 다시 생성")
+    parser.add_argument("--out", default="", help="결과 JSON 경로")
+    parser.add_argument("--baseline", default="", help="비교 기준 결과 JSON")
+    args = parser.parse_args()
+
+    import ifcopenshell
+    import numpy as np
+
+    profiles = [p.strip() for p in args.profiles.split(",") if p.strip()]
+    sizes = [_parse_size(s) for s in args.sizes.split(",") if s.strip()]
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    for name in profiles:
+        if name not in PROFILES:
+            parser.error(f"unknown profile: {name}")
+    for name in modes:
+        if name not in MODES:
+            parser.error(f"unknown mode: {name}")
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = {(r["model"], r["mode"]): r for r in json.load(f)["runs"] if "error" not in r}
+
+    print("=" * 96)
+    print("  IFC conversion benchmark")
+    print("=" * 96)
+    print("\n[1] corpus")
+    corpus = [(f"{p}-{n}", *corpus_path(args.corpus_dir, p, n, args.regenerate)) for p in profiles for n in sizes]
+
+    print(f"\n[2] convert_ifc_to_glb (workers={args.workers})")
+    header = f"  {'model':<16}{'mode':<11}{'elements':>9}{'sec':>9}{'RSS MB':>9}{'GLB MB':>9}{'lite MB':>9}{'tris':>11}"
+    if baseline:
+        header += f"{'Δsec':>9}{'ΔRSS':>9}{'ΔGLB':>9}"
+    print(header)
+    runs = []
+    for model, path, _count in corpus:
+        for mode in modes:
+            r = {"model": model, "mode": mode, "fileBytes": os.path.getsize(path),
+                 **run_once(path, mode, args.workers, args.timeout)}
+            runs.append(r)
+            if "error" in r:
+                print(f"  {model:<16}{mode:<11} ERROR {r['error']}")
+                continue
+            line = (f"  {model:<16}{mode:<11}{r['elements']:>9,}{r['sec']:>9.2f}{r['peakRssMb']:>9.0f}"
+                    f"{r['glbBytes'] / 1e6:>9.2f}{r['glbLiteBytes'] / 1e6:>9.2f}{r['triangles'] or 0:>11,}")
+            base = baseline.get((model, mode))
+            if base is not None:
+                line += (f"{_delta(r['sec'], base['sec']):>9}{_delta(r['peakRssMb'], base['peakRssMb']):>9}"
+                         f"{_delta(r['glbBytes'], base['glbBytes']):>9}")
+            print(line)
+
+    ok = [r for r in runs if "error" not in r]
+    if ok:
+        print("\n[3] phase totals (self time, all runs)")
+        totals: dict[str, float] = {}
+        for r in ok:
+            for name, sec in r["phases"].items():
+                totals[name] = totals.get(name, 0.0) + sec
+        grand = sum(totals.values()) or 1.0
+        for name, sec in sorted(totals.items(), key=lambda kv: -kv[1]):
+            print(f"  {name:<14}{sec:>9.2f}s  {sec / grand * 100:5.1f}%")
+
+    if args.out:
+        report = {
+            "meta": {
+                "createdAt":   time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python":      platform.python_version(),
+                "platform":    platform.platform(),
+                "cpus":        os.cpu_count(),
+                "ifcopenshell": getattr(ifcopenshell, "version", "unknown"),
+                "numpy":       np.__version__,
+                "workers":     args.workers,
+            },
+            "runs": runs,
+        }
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n  → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
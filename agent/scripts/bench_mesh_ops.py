@@ -0,0 +1,147 @@
+"""
+ifc_converter 메시 연산 벤치마크 — 벡터화 전/후 비교
+
+_compute_normals (scatter-add) 와 _simplify_to_convex_hull (일괄 방향 판정) 을
+기존 삼각형별 Python 루프 구현과 같은 입력으로 실행해 소요 시간과 결과 일치 여부를 출력한다.
+[2] 는 비용접(삼각형마다 정점 3개) 메시에 ifc_meshopt 를 적용한 정점 감소율 / ACMR.
+
+Run: python scripts/bench_mesh_ops.py [--triangles 1000000] [--hull-elements 2000]
+"""
+import sys
+import os
+import time
+import argparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from ifc_converter import _compute_normals, _simplify_to_convex_hull
+from ifc_meshopt import MeshOptimizer
+
+
+# ── 기존(루프) 구현 — 비교 기준 ───────────────────────────────────────
+
+def _legacy_compute_normals(positions: np.ndarray, indices: np.ndarray) -> np.ndarray:
+    normals = np.zeros_like(positions)
+    tris = indices.reshape(-1, 3)
+    v0 = positions[tris[:, 0]]
+    v1 = positions[tris[:, 1]]
+    v2 = positions[tris[:, 2]]
+    face_normals = np.cross(v1 - v0, v2 - v0)
+    norms = np.linalg.norm(face_normals, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    face_normals /= norms
+    for i, tri in enumerate(tris):
+        normals[tri[0]] += face_normals[i]
+        normals[tri[1]] += face_normals[i]
+        normals[tri[2]] += face_normals[i]
+    norms2 = np.linalg.norm(normals, axis=1, keepdims=True)
+    norms2[norms2 == 0] = 1
+    return (normals / norms2).astype(np.float32)
+
+
+def _legacy_convex_hull(positions: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    from scipy.spatial import ConvexHull
+    hull = ConvexHull(positions)
+    used_idx = hull.vertices
+    remap = {old: new for new, old in enumerate(used_idx)}
+    verts = positions[used_idx].astype(np.float32)
+    faces = []
+    for simplex in hull.simplices:
+        a, b, c = [remap[i] for i in simplex]
+        n = np.cross(verts[b] - verts[a], verts[c] - verts[a])
+        centroid = verts.mean(axis=0)
+        if np.dot(n, verts[a] - centroid) < 0:
+            a, b = b, a
+        faces.extend([a, b, c])
+    return verts, np.array(faces, dtype=np.uint32)
+
+
+# ── 입력 생성 ─────────────────────────────────────────────────────────
+
+def _grid_mesh(n_triangles: int) -> tuple[np.ndarray, np.ndarray]:
+    """굴곡 있는 격자 곡면 — 사각형 1개당 삼각형 2개."""
+    side = max(2, int(np.sqrt(n_triangles / 2)) + 1)
+    xs, ys = np.meshgrid(np.linspace(0, 100, side), np.linspace(0, 100, side))
+    zs = np.sin(xs * 0.3) * np.cos(ys * 0.2)
+    pos = np.column_stack([xs.ravel(), ys.ravel(), zs.ravel()]).astype(np.float32)
+
+    i = np.arange(side - 1)
+    r, c = np.meshgrid(i, i, indexing="ij")
+    v00 = (r * side + c).ravel()
+    v01 = v00 + 1
+    v10 = v00 + side
+    v11 = v10 + 1
+    tris = np.column_stack([v00, v10, v11, v00, v11, v01]).reshape(-1, 3)
+    return pos, tris[:n_triangles].astype(np.uint32).ravel()
+
+
+def _element_clouds(n_elements: int, n_points: int, seed: int = 0) -> list[np.ndarray]:
+    rng = np.random.default_rng(seed)
+    return [
+        (rng.normal(size=(n_points, 3)) * rng.uniform(0.2, 3.0, size=3)
+         + rng.uniform(-50, 50, size=3)).astype(np.float32)
+        for _ in range(n_elements)
+    ]
+
+
+def _timed(fn, *args) -> tuple[float, object]:
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return time.perf_counter() - t0, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ifc_converter 메시 연산 벤치마크")
+    parser.add_argument("--triangles", type=int, default=1_000_000)
+    parser.add_argument("--hull-elements", type=int, default=2000)
+    parser.add_argument("--hull-points", type=int, default=400)
+    parser.add_argument("--meshopt-triangles", type=int, default=200_000)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("  Mesh ops benchmark (legacy loop vs vectorized)")
+    print("=" * 60)
+
+    # ── 1. vertex normal ──────────────────────────────────────────
+    pos, idx = _grid_mesh(args.triangles)
+    print(f"\n[1] _compute_normals — {len(idx) // 3:,} triangles, {len(pos):,} vertices")
+    t_old, n_old = _timed(_legacy_compute_normals, pos, idx)
+    t_new, n_new = _timed(_compute_normals, pos, idx)
+    match = np.allclose(n_old, n_new, atol=1e-4)
+    print(f"  legacy     : {t_old:8.3f}s")
+    print(f"  vectorized : {t_new:8.3f}s   (x{t_old / max(t_new, 1e-9):.1f}, match={match})")
+
+    # ── 2. 정점 용접 + 캐시 재정렬 ─────────────────────────────────
+    pos, idx = _grid_mesh(args.meshopt_triangles)
+    tris = idx.reshape(-1, 3)
+    flat_pos = pos[tris].reshape(-1, 3)                       # ifcopenshell WELD_VERTICES=False 와 같은 형태
+    face_n = np.cross(flat_pos[1::3] - flat_pos[0::3], flat_pos[2::3] - flat_pos[0::3])
+    face_n /= np.linalg.norm(face_n, axis=1, keepdims=True)
+    flat_nrm = np.repeat(face_n, 3, axis=0).astype(np.float32)
+    flat_idx = np.arange(len(flat_pos), dtype=np.uint32)
+    print(f"\n[2] ifc_meshopt — {len(tris):,} triangles, {len(flat_pos):,} unwelded vertices")
+    opt = MeshOptimizer()
+    t_opt, _ = _timed(opt.run, flat_pos, flat_nrm, flat_idx)
+    st = opt.stats()
+    print(f"  weld+reorder: {t_opt:8.3f}s   vertices {st['verticesIn']:,} → {st['verticesOut']:,} "
+          f"(-{st['vertexReduction'] * 100:.1f}%), ACMR 3.000 → {st['acmr']:.3f}")
+
+    # ── 3. convex hull (lite GLB) ─────────────────────────────────
+    try:
+        import scipy  # noqa: F401
+    except ImportError:
+        print("\n[3] _simplify_to_convex_hull — scipy 미설치, 건너뜀")
+        return
+
+    clouds = _element_clouds(args.hull_elements, args.hull_points)
+    print(f"\n[3] _simplify_to_convex_hull — {len(clouds):,} elements × {args.hull_points} points")
+    t_old, old = _timed(lambda cs: [_legacy_convex_hull(c) for c in cs], clouds)
+    t_new, new = _timed(lambda cs: [_simplify_to_convex_hull(c) for c in cs], clouds)
+    match = all(np.array_equal(a[1], b[1]) for a, b in zip(old, new))
+    print(f"  legacy     : {t_old:8.3f}s")
+    print(f"  vectorized : {t_new:8.3f}s   (x{t_old / max(t_new, 1e-9):.1f}, match={match})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1079,37 +1079,799 @@ def health_detail():
 # POST /api/ifc/convert  — IFC 파일 업로드 → GLB + 메타데이터 반환
 # ══════════════════════════════════════════════════════════════════════════════
 
-from fastapi import UploadFile, File, Form
-from fastapi.responses import JSONResponse
+from fastapi import UploadFile, File, Form, Header, Request
+from fastapi.responses import JSONResponse, Response
+from starlette.concurrency import run_in_threadpool
 import base64
+import os
+import shutil
+
+def _spool_upload(file: UploadFile) -> str:
+    """multipart 업로드 → 임시 .ifc 파일 경로 (호출 측이 삭제)."""
+    import tempfile
+    with tempfile.NamedTemporaryFile(suffix=".ifc", delete=False) as tmp:
+        shutil.copyfileobj(file.file, tmp, 1024 * 1024)
+        return tmp.name
+
+
+# 엔드포인트별 허용 mode — 오타·미지원 값이 nodes 출력으로 조용히 바뀌지 않도록 400
+_SYNC_MODES     = ("nodes", "merged")
+_ARTIFACT_MODES = ("nodes", "merged", "tiles")
+
+
+def _invalid_mode(mode: str, allowed: tuple) -> Optional[JSONResponse]:
+    if mode in allowed:
+        return None
+    return JSONResponse({"error": f"mode 는 {allowed} 중 하나여야 합니다: {mode}"}, status_code=400)
+
 
 @app.post("/api/ifc/convert")
-async def convert_ifc(file: UploadFile = File(...), scale: float = Form(default=1.0), project_id: str = Form(default="")):
+async def convert_ifc(file: UploadFile = File(...), scale: float = Form(default=1.0), project_id: str = Form(default=""),
+                      mode: str = Form(default="nodes")):
     """
     IFC 파일을 GLB 바이너리로 변환하고 부재/층/geoOrigin 메타데이터를 반환.
 
-    Request:  multipart/form-data  field=file (.ifc), scale (optional), project_id (optional)
+    Request:  multipart/form-data  field=file (.ifc), scale (optional), project_id (optional),
+              mode (optional: nodes | merged — merged 는 재질별 병합 primitive + feature table)
     Response: {
         glbBase64: string,          — base64 인코딩된 GLB 바이너리
         elements:  BimElementDTO[], — DB 저장용 부재 목록
         storeys:   BimStoreyDTO[],
-        geoOrigin: {...}
+        geoOrigin: {...},
+        lods?:     [{level, screenCoverage, triangles?, glbBase64?}]  — IFC_GLB_LODS 사용 시
     }
     """
+    invalid = _invalid_mode(mode, _SYNC_MODES)
+    if invalid is not None:
+        return invalid
+    from ifc_profile import get_metrics, record_conversion
     try:
-        from ifc_converter import convert_ifc_to_glb
-        ifc_bytes = await file.read()
-        result = convert_ifc_to_glb(ifc_bytes, user_scale=scale, project_id=project_id)
-        return JSONResponse({
+        from ifc_converter import convert_ifc_file
+        from ifc_cache import get_cache
+        from ifc_models import retain_model
+        from config.settings import (
+            IFC_GEOM_WORKERS, IFC_GLB_INSTANCING, IFC_GLB_QUANTIZE, IFC_MESH_OPTIMIZE, IFC_GLB_LODS,
+        )
+        # 업로드(SpooledTemporaryFile)를 메모리에 다시 올리지 않고 임시 파일로 복사해 경로 전달
+        ifc_path = await run_in_threadpool(_spool_upload, file)
+        try:
+            # CPU 바운드 변환을 이벤트 루프에서 돌리면 다른 요청(chat, SSE, health)이 모두 멈춤
+            result = await run_in_threadpool(
+                convert_ifc_file, ifc_path, user_scale=scale, project_id=project_id,
+                num_workers=IFC_GEOM_WORKERS, instancing=IFC_GLB_INSTANCING,
+                output_mode=mode, cache=get_cache(), quantize=IFC_GLB_QUANTIZE,
+                optimize=IFC_MESH_OPTIMIZE, lods=IFC_GLB_LODS,
+            )
+            await run_in_threadpool(retain_model, project_id, ifc_path, result["elements"], scale)
+        finally:
+            os.unlink(ifc_path)
+        record_conversion(result["stats"], "sync")
+        response = {
             "glbBase64":     base64.b64encode(result["glb_bytes"]).decode("utf-8"),
             "glbLiteBase64": base64.b64encode(result["glb_lite_bytes"]).decode("utf-8"),
             "elements":      result["elements"],
             "storeys":       result["storeys"],
             "geoOrigin":     result["geo_origin"],
-        })
+            "stats":         result["stats"],
+        }
+        if "lod_glbs" in result:
+            # lods[0] = LOD0(full GLB) 힌트, 이후 레벨은 glbBase64 포함
+            response["lods"] = [result["lod_levels"][0]] + [
+                {**level, "glbBase64": base64.b64encode(glb).decode("utf-8")}
+                for level, glb in zip(result["lod_levels"][1:], result["lod_glbs"])
+            ]
+        return JSONResponse(response)
+    except Exception as e:
+        logger.exception("[IFC Convert] 변환 실패")
+        get_metrics().record_failure("sync")
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+
+# ── 산출물 저장소 기반 변환 (base64 없이 ID 반환 + Range 다운로드) ──────────────
+
+@app.post("/api/ifc/convert-artifacts")
+def convert_ifc_artifacts(file: UploadFile = File(...), scale: float = Form(default=1.0),
+                          project_id: str = Form(default=""), mode: str = Form(default="nodes")):
+    """
+    IFC 변환 결과를 content-addressed 저장소에 기록하고 ID만 반환.
+
+    Response: {
+        glbId, glbLiteId, metadataId: string  — sha256 ID
+        glbSize, glbLiteSize: int,
+        elementCount: int, stats: {...},
+        lods?: [{level, screenCoverage, triangles?, glbId?}]  — IFC_GLB_LODS 사용 시
+        elementsArrowId?: string  — IFC_ELEMENTS_ARROW 사용 시 elements 컬럼형 사이드카
+        bvhId?: string            — IFC_BVH_SIDECAR 사용 시 부재 삼각형 BVH (mode=tiles 제외)
+    }
+    mode=tiles: glbId 대신 manifestId (층별 + 옥트리 타일 매니페스트 JSON, 타일마다 glbId)
+                — 부재 목록은 타일 순서, 타일 i 의 부재는 elements[elementStart:+elementCount]
+    GLB:        GET /api/ifc/artifacts/{id}   (application/octet-stream, Range 지원)
+    메타데이터: GET /api/ifc/metadata/{id}    (elements / storeys / geoOrigin JSON)
+    사이드카:   GET /api/ifc/elements/{id}    (Arrow IPC stream, ?format=ndjson 은 부재별 JSON 줄)
+    BVH 질의:   POST /api/ifc/bvh/{id}/raycast, /api/ifc/bvh/{id}/box
+    """
+    invalid = _invalid_mode(mode, _ARTIFACT_MODES)
+    if invalid is not None:
+        return invalid
+    from ifc_profile import get_metrics, record_conversion
+    try:
+        from ifc_converter import convert_ifc_file
+        from ifc_artifacts import get_store
+        from ifc_cache import get_cache
+        from ifc_bvh import store_bvh_sidecar
+        from ifc_columnar import store_elements_sidecar
+        from ifc_models import retain_model
+        from config.settings import (
+            IFC_GEOM_WORKERS, IFC_GLB_INSTANCING, IFC_GLB_QUANTIZE, IFC_MESH_OPTIMIZE, IFC_GLB_LODS,
+            IFC_BVH_SIDECAR,
+        )
+        store = get_store()
+        ifc_path = _spool_upload(file)
+        if mode == "tiles":
+            from ifc_converter import convert_ifc_file_tiled
+            from config.settings import IFC_TILE_MAX_ELEMENTS
+            try:
+                result = convert_ifc_file_tiled(
+                    ifc_path, lambda _tile_id, glb: store.put(glb), user_scale=scale,
+                    project_id=project_id, num_workers=IFC_GEOM_WORKERS,
+                    instancing=IFC_GLB_INSTANCING, cache=get_cache(), quantize=IFC_GLB_QUANTIZE,
+                    optimize=IFC_MESH_OPTIMIZE, max_tile_elements=IFC_TILE_MAX_ELEMENTS,
+                )
+                retain_model(project_id, ifc_path, result["elements"], scale)
+            finally:
+                os.unlink(ifc_path)
+            record_conversion(result["stats"], "sync")
+            glb_lite_id = store.put(result.pop("glb_lite_bytes"))
+            metadata = json.dumps({
+                "elements":  result["elements"],
+                "storeys":   result["storeys"],
+                "geoOrigin": result["geo_origin"],
+            }, ensure_ascii=False, default=str).encode("utf-8")
+            manifest = json.dumps(result["manifest"], ensure_ascii=False).encode("utf-8")
+            response = {
+                "manifestId":   store.put(manifest),
+                "glbLiteId":    glb_lite_id,
+                "metadataId":   store.put(metadata),
+                "glbLiteSize":  os.path.getsize(store.path(glb_lite_id)),
+                "tileCount":    len(result["manifest"]["tiles"]),
+                "elementCount": len(result["elements"]),
+                "stats":        result["stats"],
+            }
+            arrow_id = store_elements_sidecar(store, result["elements"])
+            if arrow_id is not None:
+                response["elementsArrowId"] = arrow_id
+            return JSONResponse(response)
+        try:
+            result = convert_ifc_file(ifc_path, user_scale=scale, project_id=project_id,
+                                      num_workers=IFC_GEOM_WORKERS, instancing=IFC_GLB_INSTANCING,
+                                      output_mode=mode, cache=get_cache(),
+                                      quantize=IFC_GLB_QUANTIZE, optimize=IFC_MESH_OPTIMIZE,
+                                      lods=IFC_GLB_LODS, bvh=IFC_BVH_SIDECAR)
+            retain_model(project_id, ifc_path, result["elements"], scale)
+        finally:
+            os.unlink(ifc_path)
+        record_conversion(result["stats"], "sync")
+        glb_id      = store.put(result.pop("glb_bytes"))
+        glb_lite_id = store.put(result.pop("glb_lite_bytes"))
+        metadata = json.dumps({
+            "elements":  result["elements"],
+            "storeys":   result["storeys"],
+            "geoOrigin": result["geo_origin"],
+        }, ensure_ascii=False, default=str).encode("utf-8")
+        response = {
+            "glbId":        glb_id,
+            "glbLiteId":    glb_lite_id,
+            "metadataId":   store.put(metadata),
+            "glbSize":      os.path.getsize(store.path(glb_id)),
+            "glbLiteSize":  os.path.getsize(store.path(glb_lite_id)),
+            "elementCount": len(result["elements"]),
+            "stats":        result["stats"],
+        }
+        arrow_id = store_elements_sidecar(store, result["elements"])
+        if arrow_id is not None:
+            response["elementsArrowId"] = arrow_id
+        bvh_id = store_bvh_sidecar(store, result)
+        if bvh_id is not None:
+            response["bvhId"] = bvh_id
+        if "lod_glbs" in result:
+            response["lods"] = [result["lod_levels"][0]] + [
+                {**level, "glbId": store.put(glb)}
+                for level, glb in zip(result["lod_levels"][1:], result.pop("lod_glbs"))
+            ]
+        return JSONResponse(response)
     except Exception as e:
         logger.exception("[IFC Convert] 변환 실패")
+        get_metrics().record_failure("sync")
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+
+@app.post("/api/ifc/federate")
+def federate_ifc(files: list[UploadFile] = File(...), names: str = Form(default=""),
+                 scale: float = Form(default=1.0), project_id: str = Form(default="")):
+    """
+    여러 분야 IFC(건축·구조·MEP 등)를 동시에 변환하고 공통 원점으로 정렬.
+
+    Request:  multipart/form-data  files=IFC 여러 개, names (optional: 쉼표 구분 모델 이름, files 순서)
+    Response: 매니페스트 {
+        manifestId, geoOrigin (공통), bboxMin, bboxMax,
+        models: [{name, projectId, fileName, glbId, glbLiteId, metadataId, elementCount,
+                  bboxMin, bboxMax, ifcSchema, stats, elementsArrowId?, bvhId?}]
+    }
+    모델별 GLB 는 같은 원점 기준이므로 추가 변환 없이 겹쳐 로드하면 정렬된다.
+    elementId 는 "{project_id}-{모델 이름}" 기준 (모델 간 expressId 충돌 방지).
+    대형 모델은 POST /api/ifc/federate/jobs (작업 큐 + 진행률 SSE) 권장.
+    """
+    tmp_paths: list[str] = []
+    try:
+        from ifc_federation import federate_ifc_files, store_federation
+        from ifc_artifacts import get_store
+        from ifc_cache import get_cache
+        from ifc_profile import record_conversion
+        from config.settings import (
+            IFC_GEOM_WORKERS, IFC_GLB_INSTANCING, IFC_GLB_QUANTIZE, IFC_MESH_OPTIMIZE,
+            IFC_FEDERATION_PROCESSES, IFC_BVH_SIDECAR, IFC_JOB_MEMORY_MB,
+        )
+        labels = [n.strip() for n in names.split(",")] if names else []
+        models = []
+        for i, f in enumerate(files):
+            tmp_paths.append(_spool_upload(f))
+            label = labels[i] if i < len(labels) and labels[i] else os.path.splitext(f.filename or "")[0]
+            models.append((label, tmp_paths[-1]))
+
+        result = federate_ifc_files(
+            models, user_scale=scale, project_id=project_id, processes=IFC_FEDERATION_PROCESSES,
+            num_workers=IFC_GEOM_WORKERS, instancing=IFC_GLB_INSTANCING, cache=get_cache(),
+            quantize=IFC_GLB_QUANTIZE, optimize=IFC_MESH_OPTIMIZE, bvh=IFC_BVH_SIDECAR,
+            memory_mb=IFC_JOB_MEMORY_MB,
+        )
+        for m in result["models"]:
+            record_conversion(m["stats"], "federation")
+        manifest = store_federation(result, get_store(), [f.filename for f in files], tmp_paths, scale)
+        return JSONResponse(manifest, media_type="application/json")
+    except Exception as e:
+        logger.exception("[IFC Federation] 연합 변환 실패")
+        return JSONResponse({"error": str(e)}, status_code=500)
+    finally:
+        for path in tmp_paths:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+
+def _artifact_response(artifact_id: str, media_type: str, range_header: Optional[str]):
+    from ifc_artifacts import get_store, parse_range, iter_file
+    path = get_store().path(artifact_id)
+    if path is None:
+        return JSONResponse({"error": "artifact not found"}, status_code=404)
+    size = os.path.getsize(path)
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag":          f'"{artifact_id}"',
+        "Cache-Control": "public, max-age=31536000, immutable",  # 내용 주소 → 불변
+    }
+    try:
+        byte_range = parse_range(range_header, size)
+    except ValueError:
+        return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+    if byte_range is None:
+        headers["Content-Length"] = str(size)
+        return StreamingResponse(iter_file(path, 0, size - 1), media_type=media_type, headers=headers)
+    start, end = byte_range
+    headers["Content-Range"]  = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(iter_file(path, start, end), status_code=206,
+                             media_type=media_type, headers=headers)
+
+
+@app.get("/api/ifc/artifacts/{artifact_id}")
+def get_ifc_artifact(artifact_id: str, range: Optional[str] = Header(default=None)):
+    """GLB 산출물 다운로드 (HTTP Range 지원)."""
+    return _artifact_response(artifact_id, "application/octet-stream", range)
+
+
+@app.get("/api/ifc/metadata/{artifact_id}")
+def get_ifc_metadata(artifact_id: str):
+    """변환 메타데이터(elements / storeys / geoOrigin) JSON."""
+    return _artifact_response(artifact_id, "application/json", None)
+
+
+@app.get("/api/ifc/elements/{artifact_id}")
+def get_ifc_elements_sidecar(artifact_id: str, format: str = "arrow",
+                             range: Optional[str] = Header(default=None)):
+    """
+    elements 컬럼형 사이드카 (ifc_columnar).
+
+    format=arrow  (기본) Arrow IPC stream 원본 — Range 지원
+    format=ndjson 레코드 배치 단위로 읽으며 부재 1건당 JSON 한 줄 — 전체를 메모리에 올리지 않고
+                  bulk 저장 측이 줄 단위로 스트리밍 처리
+    """
+    from ifc_columnar import MEDIA_TYPE, iter_element_batches
+    if format != "ndjson":
+        return _artifact_response(artifact_id, MEDIA_TYPE, range)
+    from ifc_artifacts import get_store
+    path = get_store().path(artifact_id)
+    if path is None:
+        return JSONResponse({"error": "artifact not found"}, status_code=404)
+
+    def _lines():
+        for batch in iter_element_batches(path):
+            yield "".join(json.dumps(el, ensure_ascii=False) + "\n" for el in batch).encode("utf-8")
+
+    return StreamingResponse(_lines(), media_type="application/x-ndjson")
+
+
+class BvhRayRequest(BaseModel):
+    origin: List[float]
+    direction: List[float]
+    maxDistance: Optional[float] = None
+    allHits: bool = False       # true 면 ray 가 지나는 모든 부재 (가까운 순)
+
+
+class BvhBoxRequest(BaseModel):
+    min: List[float]
+    max: List[float]
+
+
+def _load_bvh_artifact(artifact_id: str):
+    from ifc_artifacts import get_store
+    from ifc_bvh import load_bvh
+    path = get_store().path(artifact_id)
+    return load_bvh(path) if path is not None else None
+
+
+@app.post("/api/ifc/bvh/{artifact_id}/raycast")
+def raycast_ifc_bvh(artifact_id: str, body: BvhRayRequest):
+    """
+    BVH 사이드카 ray 질의 (피킹·측정·가시선). 좌표는 GLB 좌표계 (geoOrigin 이동 후, 미터, Z-up).
+    Response: {hit: {elementId, elementIndex, distance, point, triangle} | null}  — allHits 면 {hits: [...]}
+    """
+    bvh = _load_bvh_artifact(artifact_id)
+    if bvh is None:
+        return JSONResponse({"error": "artifact not found"}, status_code=404)
+    max_dist = body.maxDistance if body.maxDistance is not None else float("inf")
+    try:
+        if body.allHits:
+            return {"hits": bvh.raycast_all(body.origin, body.direction, max_dist)}
+        return {"hit": bvh.raycast(body.origin, body.direction, max_dist)}
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+
+@app.post("/api/ifc/bvh/{artifact_id}/box")
+def box_query_ifc_bvh(artifact_id: str, body: BvhBoxRequest):
+    """BVH 사이드카 범위 질의 — AABB(min/max, GLB 좌표계)와 겹치는 부재 elementId 목록."""
+    bvh = _load_bvh_artifact(artifact_id)
+    if bvh is None:
+        return JSONResponse({"error": "artifact not found"}, status_code=404)
+    return {"elementIds": bvh.query_box(body.min, body.max)}
+
+
+@app.post("/api/bim/{project_id}/export-glb")
+def export_bim_project_glb(project_id: str):
+    """
+    BIM DB 부재(위치·크기·회전 행) → elementType 별 단위 박스 + EXT_mesh_gpu_instancing GLB.
+
+    Response: {glbId, glbSize, elementCount, stats: {meshes, triangles, types, elapsedMs}}
+    GLB: GET /api/ifc/artifacts/{glbId} — node extras.elementIds[instanceId] 가 부재 ID
+    """
+    try:
+        from bim_glb_export import export_bim_glb
+        from ifc_artifacts import get_store
+        from tools.db_tool import query_bim_elements
+        result = export_bim_glb(query_bim_elements(project_id, limit=None), project_id)
+        glb = result["glb_bytes"]
+        return {
+            "glbId":        get_store().put(glb),
+            "glbSize":      len(glb),
+            "elementCount": result["stats"]["elements"],
+            "stats":        result["stats"],
+        }
+    except Exception as e:
+        logger.exception("[BIM Export] GLB 내보내기 실패")
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+
+# ── 비동기 변환 작업 (프로세스 격리 + 진행률 SSE) ─────────────────────────────
+
+def _ifc_job_params(scale: float, project_id: str, mode: str, incremental: bool = False) -> dict:
+    from config.settings import (
+        IFC_GEOM_WORKERS, IFC_GLB_INSTANCING, IFC_GLB_QUANTIZE, IFC_MESH_OPTIMIZE, IFC_GLB_LODS,
+        IFC_TILE_MAX_ELEMENTS, IFC_BVH_SIDECAR,
+    )
+    params = {
+        "user_scale":  scale,
+        "project_id":  project_id,
+        "num_workers": IFC_GEOM_WORKERS,
+        "instancing":  IFC_GLB_INSTANCING,
+        "output_mode": mode,
+        "quantize":    IFC_GLB_QUANTIZE,
+        "optimize":    IFC_MESH_OPTIMIZE,
+        "lods":        IFC_GLB_LODS,
+        "bvh":         IFC_BVH_SIDECAR,
+    }
+    if mode == "tiles":
+        params["max_tile_elements"] = IFC_TILE_MAX_ELEMENTS
+    if incremental:
+        params["incremental"] = True
+    return params
+
+
+@app.post("/api/ifc/jobs")
+def submit_ifc_job(file: UploadFile = File(...), scale: float = Form(default=1.0),
+                   project_id: str = Form(default=""), mode: str = Form(default="nodes"),
+                   incremental: bool = Form(default=False)):
+    """
+    IFC 변환 작업 제출 → 즉시 jobId 반환 (202). 큐가 가득 차면 429.
+
+    진행률: GET /api/ifc/jobs/{jobId}/events  (SSE)
+    상태:   GET /api/ifc/jobs/{jobId}
+    결과:   GET /api/ifc/jobs/{jobId}/result  → glbId / glbLiteId / metadataId (산출물 API 로 다운로드)
+            (IFC_ELEMENTS_ARROW 사용 시 elementsArrowId — GET /api/ifc/elements/{id})
+            (IFC_BVH_SIDECAR 사용 시 bvhId — POST /api/ifc/bvh/{id}/raycast · /box)
+            mode=tiles 면 glbId 대신 manifestId
+    incremental=true (project_id 필수): 프로젝트 직전 revision 대비 변경 부재만 삼각분할,
+            결과에 delta {added, changed, removed: [{globalId, elementId}], revision} 포함
+    """
+    invalid = _invalid_mode(mode, _ARTIFACT_MODES)
+    if invalid is not None:
+        return invalid
+    from ifc_jobs import get_job_manager, QueueFull
+    manager = get_job_manager()
+    job_id, ifc_path = manager.new_upload_path()
+    with open(ifc_path, "wb") as f:
+        shutil.copyfileobj(file.file, f, 1024 * 1024)
+    params = _ifc_job_params(scale, project_id, mode, incremental)
+    try:
+        job = manager.submit(job_id, ifc_path, params)
+    except QueueFull as e:
+        os.unlink(ifc_path)
+        return JSONResponse({"error": str(e)}, status_code=429, headers={"Retry-After": "30"})
+    return JSONResponse(job.to_dict(), status_code=202)
+
+
+@app.post("/api/ifc/federate/jobs")
+def submit_ifc_federation_job(files: list[UploadFile] = File(...), names: str = Form(default=""),
+                              scale: float = Form(default=1.0), project_id: str = Form(default="")):
+    """
+    연합 변환(POST /api/ifc/federate)을 변환 작업으로 제출 → 즉시 jobId 반환 (202). 큐가 가득 차면 429.
+
+    작업 자식 프로세스(메모리 상한 · 타임아웃 격리) 안에서 모델을 순차 삼각분할하며,
+    진행률·상태·결과는 /api/ifc/jobs/{jobId} 계열 그대로. 결과는 연합 매니페스트
+    {manifestId, geoOrigin, bboxMin, bboxMax, models: [{..., glbId, glbLiteId, metadataId}]}.
+    """
+    from ifc_jobs import get_job_manager, QueueFull
+    manager = get_job_manager()
+    job_id, job_dir = manager.new_upload_dir()
+    labels = [n.strip() for n in names.split(",")] if names else []
+    models = []
+    for i, f in enumerate(files):
+        path = os.path.join(job_dir, f"{i}.ifc")
+        with open(path, "wb") as out:
+            shutil.copyfileobj(f.file, out, 1024 * 1024)
+        label = labels[i] if i < len(labels) and labels[i] else os.path.splitext(f.filename or "")[0]
+        models.append({"name": label, "fileName": f.filename, "path": path})
+    params = {k: v for k, v in _ifc_job_params(scale, project_id, "nodes").items()
+              if k not in ("output_mode", "lods")}
+    params.update({"federate": True, "models": models})
+    try:
+        job = manager.submit(job_id, job_dir, params)
+    except QueueFull as e:
+        shutil.rmtree(job_dir, ignore_errors=True)
+        return JSONResponse({"error": str(e)}, status_code=429, headers={"Retry-After": "30"})
+    return JSONResponse(job.to_dict(), status_code=202)
+
+
+@app.get("/api/ifc/jobs/{job_id}")
+def get_ifc_job(job_id: str):
+    """작업 상태 (status / phase / done / total)."""
+    from ifc_jobs import get_job_manager
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return JSONResponse({"error": "job not found"}, status_code=404)
+    return job.to_dict()
+
+
+@app.get("/api/ifc/jobs/{job_id}/events")
+def stream_ifc_job(job_id: str):
+    """작업 진행률 SSE — 이미 발생한 이벤트부터 재생, done/failed 이벤트 후 종료."""
+    from ifc_jobs import get_job_manager
+    manager = get_job_manager()
+    job = manager.get(job_id)
+    if job is None:
+        return JSONResponse({"error": "job not found"}, status_code=404)
+
+    def generate():
+        cursor = 0
+        while True:
+            events, cursor = manager.wait_events(job, cursor)
+            if not events:
+                yield ": keep-alive\n\n"
+            for event in events:
+                yield f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+            if job.finished and cursor >= len(job.events):
+                return
+
+    return StreamingResponse(generate(), media_type="text/event-stream")
+
+
+@app.get("/api/ifc/jobs/{job_id}/result")
+def get_ifc_job_result(job_id: str):
+    """완료된 작업의 산출물 ID. 진행 중이면 409, 실패면 500."""
+    from ifc_jobs import get_job_manager
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return JSONResponse({"error": "job not found"}, status_code=404)
+    if job.status == "failed":
+        return JSONResponse({"error": job.error}, status_code=500)
+    if job.status != "done":
+        return JSONResponse(job.to_dict(), status_code=409)
+    return job.result
+
+
+# ── 재개 가능 청크 업로드 → 변환 작업 ─────────────────────────────────────────
+
+def _upload_error(e) -> JSONResponse:
+    from ifc_uploads import OffsetMismatch
+    body = {"error": str(e)}
+    if isinstance(e, OffsetMismatch):
+        body["offset"] = e.expected
+    return JSONResponse(body, status_code=e.status_code)
+
+
+@app.post("/api/ifc/uploads")
+def create_ifc_upload(filename: str = Form(...), size: int = Form(...)):
+    """
+    청크 업로드 세션 생성 → {uploadId, offset: 0, size}.
+
+    이후 PUT /api/ifc/uploads/{uploadId}?offset=N  (본문 = 원시 바이트, 여러 번 나눠 전송)
+    끊기면 GET /api/ifc/uploads/{uploadId} 로 offset 확인 후 재개,
+    다 올리면 POST /api/ifc/uploads/{uploadId}/complete 로 변환 작업 제출.
+    """
+    from ifc_uploads import get_upload_store, UploadError
+    try:
+        return get_upload_store().create(filename, size)
+    except UploadError as e:
+        return _upload_error(e)
+
+
+@app.get("/api/ifc/uploads/{upload_id}")
+def get_ifc_upload(upload_id: str):
+    """업로드 진행 상태 (offset = 서버에 기록된 바이트 수)."""
+    from ifc_uploads import get_upload_store, UploadError
+    try:
+        return get_upload_store().status(upload_id)
+    except UploadError as e:
+        return _upload_error(e)
+
+
+@app.put("/api/ifc/uploads/{upload_id}")
+async def put_ifc_upload_chunk(upload_id: str, request: Request, offset: int = 0):
+    """요청 본문을 메모리에 모으지 않고 .part 파일 끝에 바로 이어 쓴다."""
+    from ifc_uploads import get_upload_store, UploadError
+    store = get_upload_store()
+    try:
+        part, remaining = store.begin_append(upload_id, offset)
+    except UploadError as e:
+        return _upload_error(e)
+    try:
+        with open(part, "ab") as f:
+            async for chunk in request.stream():
+                if len(chunk) > remaining:
+                    raise UploadError("선언한 size 를 초과했습니다")
+                await run_in_threadpool(f.write, chunk)
+                remaining -= len(chunk)
+    except UploadError as e:
+        store.end_append(upload_id)
+        return _upload_error(e)
+    except Exception:
+        # 클라이언트 연결 끊김 등 — 기록된 데까지는 유지되므로 offset 조회 후 재개 가능
+        logger.warning("[IFC Upload] 청크 수신 중단: %s", upload_id, exc_info=True)
+    return store.end_append(upload_id)
+
+
+@app.post("/api/ifc/uploads/{upload_id}/complete")
+def complete_ifc_upload(upload_id: str, scale: float = Form(default=1.0),
+                        project_id: str = Form(default=""), mode: str = Form(default="nodes"),
+                        incremental: bool = Form(default=False)):
+    """업로드 완료 → 파일을 작업 디렉터리로 옮겨 변환 작업 제출 (202, 응답은 POST /api/ifc/jobs 와 동일)."""
+    invalid = _invalid_mode(mode, _ARTIFACT_MODES)
+    if invalid is not None:
+        return invalid
+    from ifc_uploads import get_upload_store, UploadError
+    from ifc_jobs import get_job_manager, QueueFull
+    store = get_upload_store()
+    try:
+        part = store.finish(upload_id)
+    except UploadError as e:
+        return _upload_error(e)
+
+    manager = get_job_manager()
+    job_id, ifc_path = manager.new_upload_path()
+    try:
+        shutil.move(part, ifc_path)
+    except OSError as e:
+        store.release(upload_id)
+        logger.exception("[IFC Upload] 완료 파일 이동 실패: %s", upload_id)
+        return JSONResponse({"error": str(e)}, status_code=500)
+    params = _ifc_job_params(scale, project_id, mode, incremental)
+    try:
+        job = manager.submit(job_id, ifc_path, params)
+    except QueueFull as e:
+        shutil.move(ifc_path, part)  # 업로드는 유지 — 나중에 complete 재시도
+        store.release(upload_id)
+        return JSONResponse({"error": str(e)}, status_code=429, headers={"Retry-After": "30"})
+    store.discard(upload_id)
+    return JSONResponse({**job.to_dict(), "uploadId": upload_id}, status_code=202)
+
+
+@app.get("/admin/ifc-jobs")
+def ifc_job_stats():
+    """IFC 변환 작업 큐 현황."""
+    from ifc_jobs import get_job_manager
+    return get_job_manager().stats()
+
+
+# ── 상주 모델 조회 (부재 상세 on-demand) ────────────────────────────────────
+
+@app.get("/api/ifc/models/{project_id}/elements/{global_id}")
+def get_ifc_element_detail(project_id: str, global_id: str):
+    """
+    보관된 IFC 에서 GlobalId 1건의 상세 조회 — 상세 패널용.
+
+    Response: {globalId, expressId, ifcType, ifcName, material, properties, quantities,
+               spatial: {storey, storeyElevation, building, containedIn, partOf}}
+    첫 조회는 IFC 로드(수 초), 이후 LRU 상주 중에는 수 ms.
+    """
+    from ifc_models import get_model_server, ModelNotFound
+    server = get_model_server()
+    if server is None:
+        return JSONResponse({"error": "resident model server disabled"}, status_code=404)
+    try:
+        return JSONResponse(server.element(project_id, global_id))
+    except ModelNotFound as e:
+        return JSONResponse({"error": str(e)}, status_code=404)
+    except Exception as e:
+        logger.exception("[IFC Models] 조회 실패")
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+
+@app.get("/api/ifc/models/{project_id}/clashes")
+def get_ifc_clashes(project_id: str, mode: str = "hard", tolerance: float = 0.01,
+                    clearance: float = 0.05, limit: int = 200):
+    """
+    보관된 IFC 의 부재 간섭 검출 (ifc_clash).
+
+    mode: hard (관통 깊이 > tolerance) | clearance (hard + 거리 < clearance)
+    Response: {modelSha256, mode, elements, candidatePairs, clashCount, elapsedSec, cacheHit,
+               clashes: [{a, b: {elementId, globalId, elementType, ifcName, storey},
+                          kind, depth|distance, point}]}
+    결과는 모델 hash + 조건 키로 캐시 — 같은 모델 재조회는 즉시 반환.
+    """
+    from ifc_clash import project_clashes
+    from ifc_models import ModelNotFound
+    from config.settings import IFC_GEOM_WORKERS
+    try:
+        return JSONResponse(project_clashes(project_id, mode=mode, tolerance=tolerance,
+                                            clearance=clearance, limit=limit,
+                                            num_workers=IFC_GEOM_WORKERS))
+    except ModelNotFound as e:
+        return JSONResponse({"error": str(e)}, status_code=404)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    except Exception as e:
+        logger.exception("[IFC Clash] 간섭 검출 실패")
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+
+@app.get("/api/ifc/models/{project_id}/connectivity")
+def get_ifc_connectivity(project_id: str, tolerance: float = 0.005):
+    """
+    부재 연결 그래프 (ifc_connectivity) — 없거나 모델이 바뀌었으면 생성 후 저장.
+
+    Response: {modelSha256, summary: {elements, edges, supports, maxSupportLevel, isolated},
+               nodes: [{elementId, globalId, elementType, supportLevel}],
+               edges: [[from, to, kind]]}   kind: contact | supports (from 이 to 를 지지)
+    """
+    from ifc_connectivity import project_connectivity, graph_summary, support_levels, SUPPORTS
+    from ifc_models import ModelNotFound
+    from config.settings import IFC_GEOM_WORKERS
+    try:
+        graph = project_connectivity(project_id, tolerance=tolerance, num_workers=IFC_GEOM_WORKERS)
+    except ModelNotFound as e:
+        return JSONResponse({"error": str(e)}, status_code=404)
+    except Exception as e:
+        logger.exception("[IFC Graph] 연결 그래프 생성 실패")
         return JSONResponse({"error": str(e)}, status_code=500)
+    levels = support_levels(len(graph["globalIds"]), graph["edges"], graph["kinds"])
+    return JSONResponse({
+        "modelSha256": graph["modelSha256"],
+        "summary":     graph_summary(graph),
+        "nodes": [
+            {"elementId": e, "globalId": g, "elementType": t, "supportLevel": int(lv)}
+            for e, g, t, lv in zip(graph["elementIds"].tolist(), graph["globalIds"].tolist(),
+                                   graph["elementTypes"].tolist(), levels.tolist())
+        ],
+        "edges": [
+            [a, b, "supports" if k == SUPPORTS else "contact"]
+            for (a, b), k in zip(graph["edges"].tolist(), graph["kinds"].tolist())
+        ],
+    })
+
+
+@app.get("/admin/ifc-models")
+def ifc_model_stats():
+    """상주 IFC 모델 현황 (메모리 상주 프로젝트, 로드·히트 수)."""
+    from ifc_models import get_model_server
+    server = get_model_server()
+    if server is None:
+        return {"enabled": False}
+    return {"enabled": True, **server.stats()}
+
+
+@app.get("/admin/ifc-metrics")
+def ifc_metrics():
+    """IFC 변환 계측 누적 (단계별 시간 합, 최대 RSS, 느린 부재 Top-N, 마지막 변환 profile)."""
+    from ifc_profile import get_metrics
+    return get_metrics().snapshot()
+
+
+@app.get("/metrics/ifc")
+def ifc_metrics_prometheus():
+    """IFC 변환 메트릭 — Prometheus text format (scrape 용)."""
+    from ifc_profile import get_metrics
+    return Response(get_metrics().prometheus(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/admin/ifc-cache")
+def ifc_cache_stats():
+    """IFC 변환 캐시 현황 (히트/미스, 항목 수, 사용 용량)."""
+    from ifc_cache import get_cache
+    cache = get_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@app.get("/admin/ifc-mesh-store")
+def ifc_mesh_store_stats():
+    """공유 mesh 저장소 현황 (항목·참조 수, 사용 용량, 이 프로세스의 히트/절약 시간)."""
+    from ifc_meshstore import get_mesh_store
+    store = get_mesh_store()
+    if store is None:
+        return {"enabled": False}
+    return {"enabled": True, **store.stats()}
+
+
+@app.post("/admin/ifc-mesh-store/gc")
+async def ifc_mesh_store_gc():
+    """공유 mesh 저장소 GC 즉시 실행 (참조 없는 항목 + 상한 초과분 삭제)."""
+    from ifc_meshstore import get_mesh_store
+    store = get_mesh_store()
+    if store is None:
+        return {"enabled": False}
+    return {"enabled": True, **await run_in_threadpool(store.gc)}
+
+
+@app.get("/admin/ifc-revisions")
+def ifc_revision_stats():
+    """증분 변환 revision 저장소 현황 (프로젝트 수, 사용 용량, 보관 한도)."""
+    from ifc_incremental import get_revision_store
+    return get_revision_store().stats()
+
+
+@app.get("/admin/ifc-artifacts")
+def ifc_artifact_stats():
+    """변환 산출물 저장소 현황 (항목 수, 사용 용량, 보관 한도)."""
+    from ifc_artifacts import get_store
+    return get_store().stats()
+
+
+@app.post("/admin/ifc-artifacts/gc")
+async def ifc_artifact_gc():
+    """변환 산출물 저장소 GC 즉시 실행 (보관 기간 경과 + 상한 초과분 삭제)."""
+    from ifc_artifacts import get_store
+    return await run_in_threadpool(get_store().gc)
 
 
 if __name__ == "__main__":
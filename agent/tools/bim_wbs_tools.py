@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 import datetime
+import heapq
 import json
 import logging
 import math
 from collections import Counter, defaultdict
 from dataclasses import dataclass, field
+from typing import Optional
 import re
 
 import httpx
@@ -162,8 +164,46 @@ def _analyse_floor(label: str, elements: list[dict]) -> FloorAnalysis:
     return FloorAnalysis(label=label, total_vol=total_vol, dom_mat=dom_mat, max_days=pr.days, pr=pr)
 
 # ── WBS 공정표 타스크 빌더 ──────────────────────────────────────────────────
-def _build_tasks(elements: list[dict], start: datetime.date) -> list[dict]:
-    floors = _detect_floors(elements)
+def _order_floors_by_support(floors: list[FloorGroup], graph: Optional[dict]) -> tuple[list[FloorGroup], dict[str, list[str]]]:
+    """
+    연결 그래프(ifc_connectivity)의 supports edge 로 층 간 선후행 결정 — 아래 부재를 지지하는 층이 먼저.
+    부재는 globalId 로 층에 매핑, 같은 층 안의 edge 는 무시. 준비된 층이 여럿이면 낮은 층 우선,
+    층 간 지지가 순환하면(층 배정 오류 등) 높이 순서 그대로. 반환: (층 순서, {층 이름: 선행 층 이름})
+    """
+    if graph is None or len(floors) < 2:
+        return floors, {}
+    from ifc_connectivity import SUPPORTS
+
+    floor_of = {str(el["globalId"]): i for i, fl in enumerate(floors) for el in fl.elements if el.get("globalId")}
+    node_floor = [floor_of.get(str(g), -1) for g in graph["globalIds"].tolist()]
+    preds: dict[int, set[int]] = defaultdict(set)
+    for (lower, upper), kind in zip(graph["edges"].tolist(), graph["kinds"].tolist()):
+        lo_f, up_f = node_floor[lower], node_floor[upper]
+        if kind == SUPPORTS and lo_f >= 0 and up_f >= 0 and lo_f != up_f:
+            preds[up_f].add(lo_f)
+
+    indeg = [len(preds[i]) for i in range(len(floors))]
+    succs: dict[int, list[int]] = defaultdict(list)
+    for up_f, lows in preds.items():
+        for lo_f in lows:
+            succs[lo_f].append(up_f)
+    ready = [i for i in range(len(floors)) if indeg[i] == 0]
+    heapq.heapify(ready)
+    order: list[int] = []
+    while ready:
+        i = heapq.heappop(ready)
+        order.append(i)
+        for j in succs[i]:
+            indeg[j] -= 1
+            if indeg[j] == 0:
+                heapq.heappush(ready, j)
+    if len(order) < len(floors):
+        logger.warning("[wbs] 층 간 지지 관계 순환 — 높이 순서 유지")
+        return floors, {}
+    return [floors[i] for i in order], {floors[i].label: [floors[j].label for j in sorted(lows)] for i, lows in preds.items() if lows}
+
+def _build_tasks(elements: list[dict], start: datetime.date, graph: Optional[dict] = None) -> list[dict]:
+    floors, floor_preds = _order_floors_by_support(_detect_floors(elements), graph)
     tasks: list[dict] = []
 
     def add(name: str, cur: datetime.date, days: int, workers: int = 0, equipment: str = "", roles: str = "", desc: str = "") -> datetime.date:
@@ -198,7 +238,7 @@ def _build_tasks(elements: list[dict], start: datetime.date) -> list[dict]:
                 workers=fa.pr.workers,
                 equipment=fa.pr.equipment,
                 roles=fa.pr.roles,
-                desc=f"총 물량 {fa.total_vol:.1f}m³"
+                desc=f"총 물량 {fa.total_vol:.1f}m³" + (f" │ 선행(지지): {', '.join(floor_preds[fl.label])}" if fl.label in floor_preds else "")
             )
 
     # 후행 고정 공정
@@ -220,9 +260,18 @@ def get_structural_summary(project_id: str) -> str:
     counts = Counter(e.get("elementType", "Unknown") for e in elements)
     floors = _detect_floors(elements)
 
-    return json.dumps({
+    summary = {
         "action": "structural_analysis", "projectId": project_id, "total": total, "floorCount": len(floors), "elementCounts": dict(counts), "status": "양호"
-    }, ensure_ascii=False)
+    }
+    # 연결 그래프(접촉·지지)가 이미 만들어져 있으면 지지 층위 요약 추가 (생성은 하지 않음)
+    try:
+        from ifc_connectivity import load_connectivity, graph_summary
+        graph = load_connectivity(project_id)
+        if graph is not None:
+            summary["connectivity"] = graph_summary(graph)
+    except Exception:
+        logger.debug("[wbs] 연결 그래프 조회 실패", exc_info=True)
+    return json.dumps(summary, ensure_ascii=False)
 
 # ── WBS 엔드포인트 연동 스케줄러 ──────────────────────────────────────────────
 @tool
@@ -234,8 +283,16 @@ def schedule_wbs_for_bim(bim_project_id: str, bim_project_name: str = "", force_
     if not bim_project_name:
         bim_project_name = f"BIM-{bim_project_id}"
 
+    # 연결 그래프가 이미 만들어져 있으면 supports 관계로 층 공정 순서 결정 (생성은 하지 않음)
+    graph = None
+    try:
+        from ifc_connectivity import load_connectivity
+        graph = load_connectivity(bim_project_id)
+    except Exception:
+        logger.debug("[wbs] 연결 그래프 조회 실패", exc_info=True)
+
     start = datetime.date.today()
-    tasks_to_add = _build_tasks(elements, start)
+    tasks_to_add = _build_tasks(elements, start, graph)
 
     # 💡 [해결 책 3] 덮어쓰기 누더기 방지. 새 전송 시 Spring API 측의 기존 과거 잔재 태스크 일제히 '삭제(DELETE)' 선행 처리
     try:
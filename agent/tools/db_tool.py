@@ -130,15 +130,16 @@ def query_bim_element_stats(project_id: str) -> list[dict]:
         return []
 
 
-def query_bim_elements(project_id: str, limit: int = 200) -> list[dict]:
-    """프로젝트 부재 목록 조회"""
+def query_bim_elements(project_id: str, limit: int | None = 200) -> list[dict]:
+    """프로젝트 부재 목록 조회 (limit=None 이면 전체 — GLB 내보내기 등)"""
     try:
         with _PooledConn() as conn:
             with conn.cursor() as cur:
                 cur.execute(
                     'SELECT element_id AS "elementId", element_type AS "elementType", material, '
                     'position_x AS "positionX", position_y AS "positionY", position_z AS "positionZ", '
-                    'size_x AS "sizeX", size_y AS "sizeY", size_z AS "sizeZ" '
+                    'size_x AS "sizeX", size_y AS "sizeY", size_z AS "sizeZ", '
+                    'rotation_x AS "rotationX", rotation_y AS "rotationY", rotation_z AS "rotationZ" '
                     "FROM bim_element WHERE project_id = %s "
                     'ORDER BY element_type, element_id LIMIT %s',
                     (project_id, limit),
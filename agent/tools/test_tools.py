@@ -2,7 +2,7 @@
 Test Agent 도구 모음 — 충돌 테스트 탭
 
 TestAgent 가 create_react_agent 를 통해 호출하는 @tool 함수들.
-충돌 테스트 탭 안내, 키보드 조작법, 충돌 로그 조회를 지원합니다.
+충돌 테스트 탭 안내, 키보드 조작법, 충돌 로그 조회, 서버측 BIM 부재 간섭 검출을 지원합니다.
 """
 
 import json
@@ -125,9 +125,43 @@ def get_collision_log(limit: int = 10) -> str:
         return json.dumps({"error": _ERR, "records": []})
 
 
+@tool
+def detect_bim_clashes(project_id: str, mode: str = "hard", tolerance: float = 0.01,
+                       limit: int = 20) -> str:
+    """
+    BIM 프로젝트 모델의 부재 간 간섭(clash)을 서버에서 검출합니다.
+    브라우저 충돌 로그와 달리 모델 전체 부재 쌍을 형상 기준으로 검사합니다.
+    mode: "hard" (관통, tolerance m 이상) 또는 "clearance" (간섭 + 5cm 이내 근접).
+    limit 은 1~100 범위 (기본 20건, 관통 깊이 큰 순).
+    """
+    limit = max(1, min(limit, 100))
+    try:
+        from ifc_clash import project_clashes
+        from ifc_models import ModelNotFound
+        try:
+            result = project_clashes(project_id, mode=mode, tolerance=tolerance, limit=limit)
+        except ModelNotFound:
+            return json.dumps({"count": 0, "clashes": [],
+                               "note": "해당 프로젝트의 IFC 가 서버에 보관되어 있지 않습니다. IFC 를 다시 변환해 주세요."},
+                              ensure_ascii=False)
+        return json.dumps({
+            "total":          result["clashCount"],
+            "count":          len(result["clashes"]),
+            "elements":       result["elements"],
+            "candidatePairs": result["candidatePairs"],
+            "clashes":        result["clashes"],
+        }, ensure_ascii=False, default=str)
+    except ValueError as e:
+        return json.dumps({"error": str(e), "clashes": []}, ensure_ascii=False)
+    except Exception:
+        logger.error("[test] detect_bim_clashes 실패", exc_info=True)
+        return json.dumps({"error": _ERR, "clashes": []})
+
+
 # ── 도구 목록 ──────────────────────────────────────────────────────────────────
 TEST_TOOLS = [
     get_test_tab_guide,
     get_keyboard_controls,
     get_collision_log,
+    detect_bim_clashes,
 ]